@@ -5,7 +5,7 @@ from importlib import import_module, metadata
 from pathlib import Path
 from typing import Tuple
 
-from moccasin.constants.vars import CONFIG_NAME
+from moccasin.constants.vars import COMPILE_PROFILE_SORT_KEYS, CONFIG_NAME
 from moccasin.logging import logger, set_log_level
 
 MOCCASIN_CLI_VERSION_STRING = "Moccasin CLI v{}"
@@ -15,11 +15,18 @@ ALIAS_TO_COMMAND = {
     "c": "compile",
     "script": "run",
     "config": "config_",
+    "compile-server": "compile_server",
     "u": "utils",
     "util": "utils",
 }
 
-PRINT_HELP_ON_NO_SUB_COMMAND = ["run", "wallet", "explorer", "deployments"]
+PRINT_HELP_ON_NO_SUB_COMMAND = [
+    "run",
+    "wallet",
+    "explorer",
+    "deployments",
+    "compile_server",
+]
 
 
 def main(argv: list) -> int:
@@ -31,7 +38,7 @@ def main(argv: list) -> int:
     if "--version" in argv or "version" in argv:
         print(get_version())
         return 0
-    
+
     # Handle 'help' command same as --help
     if len(argv) > 0 and argv[0] == "help":
         main_parser, _ = generate_main_parser_and_sub_parsers()
@@ -193,6 +200,37 @@ Use this command to prepare your contracts for deployment or testing.""",
         help="Do not install the requirements before compiling.",
         action="store_true",
     )
+    compile_parser.add_argument(
+        "--force",
+        help="Recompile every contract, even if it hasn't changed since the last build.",
+        action="store_true",
+    )
+    compile_parser.add_argument(
+        "--check",
+        help="Report the contracts that are out of date, without compiling. Exits with 1 if any are.",
+        action="store_true",
+    )
+    compile_parser.add_argument(
+        "--profile",
+        help="Report the time and memory each contract took to compile.",
+        action="store_true",
+    )
+    compile_parser.add_argument(
+        "--profile-output",
+        help="Where to write the JSON profile report. Defaults to the build folder.",
+        default=None,
+    )
+    compile_parser.add_argument(
+        "--profile-sort",
+        help="Column to sort the profile table by.",
+        choices=COMPILE_PROFILE_SORT_KEYS,
+        default="wall_time",
+    )
+    compile_parser.add_argument(
+        "--watch",
+        help="Keep running and recompile the contracts affected by every change.",
+        action="store_true",
+    )
 
     zksync_ground = compile_parser.add_mutually_exclusive_group()
     zksync_ground.add_argument(
@@ -201,6 +239,31 @@ Use this command to prepare your contracts for deployment or testing.""",
 
     zksync_ground.add_argument("--is_zksync", nargs="?", const=True, default=None)
 
+    # ------------------------------------------------------------------
+    #                     COMPILE SERVER COMMAND
+    # ------------------------------------------------------------------
+    compile_server_parser = sub_parsers.add_parser(
+        "compile-server",
+        help="Runs a background compile server to speed up repeated compiles.",
+        description="""Runs a compile server for the project, which keeps compiler workers warm
+between runs. While it's running, `mox compile` sends its work to the server
+instead of starting its own workers. Not supported on Windows.""",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        parents=[parent_parser],
+    )
+    compile_server_subparsers = compile_server_parser.add_subparsers(
+        dest="compile_server_command"
+    )
+    compile_server_subparsers.add_parser(
+        "start", help="Start the compile server in the foreground."
+    )
+    compile_server_subparsers.add_parser(
+        "stop", help="Stop the compile server of the project."
+    )
+    compile_server_subparsers.add_parser(
+        "status", help="Show whether a compile server is running for the project."
+    )
+
     # ------------------------------------------------------------------
     #                          TEST COMMAND
     # ------------------------------------------------------------------
@@ -547,6 +610,20 @@ Examples:
         type=str,
         nargs="*",
     )
+    install_parser.add_argument(
+        "--frozen",
+        action="store_true",
+        help="Install exactly the dependencies in moccasin.lock, without resolving any versions.",
+    )
+    install_parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="Install without any network access, from the package store, uv's cache and the mirror. Can also be set with offline_install in the config.",
+    )
+    install_parser.add_argument(
+        "--mirror",
+        help="Local folder to install dependencies from when offline, with GitHub archives in github/<org>/<repo>/<version>.zip and pip wheels in pypi/. Defaults to install_mirror in the config.",
+    )
 
     # ------------------------------------------------------------------
     #                         PURGE COMMAND
@@ -777,7 +854,32 @@ Configure in pyproject.toml:
         help="Only return contracts that match the current edition of the code by comparing integrity hashes.",
     )
     deployments_parser.add_argument(
-        "--limit", default=None, help="Limit the number of deployments to get."
+        "--limit",
+        type=int,
+        default=None,
+        help="Limit the number of deployments to get.",
+    )
+    deployments_parser.add_argument(
+        "--offset",
+        type=int,
+        default=None,
+        help="Skip this many of the most recent deployments, to page through them with --limit.",
+    )
+    deployments_parser.add_argument(
+        "--since",
+        default=None,
+        help="Only get deployments broadcast at or after this time, as a unix timestamp or an ISO 8601 date (local time unless it has a timezone).",
+    )
+    deployments_parser.add_argument(
+        "--until",
+        default=None,
+        help="Only get deployments broadcast at or before this time, as a unix timestamp or an ISO 8601 date (local time unless it has a timezone).",
+    )
+    deployments_parser.add_argument(
+        "--output-format",
+        choices=["text", "ndjson", "csv"],
+        default="text",
+        help="Print the deployments as text, or as one JSON object per line (ndjson) or CSV rows with the fields of the format level.",
     )
     add_network_args_to_parser(deployments_parser)
 
@@ -0,0 +1,29 @@
+import os
+import uuid
+from pathlib import Path
+
+
+def atomic_write(path: Path, data: str | bytes):
+    """Writes ``data`` to a temporary file next to ``path``, then renames it over
+    ``path``, so readers never see a partially written file.
+
+    @dev not a NamedTemporaryFile, so the file keeps the usual file permissions
+
+    :param path: The file to write. Its folder must exist.
+    :type path: Path
+    :param data: The content of the file, written in binary mode if it's bytes.
+    :type data: str | bytes
+    """
+    # @dev unique per write, as threads of the same process may write the same file
+    temp_path = path.with_name(f".tmp_{uuid.uuid4().hex}_{path.name}")
+    try:
+        if isinstance(data, bytes):
+            with open(temp_path, "xb") as f:
+                f.write(data)
+        else:
+            with open(temp_path, "x", encoding="utf-8") as f:
+                f.write(data)
+        os.replace(temp_path, path)
+    except Exception:
+        temp_path.unlink(missing_ok=True)
+        raise
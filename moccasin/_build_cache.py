@@ -0,0 +1,132 @@
+import hashlib
+import json
+from pathlib import Path
+
+import vyper
+
+from moccasin._atomic_write import atomic_write
+from moccasin._import_graph import ImportGraph
+from moccasin.constants.vars import BUILD_MANIFEST_FILE
+from moccasin.logging import logger
+
+MANIFEST_VERSION = 2
+
+
+def compute_cache_key(
+    contract_path: Path,
+    import_graph: ImportGraph,
+    compiler_args: dict | None = None,
+    is_zksync: bool = False,
+) -> str:
+    """Returns a hash of everything that can change the output of compiling
+    ``contract_path``: its source, the source of every file it transitively
+    imports, the compiler version and the compiler arguments.
+
+    @dev file hashes come from the (already refreshed) import graph, so no
+    source is read here.
+    """
+    hasher = hashlib.sha256()
+    settings = {
+        "vyper_version": vyper.__version__,
+        "compiler_args": compiler_args or {},
+        "is_zksync": is_zksync,
+    }
+    hasher.update(json.dumps(settings, sort_keys=True, default=str).encode())
+    hasher.update(import_graph.get_hash(contract_path).encode())
+    for imported in sorted(import_graph.dependencies_of(contract_path)):
+        hasher.update(str(imported).encode())
+        hasher.update(import_graph.get_hash(imported).encode())
+    return hasher.hexdigest()
+
+
+def _hash_file(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+class BuildCache:
+    """Tracks the cache key of every contract compiled into a build folder, so
+    contracts that haven't changed since the last build can be skipped.
+
+    The data is persisted to ``<build_folder>/.manifest``, along with the hash of
+    each contract's source and artifact and the compiler version that built it.
+    """
+
+    def __init__(self, build_folder: Path, project_path: Path):
+        self.build_folder = build_folder
+        self.project_path = project_path
+        self.manifest_path = build_folder.joinpath(BUILD_MANIFEST_FILE)
+        self.contracts: dict[str, dict] = self._load()
+
+    def _load(self) -> dict[str, dict]:
+        if not self.manifest_path.exists():
+            return {}
+        try:
+            with open(self.manifest_path, "r") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            logger.debug(f"Ignoring unreadable build manifest {self.manifest_path}")
+            return {}
+        if data.get("version") != MANIFEST_VERSION:
+            return {}
+        return data.get("contracts", {})
+
+    def _entry_name(self, contract_path: Path) -> str:
+        try:
+            return (
+                contract_path.resolve()
+                .relative_to(self.project_path.resolve())
+                .as_posix()
+            )
+        except ValueError:
+            return contract_path.resolve().as_posix()
+
+    def is_up_to_date(self, contract_path: Path, cache_key: str) -> bool:
+        return self.get_staleness(contract_path, cache_key) is None
+
+    def get_staleness(self, contract_path: Path, cache_key: str) -> str | None:
+        """Returns why the contract needs to be recompiled, or None if it doesn't."""
+        entry = self.contracts.get(self._entry_name(contract_path))
+        if entry is None:
+            return "never compiled"
+        if entry.get("cache_key") != cache_key:
+            if entry.get("vyper_version") != vyper.__version__:
+                return "compiler version changed"
+            return "sources changed"
+        if entry["artifact"] is None:
+            return None
+        artifact_path = self.build_folder.joinpath(entry["artifact"])
+        if not artifact_path.exists():
+            return "artifact missing"
+        if _hash_file(artifact_path) != entry.get("artifact_hash"):
+            return "artifact modified"
+        return None
+
+    def record(self, contract_path: Path, cache_key: str, source_hash: str):
+        artifact = f"{contract_path.stem}.json"
+        self.contracts[self._entry_name(contract_path)] = {
+            "cache_key": cache_key,
+            "source_hash": source_hash,
+            "artifact": artifact,
+            "artifact_hash": _hash_file(self.build_folder.joinpath(artifact)),
+            "vyper_version": vyper.__version__,
+        }
+
+    def record_uninitialized(
+        self, contract_path: Path, cache_key: str, source_hash: str
+    ):
+        """Records a module that has no artifact because it can't be deployed on
+        its own, so it isn't analyzed again until it changes.
+        """
+        self.contracts[self._entry_name(contract_path)] = {
+            "cache_key": cache_key,
+            "source_hash": source_hash,
+            "artifact": None,
+            "artifact_hash": None,
+            "vyper_version": vyper.__version__,
+        }
+
+    def save(self):
+        """Atomically writes the manifest to the build folder."""
+        self.build_folder.mkdir(parents=True, exist_ok=True)
+        data = {"version": MANIFEST_VERSION, "contracts": self.contracts}
+        atomic_write(self.manifest_path, json.dumps(data, indent=4, sort_keys=True))
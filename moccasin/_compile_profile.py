@@ -0,0 +1,152 @@
+import json
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+import vyper
+from vyper.compiler.phases import CompilerData
+
+PROFILE_REPORT_VERSION = 1
+
+# CompilerData's cached properties, and the phase of compilation each one is
+PHASES = {
+    "vyper_module": "parse",
+    "_annotate": "analysis",
+    "_ir_output": "codegen",
+    "assembly": "assembly",
+    "assembly_runtime": "assembly",
+    "bytecode": "bytecode",
+    "bytecode_runtime": "bytecode",
+}
+PHASE_NAMES = ["parse", "analysis", "codegen", "assembly", "bytecode"]
+
+
+def get_peak_rss_mb() -> float | None:
+    """Returns the peak resident memory of this process so far, in MB."""
+    try:
+        import resource
+    except ImportError:
+        # Windows
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # @dev ru_maxrss is in bytes on macOS and in kilobytes everywhere else
+    if sys.platform == "darwin":
+        return max_rss / (1024 * 1024)
+    return max_rss / 1024
+
+
+@contextmanager
+def profile_compilation(profile: dict | None) -> Iterator[None]:
+    """Fills ``profile`` with the wall time, the time spent in each vyper phase
+    and the peak RSS of compiling within the block. Does nothing if ``profile``
+    is None.
+
+    @dev the phases are timed by wrapping CompilerData's cached properties, so
+    only the time a phase itself takes is counted, not the phases it triggers.
+    If boa serves the contract from its disk cache, codegen never runs.
+    """
+    if profile is None:
+        yield
+        return
+
+    timings = {phase: 0.0 for phase in PHASE_NAMES}
+    ran: set[str] = set()
+    stack: list[float] = []
+
+    def timed(func, phase):
+        def wrapper(instance):
+            start = time.perf_counter()
+            stack.append(0.0)
+            try:
+                return func(instance)
+            finally:
+                elapsed = time.perf_counter() - start
+                nested = stack.pop()
+                timings[phase] += elapsed - nested
+                ran.add(phase)
+                if stack:
+                    stack[-1] += elapsed
+
+        return wrapper
+
+    originals = {}
+    for attr, phase in PHASES.items():
+        prop = CompilerData.__dict__[attr]
+        originals[attr] = prop.func
+        prop.func = timed(prop.func, phase)
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        for attr, func in originals.items():
+            CompilerData.__dict__[attr].func = func
+        profile["wall_time"] = time.perf_counter() - start
+        profile["phases"] = timings
+        profile["cache"] = "boa" if ran and "codegen" not in ran else "miss"
+        profile["peak_rss_mb"] = get_peak_rss_mb()
+
+
+def make_skipped_profile(cache: str) -> dict:
+    """Returns the profile of a contract that wasn't compiled because it was
+    served from ``cache``.
+    """
+    return {
+        "wall_time": 0.0,
+        "phases": {phase: 0.0 for phase in PHASE_NAMES},
+        "cache": cache,
+        "peak_rss_mb": None,
+    }
+
+
+def _sort_profiles(profiles: list[dict], sort_by: str) -> list[dict]:
+    if sort_by == "name":
+        return sorted(profiles, key=lambda p: p["contract"])
+    if sort_by == "peak_rss":
+        return sorted(profiles, key=lambda p: p["peak_rss_mb"] or 0, reverse=True)
+    return sorted(profiles, key=lambda p: p["wall_time"], reverse=True)
+
+
+def format_profile_table(profiles: list[dict], sort_by: str = "wall_time") -> str:
+    """Formats the profiles as a plain text table, slowest first by default."""
+    headers = ["Contract", "Cache", "Wall (ms)"]
+    headers += [f"{phase.capitalize()} (ms)" for phase in PHASE_NAMES]
+    headers += ["Peak RSS (MB)"]
+    rows = []
+    for profile in _sort_profiles(profiles, sort_by):
+        peak_rss = profile["peak_rss_mb"]
+        rows.append(
+            [
+                profile["contract"],
+                profile["cache"],
+                f"{profile['wall_time'] * 1000:.0f}",
+                *[f"{profile['phases'][p] * 1000:.0f}" for p in PHASE_NAMES],
+                "-" if peak_rss is None else f"{peak_rss:.0f}",
+            ]
+        )
+    widths = [max(len(row[i]) for row in [headers, *rows]) for i in range(len(headers))]
+    lines = []
+    for i, row in enumerate([headers, *rows]):
+        cells = [row[0].ljust(widths[0])]
+        cells += [cell.rjust(widths[j + 1]) for j, cell in enumerate(row[1:])]
+        lines.append("  ".join(cells))
+        if i == 0:
+            lines.append("  ".join("-" * width for width in widths))
+    return "\n".join(lines)
+
+
+def write_profile_report(profiles: list[dict], report_path: Path):
+    """Writes the profiles as JSON, sorted by contract path so that reports from
+    two runs can be diffed.
+    """
+    report = {
+        "version": PROFILE_REPORT_VERSION,
+        "vyper_version": vyper.__version__,
+        "total_compile_time": sum(p["wall_time"] for p in profiles),
+        "contracts": sorted(profiles, key=lambda p: p["path"]),
+    }
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(report_path, "w") as f:
+        json.dump(report, f, indent=4)
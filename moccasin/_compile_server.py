@@ -0,0 +1,102 @@
+import hashlib
+import json
+import socket
+from pathlib import Path
+from typing import Iterator
+
+from moccasin.constants.vars import (
+    COMPILE_SERVERS_FOLDER,
+    IS_WINDOWS,
+    MOCCASIN_DEFAULT_FOLDER,
+)
+from moccasin.logging import logger
+
+
+class CompileServerError(Exception):
+    """Raised when the compile server reports an error for a request."""
+
+
+def get_socket_path(project_root: Path) -> Path:
+    """Returns the Unix socket the compile server of a project listens on.
+
+    @dev sockets live in the moccasin folder rather than the project, since Unix
+    socket paths are limited to ~100 characters.
+    """
+    project_id = hashlib.sha256(str(project_root.resolve()).encode()).hexdigest()
+    return MOCCASIN_DEFAULT_FOLDER.joinpath(
+        COMPILE_SERVERS_FOLDER, f"{project_id[:16]}.sock"
+    )
+
+
+def encode_message(message: dict) -> bytes:
+    return (json.dumps(message) + "\n").encode("utf-8")
+
+
+class CompileServerClient:
+    """Talks to a running compile server (see ``mox compile-server``) over its
+    Unix socket, using newline delimited JSON messages.
+    """
+
+    def __init__(self, socket_path: Path):
+        self.socket_path = socket_path
+
+    def _request(self, payload: dict) -> Iterator[dict]:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(str(self.socket_path))
+            sock.sendall(encode_message(payload))
+            with sock.makefile("r", encoding="utf-8") as f:
+                for line in f:
+                    message = json.loads(line)
+                    if "error" in message:
+                        raise CompileServerError(message["error"])
+                    yield message
+
+    def ping(self) -> dict:
+        return next(self._request({"op": "ping"}))
+
+    def shutdown(self):
+        for _ in self._request({"op": "shutdown"}):
+            pass
+
+    def compile(
+        self,
+        contracts: list[Path],
+        build_folder: Path,
+        is_zksync: bool = False,
+        write_data: bool = False,
+        profile: bool = False,
+    ) -> Iterator[tuple[Path, bool | None, dict | None]]:
+        """Compiles the contracts on the server, yielding ``(contract_path, compiled,
+        profile)`` as each one finishes, like ``compile_project`` does with its own
+        pool.
+        """
+        payload = {
+            "op": "compile",
+            "contracts": [str(contract) for contract in contracts],
+            "build_folder": str(build_folder),
+            "is_zksync": is_zksync,
+            "write_data": write_data,
+            "profile": profile,
+        }
+        for message in self._request(payload):
+            if message.get("done"):
+                return
+            yield Path(message["contract"]), message["compiled"], message["profile"]
+
+
+def get_compile_server_client(project_root: Path) -> CompileServerClient | None:
+    """Returns a client for the project's compile server, or None if there is no
+    server running for it.
+    """
+    if IS_WINDOWS:
+        return None
+    socket_path = get_socket_path(project_root)
+    if not socket_path.exists():
+        return None
+    client = CompileServerClient(socket_path)
+    try:
+        client.ping()
+    except (OSError, CompileServerError, StopIteration, json.JSONDecodeError):
+        logger.debug(f"Compile server socket {socket_path} is not responding.")
+        return None
+    return client
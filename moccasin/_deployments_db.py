@@ -0,0 +1,337 @@
+import hashlib
+import json
+import sqlite3
+import zlib
+from dataclasses import fields
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator
+
+from boa.deployments import Deployment, DeploymentsDB
+from boa.util.abi import Address
+
+from moccasin.logging import logger
+
+
+def _add_chain_id_column(db: sqlite3.Connection):
+    # @dev boa inserts rows without knowing about this column, so a trigger
+    # fills it in from the transaction.
+    db.execute("ALTER TABLE deployments ADD COLUMN chain_id text")
+    db.execute("UPDATE deployments SET chain_id = json_extract(tx_dict, '$.chainId')")
+    db.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS deployments_set_chain_id
+        AFTER INSERT ON deployments
+        WHEN NEW.chain_id IS NULL
+        BEGIN
+            UPDATE deployments
+            SET chain_id = json_extract(NEW.tx_dict, '$.chainId')
+            WHERE deployment_id = NEW.deployment_id;
+        END
+        """
+    )
+    db.execute(
+        "CREATE INDEX IF NOT EXISTS deployments_chain_id_contract_name "
+        "ON deployments(chain_id, contract_name, broadcast_ts)"
+    )
+    db.execute(
+        "CREATE INDEX IF NOT EXISTS deployments_chain_id_contract_address "
+        "ON deployments(chain_id, contract_address)"
+    )
+
+
+def _add_source_blobs(db: sqlite3.Connection):
+    # @dev existing rows keep their inline source_code, the database may be
+    # read by boa alone, which only knows about that column. Only deployments
+    # inserted with MoccasinDeploymentsDB are stored as blobs.
+    db.execute(
+        """
+        CREATE TABLE IF NOT EXISTS source_blobs(
+            source_hash text primary key,
+            integrity text,
+            data blob not null
+        )
+        """
+    )
+    db.execute("ALTER TABLE deployments ADD COLUMN source_hash text")
+
+
+def _insert_source_blob(db: sqlite3.Connection, source_code: str) -> str:
+    """Stores the JSON ``source_code`` once, compressed, and returns its hash."""
+    source_hash = hashlib.sha256(source_code.encode()).hexdigest()
+    bundle = json.loads(source_code)
+    integrity = bundle.get("integrity") if isinstance(bundle, dict) else None
+    db.execute(
+        "INSERT OR IGNORE INTO source_blobs(source_hash, integrity, data) "
+        "VALUES (?, ?, ?)",
+        (source_hash, integrity, zlib.compress(source_code.encode())),
+    )
+    return source_hash
+
+
+def _add_latest_address_index(db: sqlite3.Connection):
+    # @dev with the address in the index, finding the latest address of a
+    # contract never reads the table
+    db.execute("DROP INDEX IF EXISTS deployments_chain_id_contract_name")
+    db.execute(
+        "CREATE INDEX deployments_chain_id_contract_name "
+        "ON deployments(chain_id, contract_name, broadcast_ts, contract_address)"
+    )
+
+
+# @dev the schema version of a database is the number of migrations applied
+# to it, stored in its ``user_version``. Only ever append to this list.
+MIGRATIONS: list[Callable[[sqlite3.Connection], None]] = [
+    _add_chain_id_column,
+    _add_source_blobs,
+    _add_latest_address_index,
+]
+
+DEPLOYMENT_FIELDS = [field.name for field in fields(Deployment)]
+_ADDRESS_FIELDS = {"contract_address", "deployer"}
+_JSON_FIELDS = {"tx_dict", "receipt_dict", "source_code", "abi"}
+
+
+def migrate_deployments_db(db: sqlite3.Connection):
+    """Applies the migrations the database doesn't have yet."""
+    if _schema_version(db) >= len(MIGRATIONS):
+        return
+    db.commit()
+    # @dev the write lock is taken before reading the version, so two
+    # processes opening the database can't both migrate it
+    db.execute("BEGIN IMMEDIATE")
+    try:
+        version = _schema_version(db)
+        for migration in MIGRATIONS[version:]:
+            migration(db)
+        db.execute(f"PRAGMA user_version = {len(MIGRATIONS)}")
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    if version < len(MIGRATIONS):
+        logger.debug(
+            f"Migrated deployments database from schema version {version} "
+            f"to {len(MIGRATIONS)}"
+        )
+
+
+def _schema_version(db: sqlite3.Connection) -> int:
+    return db.execute("PRAGMA user_version").fetchone()[0]
+
+
+class MoccasinDeploymentsDB(DeploymentsDB):
+    """The boa deployments database, with the schema changes moccasin relies on
+    to look deployments up quickly.
+
+    On top of boa's ``deployments`` table, it adds a ``chain_id`` column (the
+    ``chainId`` of the deployment transaction) and indexes on
+    ``(chain_id, contract_name, broadcast_ts, contract_address)`` and
+    ``(chain_id, contract_address)``. Databases written by an older moccasin, or
+    by boa alone, are migrated when they're opened.
+
+    The source code bundles of the deployments it inserts are stored once per
+    content in a ``source_blobs`` table, compressed, and referenced by their
+    hash from the ``source_hash`` column. Deployments inserted by boa keep
+    their inline ``source_code``.
+    Deployments are read as :class:`StoredDeployment`, which only load their
+    ``source_code`` when it's used. Queries can also select only some of the
+    fields (see :meth:`_get_fieldnames_str`), and the others are read when
+    they're first used.
+
+    :param path: The path of the database, or ``:memory:``.
+    :type path: str | Path
+    """
+
+    def __init__(self, path: str | Path = ":memory:"):
+        super().__init__(path)
+        self._wrapped_db: DeploymentsDB | None = None
+        self._setup()
+
+    @classmethod
+    def wrap(cls, db: DeploymentsDB) -> "MoccasinDeploymentsDB":
+        """Returns a :class:`MoccasinDeploymentsDB` using the connection of a
+        plain boa ``DeploymentsDB``, for example one set with
+        ``boa.deployments.set_deployments_db``. The connection is left to
+        ``db`` to close.
+        """
+        if isinstance(db, MoccasinDeploymentsDB):
+            return db
+        wrapper = cls.__new__(cls)
+        wrapper.db = db.db
+        wrapper._wrapped_db = db
+        wrapper._setup()
+        return wrapper
+
+    def _setup(self):
+        migrate_deployments_db(self.db)
+        # @dev deployments of the same contract usually share their sources
+        self._load_source_code = lru_cache(maxsize=32)(self._read_source_blob)
+        self._integrities: dict[str, str | None] = {}
+
+    def __del__(self):
+        if getattr(self, "_wrapped_db", None) is None:
+            super().__del__()
+
+    def insert_deployment(self, deployment: Deployment):
+        values = deployment.sql_values()
+        source_code = values.pop("source_code")
+        if source_code is not None:
+            values["source_hash"] = _insert_source_blob(self.db, source_code)
+
+        colnames = ",".join(values.keys())
+        values_placeholder = ",".join(["?"] * len(values))
+        self.db.execute(
+            f"INSERT INTO deployments({colnames}) VALUES({values_placeholder})",
+            tuple(values.values()),
+        )
+        self.db.commit()
+
+    def _get_fieldnames_str(self, columns: Iterable[str] | None = None) -> str:
+        """Returns the columns to select for deployments.
+
+        :param columns: The fields of the deployments to read, or None for all
+            of them. The other fields are read when they're first used.
+        """
+        if columns is None:
+            return super()._get_fieldnames_str() + ",source_hash"
+        columns = set(columns)
+        unknown = columns.difference(DEPLOYMENT_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown deployment fields: {', '.join(sorted(unknown))}")
+        # @dev deployment_id is the rowid, which every index holds
+        selected = [
+            name
+            for name in DEPLOYMENT_FIELDS
+            if name in columns or name == "deployment_id"
+        ]
+        if "source_code" in columns:
+            selected.append("source_hash")
+        return ",".join(selected)
+
+    def _get_deployments_from_sql(
+        self, sql_query: str, parameters=(), /
+    ) -> Iterator["StoredDeployment"]:
+        cursor = self.db.execute(sql_query, parameters)
+        column_names = [column[0] for column in cursor.description]
+        return (self._make_deployment(dict(zip(column_names, row))) for row in cursor)
+
+    def _make_deployment(self, row: dict[str, Any]) -> "StoredDeployment":
+        values = self._decode_row(row)
+        for name in DEPLOYMENT_FIELDS:
+            if name not in values:
+                values[name] = _UnloadedField(self, values["deployment_id"])
+        return StoredDeployment(**values)
+
+    def _decode_row(self, row: dict[str, Any]) -> dict[str, Any]:
+        source_hash = row.pop("source_hash", None)
+        for name in _ADDRESS_FIELDS.intersection(row):
+            row[name] = Address(row[name])
+        for name in _JSON_FIELDS.intersection(row):
+            if row[name] is not None:
+                row[name] = json.loads(row[name])
+        if "source_code" in row and row["source_code"] is None and source_hash:
+            row["source_code"] = _SourceBlob(self, source_hash)
+        return row
+
+    def _read_field(self, deployment_id: int, name: str) -> Any:
+        columns = self._get_fieldnames_str([name])
+        row = self.db.execute(
+            f"SELECT {columns} FROM deployments WHERE deployment_id = ?",
+            (deployment_id,),
+        ).fetchone()
+        return self._decode_row(dict(zip(columns.split(","), row)))[name]
+
+    def _read_source_blob(self, source_hash: str) -> str:
+        (data,) = self.db.execute(
+            "SELECT data FROM source_blobs WHERE source_hash = ?", (source_hash,)
+        ).fetchone()
+        return zlib.decompress(data).decode()
+
+    def _get_integrity(self, source_hash: str) -> str | None:
+        if source_hash not in self._integrities:
+            (integrity,) = self.db.execute(
+                "SELECT integrity FROM source_blobs WHERE source_hash = ?",
+                (source_hash,),
+            ).fetchone()
+            self._integrities[source_hash] = integrity
+        return self._integrities[source_hash]
+
+
+class _SourceBlob:
+    """The source code of a deployment, not loaded from the database yet."""
+
+    def __init__(self, db: MoccasinDeploymentsDB, source_hash: str):
+        self.db = db
+        self.source_hash = source_hash
+
+    def load(self) -> Any:
+        return json.loads(self.db._load_source_code(self.source_hash))
+
+
+class _UnloadedField:
+    """A field of a deployment its query didn't select."""
+
+    def __init__(self, db: MoccasinDeploymentsDB, deployment_id: int):
+        self.db = db
+        self.deployment_id = deployment_id
+
+    def load(self, name: str) -> Any:
+        return self.db._read_field(self.deployment_id, name)
+
+
+class _LazyField:
+    """A field of a :class:`StoredDeployment`, read from the database the first
+    time it's used if it wasn't read with the deployment.
+    """
+
+    def __set_name__(self, owner: type, name: str):
+        self.name = name
+
+    def __get__(self, deployment: "StoredDeployment | None", owner: type) -> Any:
+        if deployment is None:
+            return self
+        value = deployment.__dict__[self.name]
+        if isinstance(value, _UnloadedField):
+            value = value.load(self.name)
+        if isinstance(value, _SourceBlob):
+            value = value.load()
+        deployment.__dict__[self.name] = value
+        return value
+
+    def __set__(self, deployment: "StoredDeployment", value: Any):
+        # @dev only called by the (frozen) dataclass __init__
+        deployment.__dict__[self.name] = value
+
+
+class StoredDeployment(Deployment):
+    """A deployment read from a :class:`MoccasinDeploymentsDB`. Its
+    ``source_code``, and the fields its query didn't select, are read from the
+    database the first time they're used.
+    """
+
+    contract_address = _LazyField()
+    contract_name = _LazyField()
+    filename = _LazyField()
+    rpc = _LazyField()
+    deployer = _LazyField()
+    tx_hash = _LazyField()
+    broadcast_ts = _LazyField()
+    tx_dict = _LazyField()
+    receipt_dict = _LazyField()
+    source_code = _LazyField()
+    abi = _LazyField()
+    session_id = _LazyField()
+
+    @property
+    def integrity(self) -> str | None:
+        """The integrity hash of the source code, read without loading it."""
+        source_code = self.__dict__["source_code"]
+        if isinstance(source_code, _UnloadedField):
+            source_code = source_code.db._read_field(self.deployment_id, "source_code")
+            self.__dict__["source_code"] = source_code
+        if isinstance(source_code, _SourceBlob):
+            return source_code.db._get_integrity(source_code.source_hash)
+        if isinstance(source_code, dict):
+            return source_code.get("integrity")
+        return None
@@ -0,0 +1,403 @@
+import hashlib
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import BinaryIO, Protocol
+
+import requests  # type: ignore
+
+from moccasin._atomic_write import atomic_write
+from moccasin.logging import logger
+
+# @dev a dropped connection loses the chunk being received
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+# Seconds to wait for the server to connect or send more data
+DOWNLOAD_TIMEOUT = 30
+DOWNLOAD_RETRIES = 5
+# The wait before the first retry, doubled after every failed attempt
+DOWNLOAD_BACKOFF_SECONDS = 1.0
+DOWNLOAD_MAX_BACKOFF_SECONDS = 30.0
+# Files at least this big are downloaded in parallel ranges when the server
+# supports it
+PARALLEL_DOWNLOAD_MIN_SIZE = 16 * 1024 * 1024
+PARALLEL_DOWNLOAD_PARTS = 4
+
+RETRYABLE_STATUS_CODES = {408, 425, 429, 500, 502, 503, 504}
+
+
+class Progress(Protocol):
+    def add_total(self, size: int): ...
+
+    def update(self, size: int): ...
+
+
+class _RestartDownload(Exception):
+    """The file changed on the server since the checkpoint was written, or the
+    checkpoint doesn't hold the file it should.
+    """
+
+
+class _CorruptDownload(_RestartDownload):
+    """The downloaded file doesn't have the expected size or sha256."""
+
+
+class ResumableDownload:
+    """Downloads a file to a checkpoint in ``checkpoint_folder`` that survives
+    failures, so a dropped connection is retried with exponential backoff and
+    resumes from the bytes already received with an HTTP ``Range`` request,
+    within this install or the next one.
+
+    Resuming needs the server to accept ranges and to give the file an
+    ``ETag`` or ``Last-Modified`` validator, sent back with ``If-Range`` so a
+    file that changed since is downloaded again from the start. Big files are
+    also split in ranges downloaded in parallel, each checkpointed separately.
+
+    The checkpoint of a URL is locked while it's used. A concurrent download of
+    the same URL, e.g. by another install, uses a checkpoint of its own instead.
+
+    :param session: The session used for the requests.
+    :type session: requests.Session
+    :param url: The URL of the file.
+    :type url: str
+    :param checkpoint_folder: Where the partial files are kept.
+    :type checkpoint_folder: Path
+    :param progress: Told about the size of the file and every received chunk.
+    :type progress: Progress | None
+    :param expected_sha256: The sha256 the file must have, if known.
+    :type expected_sha256: str | None
+    """
+
+    def __init__(
+        self,
+        session: requests.Session,
+        url: str,
+        checkpoint_folder: Path,
+        progress: Progress | None = None,
+        expected_sha256: str | None = None,
+    ):
+        self.session = session
+        self.url = url
+        self.progress = progress
+        self.expected_sha256 = expected_sha256
+        self.checkpoint_folder = checkpoint_folder
+        self._set_key(hashlib.sha256(url.encode()).hexdigest())
+        self._lock_file: BinaryIO | None = None
+        self._private_checkpoint = False
+        self.final_url = url
+        self.sha256: str | None = None
+        self._state: dict = {}
+        self._progress_lock = threading.Lock()
+        self._received = 0
+        self._total_reported = False
+
+    def _set_key(self, key: str):
+        self.state_path = self.checkpoint_folder.joinpath(f"{key}.json")
+        self.file_path = self.checkpoint_folder.joinpath(f"{key}.part")
+        self.lock_path = self.checkpoint_folder.joinpath(f"{key}.lock")
+
+    def run(self) -> Path:
+        """Downloads the file, retrying failed attempts, and checks its size and
+        sha256 (stored in :attr:`sha256`).
+
+        :return: The path of the downloaded file, to :meth:`discard` once used.
+        """
+        self.checkpoint_folder.mkdir(parents=True, exist_ok=True)
+        self._lock()
+        try:
+            return self._run()
+        except BaseException:
+            if self._private_checkpoint:
+                # @dev no other download will ever resume it
+                self._delete_checkpoint()
+            # @dev otherwise the checkpoint is kept for the next attempt
+            self._unlock()
+            raise
+
+    def _run(self) -> Path:
+        self._state = self._read_state()
+        attempt = 0
+        corrupt_restart = False
+        while True:
+            try:
+                if self._state.get("parts"):
+                    self._download_parts()
+                else:
+                    self._download_single()
+                self._verify()
+                return self.file_path
+            except Exception as e:
+                if isinstance(e, _CorruptDownload):
+                    # @dev a corrupt file is only downloaded again once
+                    if corrupt_restart:
+                        raise ValueError(str(e)) from None
+                    corrupt_restart = True
+                restart = isinstance(e, _RestartDownload)
+                if not (restart or _is_retryable(e)) or attempt >= DOWNLOAD_RETRIES:
+                    raise
+                attempt += 1
+                if restart:
+                    logger.debug(f"Starting the download of {self.url} over")
+                    self._delete_checkpoint()
+                    self._state = {}
+                    continue
+                delay = min(
+                    DOWNLOAD_BACKOFF_SECONDS * 2 ** (attempt - 1),
+                    DOWNLOAD_MAX_BACKOFF_SECONDS,
+                )
+                logger.warning(
+                    f"Download of {self.url} failed ({e}), retrying in {delay:g}s "
+                    f"({attempt}/{DOWNLOAD_RETRIES})"
+                )
+                time.sleep(delay)
+
+    def discard(self):
+        """Deletes the downloaded file and its checkpoints."""
+        self._delete_checkpoint()
+        self._unlock()
+
+    def _delete_checkpoint(self):
+        for part in range(self._state.get("parts") or 0):
+            _unlink(self._part_path(part))
+        _unlink(self.file_path)
+        _unlink(self.state_path)
+
+    def _lock(self):
+        """Locks the checkpoint, or switches to a checkpoint of this download
+        alone if another download holds the lock.
+        """
+        # @dev lock files are never deleted, so two downloads can't each lock
+        # a different file for the same checkpoint. The file is held open for as
+        # long as the lock is.
+        lock_file = open(self.lock_path, "ab")  # noqa: SIM115
+        if _try_lock(lock_file):
+            self._lock_file = lock_file
+            return
+        lock_file.close()
+        logger.debug(f"{self.url} is being downloaded by another process")
+        self._private_checkpoint = True
+        key = hashlib.sha256(f"{self.url}{uuid.uuid4()}".encode()).hexdigest()
+        self._set_key(f"private_{key}")
+
+    def _unlock(self):
+        # @dev closing the file releases the lock
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+    def _verify(self):
+        """Checks the downloaded file has the size the server gave and the
+        expected sha256, and sets :attr:`sha256`.
+        """
+        self.sha256 = None
+        size = self._state.get("size")
+        if size is not None and _file_size(self.file_path) != size:
+            raise _CorruptDownload(
+                f"{self.url} is {_file_size(self.file_path)} bytes, expected {size}"
+            )
+        hasher = hashlib.sha256()
+        with open(self.file_path, "rb") as f:
+            for data in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b""):
+                hasher.update(data)
+        if self.expected_sha256 not in (None, hasher.hexdigest()):
+            raise _CorruptDownload(
+                f"{self.url} has sha256 {hasher.hexdigest()}, "
+                f"expected {self.expected_sha256}"
+            )
+        self.sha256 = hasher.hexdigest()
+
+    def _get(self, headers: dict) -> requests.Response:
+        # @dev ranges must count bytes of the file itself, not of a compressed
+        # encoding of it
+        headers = {"Accept-Encoding": "identity", **headers}
+        return self.session.get(
+            self.url, headers=headers, stream=True, timeout=DOWNLOAD_TIMEOUT
+        )
+
+    def _download_single(self):
+        offset = _file_size(self.file_path) if self._state.get("validator") else 0
+        headers = {}
+        if offset:
+            headers = {
+                "Range": f"bytes={offset}-",
+                "If-Range": self._state["validator"],
+            }
+        with self._get(headers) as response:
+            if offset and response.status_code == 416:
+                # @dev the checkpoint already holds the whole file
+                if offset == self._state.get("size"):
+                    return
+                raise _RestartDownload()
+            response.raise_for_status()
+            self.final_url = response.url
+            if response.status_code == 206:
+                logger.debug(f"Resuming download of {self.url} at byte {offset}")
+                self._report_total(self._state.get("size"))
+                self._report_received(offset)
+            else:
+                offset = 0
+                size = _content_length(response)
+                self._state = {"validator": _validator(response), "size": size}
+                self._report_total(size)
+                if self._can_split(response):
+                    self._state["parts"] = PARALLEL_DOWNLOAD_PARTS
+                    self._write_state()
+                    response.close()
+                    self._download_parts()
+                    return
+                self._write_state()
+                self._report_received(0)
+            with open(self.file_path, "ab" if offset else "wb") as f:
+                for data in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+                    f.write(data)
+                    self._report_received(len(data), relative=True)
+
+    def _can_split(self, response: requests.Response) -> bool:
+        size = self._state["size"]
+        return (
+            size is not None
+            and size >= PARALLEL_DOWNLOAD_MIN_SIZE
+            and response.headers.get("Accept-Ranges") == "bytes"
+            and self._state["validator"] is not None
+        )
+
+    def _part_path(self, part: int) -> Path:
+        return self.file_path.with_name(f"{self.file_path.name}{part}")
+
+    def _part_range(self, part: int) -> tuple[int, int]:
+        size, parts = self._state["size"], self._state["parts"]
+        part_size = -(-size // parts)
+        return part * part_size, min(size, (part + 1) * part_size) - 1
+
+    def _download_parts(self):
+        parts = self._state["parts"]
+        self._report_total(self._state["size"])
+        self._report_received(
+            sum(_file_size(self._part_path(part)) for part in range(parts))
+        )
+        with ThreadPoolExecutor(max_workers=parts) as executor:
+            # @dev list() re-raises the first error once every part is done
+            list(executor.map(self._download_part, range(parts)))
+        with open(self.file_path, "wb") as f:
+            for part in range(parts):
+                with open(self._part_path(part), "rb") as part_file:
+                    shutil.copyfileobj(part_file, f, DOWNLOAD_CHUNK_SIZE)
+        for part in range(parts):
+            _unlink(self._part_path(part))
+        # @dev from now on the checkpoint is a single complete file
+        self._state["parts"] = None
+        self._write_state()
+
+    def _download_part(self, part: int):
+        start, end = self._part_range(part)
+        part_path = self._part_path(part)
+        offset = _file_size(part_path)
+        if start + offset > end:
+            return
+        headers = {
+            "Range": f"bytes={start + offset}-{end}",
+            "If-Range": self._state["validator"],
+        }
+        with self._get(headers) as response:
+            response.raise_for_status()
+            if response.status_code != 206:
+                raise _RestartDownload()
+            self.final_url = response.url
+            with open(part_path, "ab") as f:
+                for data in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+                    f.write(data)
+                    self._report_received(len(data), relative=True)
+
+    def _read_state(self) -> dict:
+        try:
+            with open(self.state_path, "r") as f:
+                state = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+        return state if state.get("url") == self.url else {}
+
+    def _write_state(self):
+        atomic_write(self.state_path, json.dumps({"url": self.url, **self._state}))
+
+    def _report_total(self, size: int | None):
+        if self.progress is not None and size and not self._total_reported:
+            self._total_reported = True
+            self.progress.add_total(size)
+
+    def _report_received(self, size: int, relative: bool = False):
+        """Tells the progress how many bytes were received so far, including
+        the ones of previous attempts.
+        """
+        with self._progress_lock:
+            delta = size if relative else size - self._received
+            self._received += delta
+        if self.progress is not None and delta:
+            self.progress.update(delta)
+
+
+def _try_lock(file: BinaryIO) -> bool:
+    """Takes an exclusive lock on ``file`` without waiting for it.
+
+    :return: False if another process holds the lock.
+    """
+    try:
+        if sys.platform == "win32":
+            import msvcrt
+
+            msvcrt.locking(file.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        return False
+    return True
+
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, requests.HTTPError):
+        response = error.response
+        return response is not None and response.status_code in RETRYABLE_STATUS_CODES
+    return isinstance(
+        error,
+        (
+            requests.ConnectionError,
+            requests.Timeout,
+            requests.exceptions.ChunkedEncodingError,
+        ),
+    )
+
+
+def _validator(response: requests.Response) -> str | None:
+    etag = response.headers.get("ETag")
+    # @dev weak ETags can't be used with If-Range
+    if etag and not etag.startswith("W/"):
+        return etag
+    return response.headers.get("Last-Modified")
+
+
+def _content_length(response: requests.Response) -> int | None:
+    # @dev a compressed response's length isn't the length of the file
+    if response.headers.get("Content-Encoding") not in (None, "identity"):
+        return None
+    length = response.headers.get("Content-Length")
+    return int(length) if length is not None else None
+
+
+def _file_size(path: Path) -> int:
+    try:
+        return path.stat().st_size
+    except FileNotFoundError:
+        return 0
+
+
+def _unlink(path: Path):
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,98 @@
+import hashlib
+import json
+import time
+from pathlib import Path
+from typing import Any
+
+import requests  # type: ignore
+
+from moccasin._atomic_write import atomic_write
+from moccasin.logging import logger
+
+HTTP_CACHE_VERSION = 1
+
+
+class HttpCache:
+    """An on-disk cache of JSON API responses, used for GitHub's release and tag
+    lookups.
+
+    A response younger than ``ttl_seconds`` is used without any request. Older
+    ones are revalidated with ``If-None-Match``, and GitHub doesn't count the
+    ``304 Not Modified`` answer against its rate limit.
+
+    :param cache_folder: Where the responses are stored.
+    :type cache_folder: Path
+    :param ttl_seconds: How long a response is used without revalidating it.
+    :type ttl_seconds: int
+    """
+
+    def __init__(self, cache_folder: Path, ttl_seconds: int):
+        self.cache_folder = cache_folder
+        self.ttl_seconds = ttl_seconds
+
+    def _entry_path(self, session: requests.Session, url: str) -> Path:
+        # @dev responses can depend on who asks (private repositories)
+        authorization = session.headers.get("Authorization", "")
+        key = hashlib.sha256(f"{url}\n{authorization}".encode()).hexdigest()
+        return self.cache_folder.joinpath(f"{key}.json")
+
+    def _read(self, entry_path: Path) -> dict | None:
+        try:
+            with open(entry_path, "r") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, json.JSONDecodeError):
+            logger.debug(f"Ignoring unreadable HTTP cache entry {entry_path}")
+            return None
+        if entry.get("version") != HTTP_CACHE_VERSION:
+            return None
+        return entry
+
+    def _write(self, entry_path: Path, entry: dict):
+        entry_path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write(entry_path, json.dumps(entry))
+
+    def get_json(
+        self, session: requests.Session, url: str, raise_for_status: bool = False
+    ) -> Any | None:
+        """Returns the JSON body of a GET to ``url``, from the cache if possible.
+
+        :param raise_for_status: Raise ``requests.HTTPError`` instead of returning
+            None when the response isn't a 200.
+        :return: The JSON body, or None if the response isn't a 200.
+        """
+        entry_path = self._entry_path(session, url)
+        entry = self._read(entry_path)
+        now = time.time()
+        if entry is not None and now - entry["fetched_at"] < self.ttl_seconds:
+            logger.debug(f"Using cached response for {url}")
+            return entry["body"]
+
+        headers = {}
+        if entry is not None and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        response = session.get(url, headers=headers)
+
+        if response.status_code == 304 and entry is not None:
+            logger.debug(f"{url} not modified, using cached response")
+            entry["fetched_at"] = now
+            self._write(entry_path, entry)
+            return entry["body"]
+        if response.status_code != 200:
+            if raise_for_status:
+                response.raise_for_status()
+            return None
+
+        body = response.json()
+        self._write(
+            entry_path,
+            {
+                "version": HTTP_CACHE_VERSION,
+                "url": url,
+                "etag": response.headers.get("ETag"),
+                "fetched_at": now,
+                "body": body,
+            },
+        )
+        return body
@@ -0,0 +1,301 @@
+import hashlib
+import json
+import os
+import re
+import sys
+from pathlib import Path
+from typing import Iterable
+
+from moccasin._atomic_write import atomic_write
+from moccasin.logging import logger
+
+VYPER_SOURCE_SUFFIXES = (".vy", ".vyi")
+VYPER_IMPORT_SUFFIXES = (".vy", ".vyi", ".json")
+
+_IMPORT_PATTERN = re.compile(r"^import\s+([\w.]+)", re.MULTILINE)
+_FROM_IMPORT_PATTERN = re.compile(
+    r"^from\s+(\.*[\w.]*)\s+import\s+(\([^)]*\)|[^\n#]+)", re.MULTILINE
+)
+_AS_PATTERN = re.compile(r"\s+as\s+\w+")
+
+IMPORT_GRAPH_VERSION = 1
+
+
+def get_compiler_search_paths() -> list[Path]:
+    """Returns the search paths the vyper compiler uses for absolute imports,
+    highest precedence first.
+    """
+    return [Path.cwd(), *[Path(p) for p in sys.path if p]]
+
+
+def parse_imports(source_code: str) -> list[str]:
+    """Returns the module paths imported by a Vyper source, in dotted notation.
+
+    ``import a.b as c`` gives ``a.b`` and ``from a import b, c`` gives ``a.b`` and
+    ``a.c``. Relative imports keep their leading dots, e.g. ``from . import b``
+    gives ``.b``.
+
+    @dev This is a lightweight textual scan so we don't need to parse the full AST.
+    It may over-report (e.g. an import-looking line inside a docstring), which is
+    fine for cache invalidation purposes.
+    """
+    modules: list[str] = []
+    for match in _IMPORT_PATTERN.finditer(source_code):
+        modules.append(match.group(1))
+    for match in _FROM_IMPORT_PATTERN.finditer(source_code):
+        base, names = match.group(1), match.group(2)
+        names = _AS_PATTERN.sub("", names.strip().strip("()"))
+        for name in names.split(","):
+            name = name.strip()
+            if not name:
+                continue
+            if base.endswith(".") or base == "":
+                modules.append(f"{base}{name}")
+            else:
+                modules.append(f"{base}.{name}")
+    return modules
+
+
+def resolve_import(
+    module: str, importer_path: Path, search_paths: list[Path]
+) -> Path | None:
+    """Resolves a dotted module path to a file on disk, following vyper's
+    resolution order: the importer's directory first, then the search paths.
+
+    Builtin interfaces (e.g. ``ethereum.ercs``) don't exist on disk and
+    resolve to ``None``.
+    """
+    level = len(module) - len(module.lstrip("."))
+    module_parts = module.lstrip(".").split(".")
+
+    if level > 0:
+        base = importer_path.parent
+        for _ in range(level - 1):
+            base = base.parent
+        bases = [base]
+    else:
+        bases = [importer_path.parent, *search_paths]
+
+    relative_path = Path(*module_parts)
+    for base in bases:
+        for suffix in VYPER_IMPORT_SUFFIXES:
+            candidate = base.joinpath(relative_path).with_suffix(suffix)
+            if candidate.is_file():
+                return candidate.resolve()
+    return None
+
+
+class ImportGraph:
+    """An index of which Vyper files import which, over every ``.vy`` and ``.vyi``
+    file under the given roots (and any file they import from outside them).
+
+    The graph can be persisted to disk, and :meth:`refresh` only re-reads files
+    whose modification time or size changed since the last snapshot.
+
+    :param roots: The directories to scan for Vyper files.
+    :type roots: list[Path]
+    :param search_paths: The search paths used to resolve absolute imports.
+    :type search_paths: list[Path]
+    :param graph_path: Where to persist the graph. If None, it's kept in memory.
+    :type graph_path: Path | None
+    """
+
+    def __init__(
+        self,
+        roots: list[Path],
+        search_paths: list[Path],
+        graph_path: Path | None = None,
+    ):
+        self.roots = [root.resolve() for root in roots]
+        self.search_paths = search_paths
+        self.graph_path = graph_path
+        self._nodes: dict[str, dict] = {}
+        self._dependents: dict[str, set[str]] = {}
+        self._last_changed: set[str] = set()
+        self._search_paths_changed = True
+        if graph_path is not None:
+            self._load(graph_path)
+
+    def _load(self, graph_path: Path):
+        if not graph_path.exists():
+            return
+        try:
+            with open(graph_path, "r") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            logger.debug(f"Ignoring unreadable import graph {graph_path}")
+            return
+        if data.get("version") != IMPORT_GRAPH_VERSION:
+            return
+        self._nodes = data.get("files", {})
+        self._search_paths_changed = data.get("search_paths") != [
+            str(p) for p in self.search_paths
+        ]
+        self._rebuild_dependents()
+
+    def save(self):
+        """Atomically persists the graph to ``graph_path``."""
+        if self.graph_path is None:
+            return
+        self.graph_path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            "version": IMPORT_GRAPH_VERSION,
+            "search_paths": [str(p) for p in self.search_paths],
+            "files": self._nodes,
+        }
+        atomic_write(self.graph_path, json.dumps(data))
+
+    # ------------------------------------------------------------------
+    #                             UPDATING
+    # ------------------------------------------------------------------
+    def refresh(self) -> set[Path]:
+        """Brings the graph up to date with the filesystem.
+
+        :return: The files that were added, modified or removed since the last refresh.
+        :rtype: set[Path]
+        """
+        candidates = set(self._scan_roots())
+        # @dev files imported from outside the roots (e.g. site-packages) are
+        # tracked as well, for as long as they exist
+        for name in self._nodes:
+            if Path(name).is_file():
+                candidates.add(name)
+
+        changed: set[str] = set()
+        for name in list(self._nodes):
+            if name not in candidates:
+                del self._nodes[name]
+                changed.add(name)
+        files_added_or_removed = len(changed) > 0
+
+        for name in candidates:
+            is_new = name not in self._nodes
+            if self._update_node(name):
+                changed.add(name)
+                files_added_or_removed = files_added_or_removed or is_new
+
+        # @dev a new or deleted file can change how *other* files' imports
+        # resolve, so everything is re-resolved in that case
+        if files_added_or_removed or self._search_paths_changed:
+            to_resolve = set(self._nodes)
+        else:
+            to_resolve = {name for name in changed if name in self._nodes}
+        self._resolve_nodes(to_resolve, changed)
+
+        self._search_paths_changed = False
+        self._rebuild_dependents()
+        self._last_changed = changed
+        return {Path(name) for name in changed}
+
+    def _scan_roots(self) -> Iterable[str]:
+        for root in self.roots:
+            if not root.is_dir():
+                continue
+            for dirpath, dirnames, filenames in os.walk(root):
+                dirnames[:] = [
+                    d for d in dirnames if not d.startswith(".") and d != "__pycache__"
+                ]
+                for filename in filenames:
+                    if filename.endswith(VYPER_SOURCE_SUFFIXES):
+                        yield Path(dirpath, filename).as_posix()
+
+    def _update_node(self, name: str) -> bool:
+        """Re-reads the file if it changed on disk. Returns True if it did."""
+        stat = os.stat(name)
+        node = self._nodes.get(name)
+        if (
+            node is not None
+            and node["mtime_ns"] == stat.st_mtime_ns
+            and node["size"] == stat.st_size
+        ):
+            return False
+        content = Path(name).read_bytes()
+        modules = []
+        if not name.endswith(".json"):
+            modules = parse_imports(content.decode("utf-8", errors="replace"))
+        self._nodes[name] = {
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "sha256": hashlib.sha256(content).hexdigest(),
+            "modules": modules,
+        }
+        return True
+
+    def _resolve_nodes(self, to_resolve: set[str], changed: set[str]):
+        while to_resolve:
+            new_nodes = set()
+            for name in to_resolve:
+                node = self._nodes[name]
+                imports = []
+                for module in node["modules"]:
+                    resolved = resolve_import(module, Path(name), self.search_paths)
+                    if resolved is None:
+                        continue
+                    resolved_name = resolved.as_posix()
+                    imports.append(resolved_name)
+                    if resolved_name not in self._nodes:
+                        self._update_node(resolved_name)
+                        changed.add(resolved_name)
+                        new_nodes.add(resolved_name)
+                node["imports"] = sorted(set(imports))
+            to_resolve = new_nodes
+
+    def _rebuild_dependents(self):
+        self._dependents = {name: set() for name in self._nodes}
+        for name, node in self._nodes.items():
+            for imported in node.get("imports", []):
+                self._dependents.setdefault(imported, set()).add(name)
+
+    # ------------------------------------------------------------------
+    #                              QUERIES
+    # ------------------------------------------------------------------
+    @property
+    def files(self) -> set[Path]:
+        return {Path(name) for name in self._nodes}
+
+    def get_hash(self, path: Path) -> str:
+        """Returns the sha256 of the file's content as of the last refresh."""
+        return self._nodes[self._key(path)]["sha256"]
+
+    def dependencies_of(self, path: Path, transitive: bool = True) -> set[Path]:
+        """What does ``path`` import?"""
+        return self._walk(
+            self._key(path), lambda n: self._nodes[n].get("imports", []), transitive
+        )
+
+    def dependents_of(self, path: Path, transitive: bool = True) -> set[Path]:
+        """What imports ``path``?"""
+        return self._walk(
+            self._key(path), lambda n: self._dependents.get(n, ()), transitive
+        )
+
+    def affected_by(self, paths: Iterable[Path]) -> set[Path]:
+        """Returns the given files plus every file that transitively imports them."""
+        affected = set()
+        for path in paths:
+            affected.add(Path(self._key(path)))
+            if self._key(path) in self._nodes:
+                affected |= self.dependents_of(path)
+        return affected
+
+    def changed_since_last_build(self) -> set[Path]:
+        """Returns the files that changed in the last :meth:`refresh`."""
+        return {Path(name) for name in self._last_changed}
+
+    def _walk(self, start: str, neighbours, transitive: bool) -> set[Path]:
+        if start not in self._nodes:
+            raise KeyError(f"{start} is not part of the import graph.")
+        seen: set[str] = set()
+        to_visit = [start]
+        while to_visit:
+            current = to_visit.pop()
+            for neighbour in neighbours(current):
+                if neighbour not in seen and neighbour != start:
+                    seen.add(neighbour)
+                    if transitive:
+                        to_visit.append(neighbour)
+        return {Path(name) for name in seen}
+
+    @staticmethod
+    def _key(path: Path) -> str:
+        return Path(path).resolve().as_posix()
@@ -0,0 +1,83 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from moccasin._atomic_write import atomic_write
+from moccasin.constants.vars import (
+    GITHUB,
+    INSTALL_STATE_FILE,
+    PACKAGE_VERSION_FILE,
+    PYPI,
+)
+
+INSTALL_STATE_VERSION = 1
+
+
+def compute_install_fingerprint(requirements: list[str], install_path: Path) -> str:
+    """Returns a fingerprint of the declared dependencies and of what is
+    installed for them in ``install_path``.
+
+    Only the requirement strings, the GitHub ``versions.toml`` and the names of
+    the installed packages are hashed, so computing it needs no network access
+    and no pip subprocess. A pip upgrade changes the name of its
+    ``.dist-info`` folder, and a GitHub install or purge changes
+    ``versions.toml``, so either changes the fingerprint.
+    """
+    hasher = hashlib.sha256()
+    header = {
+        "version": INSTALL_STATE_VERSION,
+        "requirements": sorted(r.strip() for r in requirements),
+    }
+    hasher.update(json.dumps(header).encode())
+
+    versions_path = install_path.joinpath(GITHUB, PACKAGE_VERSION_FILE)
+    try:
+        hasher.update(versions_path.read_bytes())
+    except FileNotFoundError:
+        pass
+
+    github_path = install_path.joinpath(GITHUB)
+    pypi_path = install_path.joinpath(PYPI)
+    installed = [f"{PYPI}/{name}" for name in _list_dir(pypi_path)]
+    for org in _list_dir(github_path):
+        if github_path.joinpath(org).is_dir():
+            repos = _list_dir(github_path.joinpath(org))
+            installed += [f"{GITHUB}/{org}/{repo}" for repo in repos]
+    hasher.update("\n".join(installed).encode())
+    return hasher.hexdigest()
+
+
+def _list_dir(path: Path) -> list[str]:
+    try:
+        return sorted(os.listdir(path))
+    except (FileNotFoundError, NotADirectoryError):
+        return []
+
+
+def is_install_up_to_date(requirements: list[str], install_path: Path) -> bool:
+    """Returns True if ``requirements`` were installed into ``install_path`` by
+    a previous install and nothing was changed since.
+    """
+    state_path = install_path.joinpath(INSTALL_STATE_FILE)
+    try:
+        with open(state_path, "r") as f:
+            state = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return False
+    if state.get("version") != INSTALL_STATE_VERSION:
+        return False
+    return state.get("fingerprint") == compute_install_fingerprint(
+        requirements, install_path
+    )
+
+
+def record_install_state(requirements: list[str], install_path: Path):
+    """Atomically saves the fingerprint of a successful install of
+    ``requirements``.
+    """
+    state = {
+        "version": INSTALL_STATE_VERSION,
+        "fingerprint": compute_install_fingerprint(requirements, install_path),
+    }
+    atomic_write(install_path.joinpath(INSTALL_STATE_FILE), json.dumps(state))
@@ -0,0 +1,56 @@
+import json
+from pathlib import Path
+
+from moccasin._atomic_write import atomic_write
+from moccasin.constants.vars import INTEGRITY_CACHE_FILE
+from moccasin.logging import logger
+
+INTEGRITY_CACHE_VERSION = 1
+
+
+class IntegrityCache:
+    """Remembers the integrity hash of each contract's verification bundle, so
+    deployments can be checked against the project's sources without compiling
+    them again.
+
+    An entry is only used while the contract's cache key (see
+    :func:`moccasin._build_cache.compute_cache_key`) is the one it was computed
+    for. The data is persisted to ``<build_folder>/.integrity_cache``.
+
+    :param build_folder: The build folder of the project.
+    :type build_folder: Path
+    """
+
+    def __init__(self, build_folder: Path):
+        self.build_folder = build_folder
+        self.cache_path = build_folder.joinpath(INTEGRITY_CACHE_FILE)
+        self.contracts: dict[str, dict] = self._load()
+
+    def _load(self) -> dict[str, dict]:
+        try:
+            with open(self.cache_path, "r") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, json.JSONDecodeError):
+            logger.debug(f"Ignoring unreadable integrity cache {self.cache_path}")
+            return {}
+        if data.get("version") != INTEGRITY_CACHE_VERSION:
+            return {}
+        return data.get("contracts", {})
+
+    def get(self, contract_path: Path, cache_key: str) -> str | None:
+        entry = self.contracts.get(contract_path.resolve().as_posix())
+        if entry is None or entry.get("cache_key") != cache_key:
+            return None
+        return entry["integrity"]
+
+    def put(self, contract_path: Path, cache_key: str, integrity: str):
+        """Records the integrity of the contract and saves the cache."""
+        self.contracts[contract_path.resolve().as_posix()] = {
+            "cache_key": cache_key,
+            "integrity": integrity,
+        }
+        self.build_folder.mkdir(parents=True, exist_ok=True)
+        data = {"version": INTEGRITY_CACHE_VERSION, "contracts": self.contracts}
+        atomic_write(self.cache_path, json.dumps(data, indent=4, sort_keys=True))
@@ -0,0 +1,103 @@
+import tomllib
+from pathlib import Path
+
+import tomli_w
+
+from moccasin._atomic_write import atomic_write
+from moccasin._dependency_utils import (
+    DependencyType,
+    GitHubDependency,
+    classify_dependency,
+)
+
+LOCKFILE_VERSION = 1
+
+
+class Lockfile:
+    """The dependencies of a project as they were resolved by the last install,
+    saved to ``moccasin.lock`` so ``mox install --frozen`` can install exactly the
+    same thing again without resolving anything.
+
+    :param lock_path: The path of the lockfile.
+    :type lock_path: Path
+    :param requirements: The dependencies declared in the config when the lock
+        was written.
+    :type requirements: list[str]
+    :param github: For every GitHub package (``org/repo``), its ``version`` and,
+        when known, the resolved ``commit``, the ``url`` the archive was
+        downloaded from and the archive's ``sha256``.
+    :type github: dict[str, dict]
+    :param pypi: Every installed pip package, including indirect dependencies,
+        with its version.
+    :type pypi: dict[str, str]
+    """
+
+    def __init__(
+        self,
+        lock_path: Path,
+        requirements: list[str] | None = None,
+        github: dict[str, dict] | None = None,
+        pypi: dict[str, str] | None = None,
+    ):
+        self.lock_path = lock_path
+        self.requirements = requirements or []
+        self.github = github or {}
+        self.pypi = pypi or {}
+
+    @classmethod
+    def load(cls, lock_path: Path) -> "Lockfile":
+        """Reads the lockfile, or returns an empty one if it doesn't exist."""
+        if not lock_path.exists():
+            return cls(lock_path)
+        with open(lock_path, "rb") as f:
+            data = tomllib.load(f)
+        if data.get("version") != LOCKFILE_VERSION:
+            raise ValueError(
+                f"Unsupported lockfile version {data.get('version')} in {lock_path}, "
+                f"expected {LOCKFILE_VERSION}. Run `mox install` to rewrite it."
+            )
+        return cls(
+            lock_path,
+            requirements=data.get("requirements", []),
+            github=data.get("github", {}),
+            pypi=data.get("pypi", {}),
+        )
+
+    def exists(self) -> bool:
+        return self.lock_path.exists()
+
+    def matches(self, requirements: list[str]) -> bool:
+        """Returns True if the lock was written for these declared dependencies,
+        with an entry for every GitHub package at its pinned version.
+        """
+        if sorted(r.strip() for r in self.requirements) != sorted(
+            r.strip() for r in requirements
+        ):
+            return False
+        for requirement in requirements:
+            if classify_dependency(requirement) != DependencyType.GITHUB:
+                continue
+            dependency = GitHubDependency.from_string(requirement.strip().strip("'\""))
+            entry = self.github.get(dependency.format_no_version())
+            if entry is None:
+                return False
+            if (
+                dependency.version is not None
+                and entry["version"] != dependency.version
+            ):
+                return False
+        return True
+
+    def save(self):
+        """Atomically writes the lockfile."""
+        data = {
+            "version": LOCKFILE_VERSION,
+            "requirements": sorted(self.requirements),
+            "github": dict(sorted(self.github.items())),
+            "pypi": dict(sorted(self.pypi.items())),
+        }
+        atomic_write(
+            self.lock_path,
+            "# This file is generated by `mox install`, do not edit it by hand.\n"
+            + tomli_w.dumps(data),
+        )
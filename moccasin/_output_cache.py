@@ -0,0 +1,112 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import vyper
+
+from moccasin._atomic_write import atomic_write
+from moccasin._import_graph import ImportGraph
+from moccasin.logging import logger
+
+OUTPUT_CACHE_VERSION = 1
+
+
+def _normalized_name(path: Path, roots: list[Path]) -> str:
+    for root in roots:
+        if path.is_relative_to(root):
+            return path.relative_to(root).as_posix()
+    return path.as_posix()
+
+
+def compute_output_cache_key(contract_path: Path, import_graph: ImportGraph) -> str:
+    """Returns a key for the compiler output of ``contract_path`` that is the same
+    across projects and machines.
+
+    Like :func:`moccasin._build_cache.compute_cache_key`, but every file is named
+    relative to the import graph root or search path it lives in (e.g.
+    ``snekmate/auth/ownable.vy``), so the same sources vendored into two projects
+    give the same key.
+    """
+    roots = [
+        *import_graph.roots,
+        *[Path(p).resolve() for p in import_graph.search_paths],
+    ]
+    hasher = hashlib.sha256()
+    settings = {"version": OUTPUT_CACHE_VERSION, "vyper_version": vyper.__version__}
+    hasher.update(json.dumps(settings, sort_keys=True).encode())
+    contract_path = contract_path.resolve()
+    files = [contract_path, *sorted(import_graph.dependencies_of(contract_path))]
+    for path in files:
+        hasher.update(_normalized_name(path, roots).encode())
+        hasher.update(import_graph.get_hash(path).encode())
+    return hasher.hexdigest()
+
+
+class OutputCache:
+    """A content-addressed store of build artifacts shared by every project,
+    so a contract that was already compiled anywhere on this machine doesn't have
+    to go through vyper again.
+
+    Entries are evicted least recently used first once the cache grows past
+    ``max_size_bytes``.
+
+    :param cache_folder: Where the artifacts are stored.
+    :type cache_folder: Path
+    :param max_size_bytes: The size the cache is pruned down to.
+    :type max_size_bytes: int
+    """
+
+    def __init__(self, cache_folder: Path, max_size_bytes: int):
+        self.cache_folder = cache_folder
+        self.max_size_bytes = max_size_bytes
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_folder.joinpath(key[:2], f"{key}.json")
+
+    def get(self, key: str) -> dict | None:
+        entry_path = self._entry_path(key)
+        try:
+            with open(entry_path, "r") as f:
+                build_data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, json.JSONDecodeError):
+            logger.debug(f"Ignoring unreadable compile cache entry {entry_path}")
+            return None
+        # @dev the modification time doubles as the last access time for eviction
+        os.utime(entry_path)
+        return build_data
+
+    def put(self, key: str, build_data: dict):
+        """Atomically stores a build artifact under ``key``."""
+        entry_path = self._entry_path(key)
+        entry_path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write(entry_path, json.dumps(build_data))
+
+    def prune(self):
+        """Deletes the least recently used entries until the cache fits in
+        ``max_size_bytes``.
+        """
+        if not self.cache_folder.exists():
+            return
+        entries = []
+        total_size = 0
+        for entry_path in self.cache_folder.glob("*/*.json"):
+            try:
+                stat = entry_path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, entry_path))
+            total_size += stat.st_size
+        if total_size <= self.max_size_bytes:
+            return
+        entries.sort()
+        n_evicted = 0
+        for _, size, entry_path in entries:
+            if total_size <= self.max_size_bytes:
+                break
+            entry_path.unlink(missing_ok=True)
+            total_size -= size
+            n_evicted += 1
+        logger.debug(f"Evicted {n_evicted} entries from the compile cache")
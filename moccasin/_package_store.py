@@ -0,0 +1,109 @@
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from urllib.parse import quote
+
+from moccasin._atomic_write import atomic_write
+from moccasin.logging import logger
+
+
+class PackageStore:
+    """A store of downloaded GitHub packages shared by every project, so a
+    package that was already downloaded anywhere on this machine is installed
+    by linking its files instead of downloading it again.
+
+    Packages are stored under ``github/<org>/<repo>@<version>`` and never change
+    once they're added. Next to each one, a ``.json`` file holds where it was
+    downloaded from (see :meth:`add_github_package`).
+
+    :param store_folder: Where the packages are stored.
+    :type store_folder: Path
+    """
+
+    def __init__(self, store_folder: Path):
+        self.store_folder = store_folder
+
+    def github_package_path(self, org: str, repo: str, version: str) -> Path:
+        # @dev tags can contain "/", which can't be part of a folder name
+        return self.store_folder.joinpath(
+            "github", org, f"{repo}@{quote(version, safe='')}"
+        )
+
+    def get_github_package(self, org: str, repo: str, version: str) -> Path | None:
+        package_path = self.github_package_path(org, repo, version)
+        return package_path if package_path.is_dir() else None
+
+    def get_github_metadata(self, org: str, repo: str, version: str) -> dict:
+        metadata_path = self._metadata_path(org, repo, version)
+        try:
+            with open(metadata_path, "r") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def _metadata_path(self, org: str, repo: str, version: str) -> Path:
+        package_path = self.github_package_path(org, repo, version)
+        return package_path.with_name(f"{package_path.name}.json")
+
+    def make_staging_folder(self) -> Path:
+        """Returns a new empty folder in the store to download a package into.
+
+        @dev it's on the same filesystem as the store, so it can be moved in
+        with a rename.
+        """
+        self.store_folder.mkdir(parents=True, exist_ok=True)
+        return Path(tempfile.mkdtemp(dir=self.store_folder, prefix=".tmp_"))
+
+    def add_github_package(
+        self,
+        package_folder: Path,
+        org: str,
+        repo: str,
+        version: str,
+        metadata: dict | None = None,
+    ) -> Path:
+        """Moves ``package_folder`` into the store.
+
+        If another install added the same package in the meantime, that one is
+        kept and ``package_folder`` is left where it is.
+
+        :param metadata: Where the package was downloaded from (``commit``,
+            ``url``, ``sha256``), returned by :meth:`get_github_metadata`.
+        :return: The path of the package in the store.
+        """
+        package_path = self.github_package_path(org, repo, version)
+        package_path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.rename(package_folder, package_path)
+        except OSError:
+            if not package_path.is_dir():
+                raise
+            logger.debug(f"{org}/{repo}@{version} was added to the store concurrently")
+            return package_path
+        if metadata:
+            metadata_path = self._metadata_path(org, repo, version)
+            atomic_write(metadata_path, json.dumps(metadata))
+        return package_path
+
+
+def link_tree(source: Path, target: Path):
+    """Recreates the ``source`` folder at ``target`` with hard links to its files.
+
+    Files are copied instead when they can't be hard linked, for example when
+    ``target`` is on another filesystem.
+    """
+    can_link = True
+
+    def link_or_copy(source_file: str, target_file: str):
+        nonlocal can_link
+        if can_link:
+            try:
+                os.link(source_file, target_file)
+                return
+            except OSError:
+                can_link = False
+        shutil.copy2(source_file, target_file)
+
+    shutil.copytree(source, target, copy_function=link_or_copy)
@@ -0,0 +1,188 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+import tomllib
+from pathlib import Path
+from typing import BinaryIO
+
+from moccasin._atomic_write import atomic_write
+from moccasin._download import _try_lock
+from moccasin.logging import logger
+
+PURGE_TRASH_PREFIX = ".tmp_purge_"
+PURGE_JOURNAL_FILE = "journal.json"
+PURGE_LOCK_FILE = "purge.lock"
+LOCK_RETRY_DELAY = 0.05
+
+
+class PurgeJournal:
+    """Moves packages out of the way for a purge, into a trash folder that is
+    only deleted once the new ``versions.toml`` is in place.
+
+    Every move is written to a journal in the trash folder before it's made, so
+    a purge that was interrupted, even by a crash, is rolled back or finished
+    by :func:`recover_interrupted_purges`. The trash folder is locked for as
+    long as the journal is open, so a purge still running in another process
+    is never recovered.
+
+    :param lib_folder: The folder the trash folder is created in, on the same
+        filesystem as the packages so they can be moved with a rename.
+    :type lib_folder: Path
+    """
+
+    def __init__(self, lib_folder: Path):
+        self._lock_file: BinaryIO | None = None
+        while self._lock_file is None:
+            self.trash_path = Path(
+                tempfile.mkdtemp(dir=lib_folder, prefix=PURGE_TRASH_PREFIX)
+            )
+            self._lock_file = _lock_trash_folder(self.trash_path, blocking=True)
+        # (original path, path in the trash, or None for a removed empty folder)
+        self.entries: list[tuple[Path, Path | None]] = []
+        self.versions_path: Path | None = None
+        self.versions: dict | None = None
+
+    @classmethod
+    def load(cls, trash_path: Path, lock_file: BinaryIO) -> "PurgeJournal":
+        """Loads the journal of an interrupted purge.
+
+        :param lock_file: The lock of ``trash_path``, held by the caller.
+        :type lock_file: BinaryIO
+        """
+        journal = cls.__new__(cls)
+        journal._lock_file = lock_file
+        journal.trash_path = trash_path
+        journal.entries = []
+        journal.versions_path = None
+        journal.versions = None
+        try:
+            with open(trash_path.joinpath(PURGE_JOURNAL_FILE), "r") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            # @dev nothing was moved yet
+            return journal
+        journal.entries = [
+            (Path(original), None if trashed is None else Path(trashed))
+            for original, trashed in data["entries"]
+        ]
+        if data.get("versions_path") is not None:
+            journal.versions_path = Path(data["versions_path"])
+            journal.versions = data["versions"]
+        return journal
+
+    def trash(self, path: Path):
+        """Moves ``path`` to the trash."""
+        trashed_path = self.trash_path.joinpath(f"{len(self.entries)}_{path.name}")
+        self._record((path, trashed_path))
+        os.rename(path, trashed_path)
+
+    def remove_empty_folder(self, path: Path):
+        self._record((path, None))
+        path.rmdir()
+
+    def expect_versions(self, versions_path: Path, versions: dict):
+        """Records the ``versions.toml`` that commits the purge once it's in
+        place. Call before writing it.
+        """
+        self.versions_path = versions_path
+        self.versions = versions
+        self._save()
+
+    def is_committed(self) -> bool:
+        if self.versions_path is None:
+            return False
+        try:
+            with open(self.versions_path, "rb") as f:
+                versions = tomllib.load(f)
+        except (OSError, tomllib.TOMLDecodeError):
+            return False
+        return {k.lower(): v for k, v in versions.items()} == self.versions
+
+    def rollback(self):
+        """Moves everything back where it was, undoing the moves in reverse."""
+        for original_path, trashed_path in reversed(self.entries):
+            if trashed_path is None:
+                original_path.mkdir(exist_ok=True)
+            elif trashed_path.exists():
+                # @dev a move journaled just before a crash may not have happened
+                os.rename(trashed_path, original_path)
+
+    def close(self):
+        """Deletes the trash folder, and what it still holds."""
+        shutil.rmtree(self.trash_path, ignore_errors=True)
+        self._release_lock()
+        # @dev the lock file can't be deleted while it's locked on Windows
+        shutil.rmtree(self.trash_path, ignore_errors=True)
+
+    def _release_lock(self):
+        # @dev closing the file releases the lock
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+    def _record(self, entry: tuple[Path, Path | None]):
+        self.entries.append(entry)
+        self._save()
+
+    def _save(self):
+        data = {
+            "entries": [
+                [str(original), None if trashed is None else str(trashed)]
+                for original, trashed in self.entries
+            ],
+            "versions_path": None
+            if self.versions_path is None
+            else str(self.versions_path),
+            "versions": self.versions,
+        }
+        atomic_write(self.trash_path.joinpath(PURGE_JOURNAL_FILE), json.dumps(data))
+
+
+def recover_interrupted_purges(lib_folder: Path):
+    """Rolls back, or finishes, the purges in ``lib_folder`` that were
+    interrupted before they deleted their trash folder. Purges that are still
+    running, in this process or another, are left alone.
+    """
+    if not lib_folder.is_dir():
+        return
+    for trash_path in lib_folder.glob(f"{PURGE_TRASH_PREFIX}*"):
+        lock_file = _lock_trash_folder(trash_path, blocking=False)
+        if lock_file is None:
+            logger.debug(f"Skipping {trash_path}, its purge is still running")
+            continue
+        journal = PurgeJournal.load(trash_path, lock_file)
+        if journal.is_committed():
+            logger.debug(f"Finishing the interrupted purge in {trash_path}")
+        else:
+            logger.warning("Restoring packages from an interrupted `mox purge`")
+            journal.rollback()
+        journal.close()
+
+
+def _lock_trash_folder(trash_path: Path, blocking: bool) -> BinaryIO | None:
+    """Takes the lock of a trash folder.
+
+    :param blocking: Whether to wait for the lock if another journal holds it.
+    :type blocking: bool
+    :return: The open lock file, or None if the lock is held and ``blocking`` is
+        False, or if the trash folder was deleted.
+    """
+    lock_path = trash_path.joinpath(PURGE_LOCK_FILE)
+    try:
+        # @dev held open for as long as the lock is
+        lock_file = open(lock_path, "ab")  # noqa: SIM115
+    except FileNotFoundError:
+        return None
+    while not _try_lock(lock_file):
+        if not blocking:
+            lock_file.close()
+            return None
+        time.sleep(LOCK_RETRY_DELAY)
+    # @dev a recovery that held the lock first may have deleted the folder, if
+    # nothing was journaled in it yet
+    if not lock_path.exists():
+        lock_file.close()
+        return None
+    return lock_file
@@ -0,0 +1,165 @@
+import json
+import mmap
+import struct
+from pathlib import Path
+from typing import Iterable
+
+from moccasin._atomic_write import atomic_write
+
+PACK_MAGIC = b"MOXPACK\x00"
+PACK_VERSION = 1
+
+# magic, version, number of contracts
+_HEADER = struct.Struct("<8sII")
+# name length, vm, bytecode offset, bytecode length, abi offset, abi length
+# (the name itself follows each entry)
+_ENTRY = struct.Struct("<HBQIQI")
+
+_VM_TO_ID = {"evm": 0, "eravm": 1}
+_ID_TO_VM = {v: k for k, v in _VM_TO_ID.items()}
+
+
+class ArtifactPackError(Exception):
+    """Raised when an artifact pack is malformed or of an unsupported version."""
+
+
+def write_artifact_pack(artifacts: Iterable[dict], pack_path: Path):
+    """Atomically writes build artifacts (as written by ``compile_``) into a
+    single binary pack.
+
+    The pack is laid out as a header, an index of every contract, the raw
+    bytecode of every contract, and then the (compact JSON) ABI of every contract,
+    so a reader can get to one contract's bytecode or ABI without parsing the rest.
+
+    :param artifacts: The build artifacts, with ``contract_name``, ``bytecode`` (hex),
+        ``abi`` and ``vm`` keys.
+    :type artifacts: Iterable[dict]
+    :param pack_path: Where to write the pack.
+    :type pack_path: Path
+    """
+    artifacts = sorted(artifacts, key=lambda a: a["contract_name"])
+    names = [a["contract_name"].encode("utf-8") for a in artifacts]
+    bytecodes = [bytes.fromhex(a["bytecode"].removeprefix("0x")) for a in artifacts]
+    abis = [json.dumps(a["abi"], separators=(",", ":")).encode() for a in artifacts]
+
+    offset = _HEADER.size + sum(_ENTRY.size + len(name) for name in names)
+    bytecode_offsets = []
+    for bytecode in bytecodes:
+        bytecode_offsets.append(offset)
+        offset += len(bytecode)
+    abi_offsets = []
+    for abi in abis:
+        abi_offsets.append(offset)
+        offset += len(abi)
+
+    chunks = [_HEADER.pack(PACK_MAGIC, PACK_VERSION, len(artifacts))]
+    for i, artifact in enumerate(artifacts):
+        chunks.append(
+            _ENTRY.pack(
+                len(names[i]),
+                _VM_TO_ID[artifact.get("vm", "evm")],
+                bytecode_offsets[i],
+                len(bytecodes[i]),
+                abi_offsets[i],
+                len(abis[i]),
+            )
+        )
+        chunks.append(names[i])
+    chunks += bytecodes
+    chunks += abis
+
+    pack_path.parent.mkdir(parents=True, exist_ok=True)
+    atomic_write(pack_path, b"".join(chunks))
+
+
+class ArtifactPack:
+    """Reads an artifact pack written by :func:`write_artifact_pack`.
+
+    Only the index is parsed when the pack is opened; bytecode and ABIs are read
+    (through ``mmap``) when they're asked for.
+
+    .. code-block:: python
+
+        with ArtifactPack("out/artifacts.pack") as pack:
+            abi = pack.get_abi("Counter")
+
+    :param pack_path: The path of the pack.
+    :type pack_path: Path | str
+    """
+
+    def __init__(self, pack_path: Path | str):
+        self.pack_path = Path(pack_path)
+        if self.pack_path.stat().st_size < _HEADER.size:
+            raise ArtifactPackError(f"{self.pack_path} is not an artifact pack.")
+        with open(self.pack_path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._index: dict[str, tuple[int, int, int, int, int]] = {}
+        try:
+            self._read_index()
+        except Exception:
+            self.close()
+            raise
+
+    def _read_index(self):
+        magic, version, n_contracts = _HEADER.unpack_from(self._mmap, 0)
+        if magic != PACK_MAGIC:
+            raise ArtifactPackError(f"{self.pack_path} is not an artifact pack.")
+        if version != PACK_VERSION:
+            raise ArtifactPackError(
+                f"Unsupported artifact pack version {version} in {self.pack_path}, "
+                f"expected {PACK_VERSION}. Recompile the project to rebuild it."
+            )
+        position = _HEADER.size
+        for _ in range(n_contracts):
+            name_length, *entry = _ENTRY.unpack_from(self._mmap, position)
+            position += _ENTRY.size
+            name = self._mmap[position : position + name_length].decode("utf-8")
+            position += name_length
+            self._index[name] = tuple(entry)
+
+    def close(self):
+        self._mmap.close()
+
+    def __enter__(self) -> "ArtifactPack":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __contains__(self, contract_name: str) -> bool:
+        return contract_name in self._index
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    @property
+    def contract_names(self) -> list[str]:
+        return list(self._index)
+
+    def _entry(self, contract_name: str) -> tuple[int, int, int, int, int]:
+        try:
+            return self._index[contract_name]
+        except KeyError:
+            raise KeyError(
+                f"Contract {contract_name} is not in the artifact pack {self.pack_path}"
+            ) from None
+
+    def get_bytecode(self, contract_name: str) -> bytes:
+        _, offset, length, _, _ = self._entry(contract_name)
+        return self._mmap[offset : offset + length]
+
+    def get_abi(self, contract_name: str) -> list:
+        _, _, _, offset, length = self._entry(contract_name)
+        return json.loads(self._mmap[offset : offset + length])
+
+    def get_vm(self, contract_name: str) -> str:
+        return _ID_TO_VM[self._entry(contract_name)[0]]
+
+    def get_build_data(self, contract_name: str) -> dict:
+        """Returns the contract's artifact, in the same shape as its JSON artifact."""
+        return {
+            "contract_name": contract_name,
+            "bytecode": self.get_bytecode(contract_name).hex(),
+            "abi": self.get_abi(contract_name),
+            "vm": self.get_vm(contract_name),
+        }
@@ -5,7 +5,9 @@ import sys
 import time
 import traceback
 from argparse import Namespace
+from multiprocessing.pool import Pool
 from pathlib import Path
+from typing import Iterator
 
 import vyper.compiler.output
 from boa import load_partial
@@ -14,15 +16,35 @@ from boa.contracts.vyper.vyper_contract import VyperDeployer
 from vyper.compiler.phases import CompilerData
 from vyper.exceptions import VersionException, _BaseVyperException
 
+from moccasin._atomic_write import atomic_write
+from moccasin._build_cache import BuildCache, compute_cache_key
+from moccasin._compile_profile import (
+    format_profile_table,
+    make_skipped_profile,
+    profile_compilation,
+    write_profile_report,
+)
+from moccasin._compile_server import get_compile_server_client
+from moccasin._import_graph import ImportGraph, get_compiler_search_paths
+from moccasin._output_cache import OutputCache, compute_output_cache_key
 from moccasin._sys_path_and_config_setup import _patch_sys_path, get_sys_paths_list
+from moccasin.artifact_pack import write_artifact_pack
 from moccasin.commands.install import mox_install
 from moccasin.config import Config, get_config, initialize_global_config
 from moccasin.constants.vars import (
+    ARTIFACT_PACK_FILE,
     BUILD_FOLDER,
+    COMPILE_CACHE_FOLDER,
+    COMPILE_PROFILE_FILE,
     CONTRACTS_FOLDER,
+    DEPENDENCIES_FOLDER,
     ERAVM,
+    GITHUB,
+    IMPORT_GRAPH_FILE,
     IS_WINDOWS,
+    MOCCASIN_DEFAULT_FOLDER,
     MOCCASIN_GITHUB,
+    PYPI,
 )
 from moccasin.logging import logger, set_log_level
 
@@ -37,27 +59,110 @@ def main(args: Namespace) -> int:
         mox_install(config=config, quiet=True, override_logger=True)
     set_log_level(quiet=args.quiet, debug=args.debug)
 
+    build_folder = project_path.joinpath(config.out_folder)
+    profiles: list[dict] | None = None
     with _patch_sys_path(get_sys_paths_list(config)):
         if args.contract_or_contract_path:
             contract_path = config.find_contract(args.contract_or_contract_path)
-            compile_(
-                contract_path,
+            contract_profile: dict | None = {} if args.profile else None
+            compile_server = (
+                None if is_zksync else get_compile_server_client(project_path)
+            )
+            if compile_server is not None:
+                for _, _, contract_profile in compile_server.compile(
+                    [contract_path], build_folder, write_data=True, profile=args.profile
+                ):
+                    pass
+            else:
+                compile_(
+                    contract_path,
+                    build_folder,
+                    is_zksync=is_zksync,
+                    write_data=True,
+                    profile=contract_profile,
+                )
+            if contract_profile is not None:
+                profiles = [
+                    _make_profile_entry(contract_path, project_path, contract_profile)
+                ]
+            logger.info(f"Done compiling {contract_path.stem}")
+        elif args.check:
+            stale_contracts = check_project(
+                project_path,
                 project_path.joinpath(config.out_folder),
+                project_path.joinpath(config.contracts_folder),
+                project_path.joinpath(config.lib_folder),
                 is_zksync=is_zksync,
-                write_data=True,
             )
-            logger.info(f"Done compiling {contract_path.stem}")
-        else:
-            compile_project(
+            for contract_path, reason in stale_contracts:
+                logger.info(f"{contract_path.stem} is out of date: {reason}")
+            if len(stale_contracts) > 0:
+                logger.error(f"{len(stale_contracts)} contracts need to be compiled.")
+                sys.exit(1)
+            logger.info("All contracts are up to date.")
+        elif args.watch:
+            watch_project(
                 project_path,
                 project_path.joinpath(config.out_folder),
                 project_path.joinpath(config.contracts_folder),
+                project_path.joinpath(config.lib_folder),
+                is_zksync=is_zksync,
+                write_pack=config.artifact_pack,
+            )
+        else:
+            profiles = compile_project(
+                project_path,
+                build_folder,
+                project_path.joinpath(config.contracts_folder),
+                lib_folder=project_path.joinpath(config.lib_folder),
                 is_zksync=is_zksync,
                 write_data=True,
+                use_cache=not args.force,
+                output_cache=_get_output_cache(config),
+                write_pack=config.artifact_pack,
+                profile=args.profile,
             )
+    if profiles is not None:
+        _report_profiles(profiles, args, build_folder)
     return 0
 
 
+def _make_profile_entry(
+    contract_path: Path, project_path: Path, contract_profile: dict
+) -> dict:
+    try:
+        relative_path = contract_path.resolve().relative_to(project_path.resolve())
+    except ValueError:
+        relative_path = contract_path
+    return {
+        "contract": contract_path.stem,
+        "path": relative_path.as_posix(),
+        **contract_profile,
+    }
+
+
+def _report_profiles(profiles: list[dict], args: Namespace, build_folder: Path):
+    logger.info(
+        "Compile profile:\n" + format_profile_table(profiles, args.profile_sort)
+    )
+    report_path = (
+        Path(args.profile_output)
+        if args.profile_output
+        else build_folder.joinpath(COMPILE_PROFILE_FILE)
+    )
+    write_profile_report(profiles, report_path)
+    logger.info(f"Profile report written to {report_path}")
+
+
+def _get_output_cache(config: Config) -> OutputCache | None:
+    if not config.global_compile_cache:
+        return None
+    return OutputCache(
+        MOCCASIN_DEFAULT_FOLDER.joinpath(COMPILE_CACHE_FOLDER),
+        config.global_compile_cache_max_mb * 1024 * 1024,
+    )
+
+
 def _set_zksync_test_env_if_applicable(args: Namespace, config: Config) -> bool:
     is_zksync = args.is_zksync if args.is_zksync is not None else None
 
@@ -92,7 +197,18 @@ def compile_project(
     contracts_folder: Path | None = None,
     is_zksync: bool = False,
     write_data: bool = False,
-):
+    use_cache: bool = True,
+    lib_folder: Path | None = None,
+    output_cache: OutputCache | None = None,
+    write_pack: bool = False,
+    profile: bool = False,
+) -> list[dict] | None:
+    """Compiles every contract in the contracts folder.
+
+    If ``profile`` is set, returns the profile (see
+    :func:`moccasin._compile_profile.profile_compilation`) of every contract,
+    including the ones served from a cache.
+    """
     if project_path is None:
         project_path = get_config().get_root()
 
@@ -102,8 +218,23 @@ def compile_project(
     if not contracts_folder:
         contracts_folder = project_path.joinpath(CONTRACTS_FOLDER)
 
+    if not lib_folder:
+        lib_folder = project_path.joinpath(DEPENDENCIES_FOLDER)
+
     contracts_location = project_path.joinpath(contracts_folder)
-    contracts_to_compile = list(contracts_location.rglob("*.vy"))
+
+    # @dev the build cache only makes sense if the artifacts are written to disk,
+    # otherwise there is nothing to reuse on the next run
+    import_graph: ImportGraph | None = None
+    if write_data and use_cache:
+        import_graph = _get_import_graph(contracts_location, lib_folder, build_folder)
+        import_graph.refresh()
+        import_graph.save()
+        contracts_to_compile = sorted(
+            _contracts_in_graph(import_graph, contracts_location)
+        )
+    else:
+        contracts_to_compile = list(contracts_location.rglob("*.vy"))
 
     try:
         build_folder_relpath: str = os.path.relpath(build_folder)
@@ -113,46 +244,350 @@ def compile_project(
         f"Compiling {len(contracts_to_compile)} contracts to {build_folder_relpath}/..."
     )
 
+    profiles: list[dict] = []
+
+    def add_profile(contract_path: Path, contract_profile: dict):
+        profiles.append(
+            _make_profile_entry(contract_path, project_path, contract_profile)
+        )
+
+    build_cache: BuildCache | None = None
+    cache_keys: dict[Path, str] = {}
+    if import_graph is not None:
+        build_cache = BuildCache(build_folder, project_path)
+        stale_contracts = []
+        for contract_path in contracts_to_compile:
+            cache_key = compute_cache_key(
+                contract_path, import_graph, is_zksync=is_zksync
+            )
+            cache_keys[contract_path] = cache_key
+            if not build_cache.is_up_to_date(contract_path, cache_key):
+                stale_contracts.append(contract_path)
+            elif profile:
+                add_profile(contract_path, make_skipped_profile("build"))
+        n_fresh = len(contracts_to_compile) - len(stale_contracts)
+        if n_fresh > 0:
+            logger.info(f"Skipping {n_fresh} contracts unchanged since the last build.")
+        contracts_to_compile = stale_contracts
+
+    # @dev the global cache is keyed from the import graph, and zksync outputs
+    # depend on the zkvyper version, which isn't part of the key
+    output_cache_keys: dict[Path, str] = {}
+    if output_cache is None or build_cache is None or import_graph is None or is_zksync:
+        output_cache = None
+    else:
+        cache_misses = []
+        for contract_path in contracts_to_compile:
+            output_cache_key = compute_output_cache_key(contract_path, import_graph)
+            build_data = output_cache.get(output_cache_key)
+            if build_data is None:
+                output_cache_keys[contract_path] = output_cache_key
+                cache_misses.append(contract_path)
+                continue
+            if profile:
+                add_profile(contract_path, make_skipped_profile("global"))
+            write_build_data(build_data, build_folder)
+            build_cache.record(
+                contract_path,
+                cache_keys[contract_path],
+                import_graph.get_hash(contract_path),
+            )
+        n_hits = len(contracts_to_compile) - len(cache_misses)
+        if n_hits > 0:
+            logger.info(f"Reused {n_hits} contracts from the global compile cache.")
+        contracts_to_compile = cache_misses
+
+    if len(contracts_to_compile) == 0:
+        if build_cache is not None:
+            build_cache.save()
+        pack_path = build_folder.joinpath(ARTIFACT_PACK_FILE)
+        if write_pack and write_data and not pack_path.exists():
+            write_project_artifact_pack(build_folder)
+        logger.info("Done compiling project!")
+        return profiles if profile else None
+
+    contracts_to_compile = _order_by_compile_cost(contracts_to_compile, import_graph)
+    n_contracts = len(contracts_to_compile)
+
+    # @dev zksync compilation depends on the boa env of this process, so it
+    # never goes through the compile server
+    compile_server = None if is_zksync else get_compile_server_client(project_path)
+    if compile_server is not None:
+        logger.debug(f"Compiling on the compile server at {compile_server.socket_path}")
+        results = compile_server.compile(
+            contracts_to_compile, build_folder, is_zksync, write_data, profile
+        )
+    else:
+        results = _compile_on_new_pool(
+            contracts_to_compile, build_folder, is_zksync, write_data, profile
+        )
+
+    try:
+        for n_done, (contract_path, compiled, contract_profile) in enumerate(
+            results, start=1
+        ):
+            if contract_profile is not None:
+                add_profile(contract_path, contract_profile)
+            if compiled is None:
+                logger.info(
+                    f"Skipping contract {contract_path.stem} due to uninitialized."
+                )
+                if build_cache is not None and import_graph is not None:
+                    build_cache.record_uninitialized(
+                        contract_path,
+                        cache_keys[contract_path],
+                        import_graph.get_hash(contract_path),
+                    )
+                continue
+            if compiled:
+                logger.info(f"Compiled {contract_path.stem} ({n_done}/{n_contracts})")
+                if build_cache is not None and import_graph is not None:
+                    build_cache.record(
+                        contract_path,
+                        cache_keys[contract_path],
+                        import_graph.get_hash(contract_path),
+                    )
+                if output_cache is not None:
+                    output_cache.put(
+                        output_cache_keys[contract_path],
+                        read_build_data(contract_path.stem, build_folder),
+                    )
+    finally:
+        # @dev save even on failure, so the contracts that did compile are
+        # not compiled again on the next run
+        if build_cache is not None:
+            build_cache.save()
+        if output_cache is not None:
+            output_cache.prune()
+
+    if write_pack and write_data:
+        write_project_artifact_pack(build_folder)
+    logger.info("Done compiling project!")
+    return profiles if profile else None
+
+
+def check_project(
+    project_path: Path,
+    build_folder: Path,
+    contracts_folder: Path,
+    lib_folder: Path,
+    is_zksync: bool = False,
+) -> list[tuple[Path, str]]:
+    """Returns the contracts that would be recompiled by ``compile_project``, and
+    why, without compiling anything. Also catches artifacts modified on disk.
+    """
+    contracts_location = project_path.joinpath(contracts_folder)
+    import_graph = _get_import_graph(contracts_location, lib_folder, build_folder)
+    import_graph.refresh()
+    build_cache = BuildCache(build_folder, project_path)
+    stale_contracts = []
+    for contract_path in sorted(_contracts_in_graph(import_graph, contracts_location)):
+        cache_key = compute_cache_key(contract_path, import_graph, is_zksync=is_zksync)
+        reason = build_cache.get_staleness(contract_path, cache_key)
+        if reason is not None:
+            stale_contracts.append((contract_path, reason))
+    return stale_contracts
+
+
+def watch_project(
+    project_path: Path,
+    build_folder: Path,
+    contracts_folder: Path,
+    lib_folder: Path,
+    is_zksync: bool = False,
+    write_pack: bool = False,
+    poll_interval: float = 0.5,
+):
+    """Compiles the project, then keeps recompiling the contracts affected by
+    every change to the contracts or lib folders, until interrupted.
+
+    The worker pool and the import graph stay alive between changes, so a save
+    only costs compiling the contracts that (transitively) import the changed file.
+    """
+    compile_project(
+        project_path,
+        build_folder,
+        contracts_folder,
+        is_zksync=is_zksync,
+        write_data=True,
+        lib_folder=lib_folder,
+        write_pack=write_pack,
+    )
+    contracts_location = project_path.joinpath(contracts_folder)
+    import_graph = _get_import_graph(contracts_location, lib_folder, build_folder)
+    import_graph.refresh()
+    build_cache = BuildCache(build_folder, project_path)
+
+    _set_start_method()
+    n_cpus = max(1, _get_cpu_count() - 2)
+    pool = multiprocessing.Pool(n_cpus)
+    logger.info("Watching for changes... (press Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(poll_interval)
+            changed = import_graph.refresh()
+            if not changed:
+                continue
+            import_graph.save()
+            contracts = _contracts_in_graph(import_graph, contracts_location)
+            affected = import_graph.affected_by(changed) & contracts
+            if not affected:
+                continue
+            if not _recompile(
+                pool, affected, import_graph, build_cache, build_folder, is_zksync
+            ):
+                # @dev _compile_contracts terminates the pool on failure
+                pool = multiprocessing.Pool(n_cpus)
+            build_cache.save()
+            if write_pack:
+                write_project_artifact_pack(build_folder)
+    except KeyboardInterrupt:
+        logger.info("Stopped watching.")
+    finally:
+        pool.terminate()
+
+
+def _recompile(
+    pool: Pool,
+    contracts: set[Path],
+    import_graph: ImportGraph,
+    build_cache: BuildCache,
+    build_folder: Path,
+    is_zksync: bool,
+) -> bool:
+    """Recompiles the contracts for watch mode, logging how long each one took.
+    Returns False if a contract failed to compile.
+    """
+    logger.info(f"Recompiling {len(contracts)} affected contracts...")
+    start = time.perf_counter()
+    try:
+        for contract_path, compiled, _ in _compile_contracts(
+            pool,
+            _order_by_compile_cost(list(contracts), import_graph),
+            build_folder,
+            is_zksync,
+            write_data=True,
+        ):
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            cache_key = compute_cache_key(
+                contract_path, import_graph, is_zksync=is_zksync
+            )
+            source_hash = import_graph.get_hash(contract_path)
+            if compiled is None:
+                build_cache.record_uninitialized(contract_path, cache_key, source_hash)
+            elif compiled:
+                logger.info(f"Compiled {contract_path.stem} in {elapsed_ms:.0f} ms")
+                build_cache.record(contract_path, cache_key, source_hash)
+    except Exception as e:
+        # @dev in watch mode a broken contract is expected while editing, so we
+        # report it and wait for the next change
+        logger.error(f"{type(e).__name__}: {e}")
+        return False
+    return True
+
+
+def _get_import_graph(
+    contracts_location: Path, lib_folder: Path, build_folder: Path
+) -> ImportGraph:
+    return ImportGraph(
+        [contracts_location, lib_folder.joinpath(GITHUB), lib_folder.joinpath(PYPI)],
+        get_compiler_search_paths(),
+        build_folder.joinpath(IMPORT_GRAPH_FILE),
+    )
+
+
+def _contracts_in_graph(
+    import_graph: ImportGraph, contracts_location: Path
+) -> set[Path]:
+    resolved_location = contracts_location.resolve()
+    return {
+        path
+        for path in import_graph.files
+        if path.suffix == ".vy" and path.is_relative_to(resolved_location)
+    }
+
+
+def _order_by_compile_cost(
+    contracts: list[Path], import_graph: ImportGraph | None = None
+) -> list[Path]:
+    """Orders contracts by the size of their source plus everything they import,
+    largest first, so the slowest compilations don't start last.
+    """
+
+    def compile_cost(contract_path: Path) -> int:
+        files = {contract_path}
+        if import_graph is not None:
+            files |= import_graph.dependencies_of(contract_path)
+        return sum(f.stat().st_size for f in files)
+
+    return sorted(contracts, key=compile_cost, reverse=True)
+
+
+def _compile_on_new_pool(
+    contracts: list[Path],
+    build_folder: Path,
+    is_zksync: bool = False,
+    write_data: bool = False,
+    profile: bool = False,
+) -> Iterator[tuple[Path, bool | None, dict | None]]:
+    _set_start_method()
+    n_cpus = max(1, _get_cpu_count() - 2)
+    with multiprocessing.Pool(n_cpus) as pool:
+        yield from _compile_contracts(
+            pool, contracts, build_folder, is_zksync, write_data, profile
+        )
+
+
+def _set_start_method():
     # @dev check if OS is Windows since fork
     # is not supported on Windows, change it to spawn method
     start_method = "fork"
     if IS_WINDOWS:
         start_method = "spawn"
-    multiprocessing.set_start_method(start_method, force=False)
-
-    n_cpus = max(1, _get_cpu_count() - 2)
-    jobs = []
+    if multiprocessing.get_start_method(allow_none=True) is None:
+        multiprocessing.set_start_method(start_method)
 
-    with multiprocessing.Pool(n_cpus) as pool:
-        for contract_path in contracts_to_compile:
-            res = pool.apply_async(
-                compile_noret,
-                (contract_path, build_folder),
-                dict(is_zksync=is_zksync, write_data=write_data),
-            )
-            jobs.append(res)
-
-        # loop over jobs waiting for them to complete.
-        # use nowait check so that bubbling up of exceptions isn't blocked
-        # by a slow job
-        while len(jobs) > 0:
-            tmp = []
-            for job in jobs:
-                if job.ready():
-                    # bubble up any exceptions
-                    try:
-                        job.get()
-                    except vyper.exceptions.InitializerException:
-                        logger.info(
-                            f"Skipping contract {contract_path.stem} due to uninitialized."
-                        )
-                        continue
-                else:
-                    tmp.append(job)
-            jobs = tmp
-            time.sleep(0.001)  # relax
 
-    logger.info("Done compiling project!")
+def _compile_contracts(
+    pool: Pool,
+    contracts: list[Path],
+    build_folder: Path,
+    is_zksync: bool = False,
+    write_data: bool = False,
+    profile: bool = False,
+) -> Iterator[tuple[Path, bool | None, dict | None]]:
+    """Compiles the contracts on the pool, yielding ``(contract_path, compiled,
+    profile)`` as each one finishes, in completion order.
+
+    ``compiled`` is None if the contract was skipped for being uninitialized, and
+    ``profile`` is None unless profiling was asked for.
+    On the first failure, the remaining jobs are cancelled and the error is raised.
+    """
+    job_kwargs = dict(is_zksync=is_zksync, write_data=write_data)
+    jobs = [
+        (contract_path, build_folder, job_kwargs, profile)
+        for contract_path in contracts
+    ]
+    try:
+        yield from pool.imap_unordered(_compile_job, jobs)
+    except Exception:
+        logger.error("Compilation failed, cancelling the remaining contracts.")
+        pool.terminate()
+        raise
+
+
+def _compile_job(
+    job: tuple[Path, Path, dict, bool],
+) -> tuple[Path, bool | None, dict | None]:
+    contract_path, build_folder, kwargs, profile = job
+    contract_profile: dict | None = {} if profile else None
+    try:
+        compiled = compile_noret(
+            contract_path, build_folder, profile=contract_profile, **kwargs
+        )
+    except vyper.exceptions.InitializerException:
+        compiled = None
+    return contract_path, compiled, contract_profile
 
 
 def compile_(
@@ -161,6 +596,28 @@ def compile_(
     compiler_args: dict | None = None,
     is_zksync: bool = False,
     write_data: bool = False,
+    profile: dict | None = None,
+) -> VyperDeployer | VVMDeployer:
+    """Compiles a contract, and writes its build artifact if ``write_data`` is set.
+
+    If a ``profile`` dict is passed, it's filled with the timings of the
+    compilation (see :func:`moccasin._compile_profile.profile_compilation`).
+
+    @dev always compiles in this process, even if a compile server is running,
+    since the deployer it returns can't be sent over the server's socket.
+    """
+    with profile_compilation(profile):
+        return _compile(
+            contract_path, build_folder, compiler_args, is_zksync, write_data
+        )
+
+
+def _compile(
+    contract_path: Path,
+    build_folder: Path,
+    compiler_args: dict | None,
+    is_zksync: bool,
+    write_data: bool,
 ) -> VyperDeployer | VVMDeployer:
     logger.debug(f"Compiling contract {contract_path}")
 
@@ -184,6 +641,19 @@ def compile_(
             exc._hint = exc._hint()
         raise exc
 
+    build_data = get_build_data(deployer, contract_path, is_zksync=is_zksync)
+    if write_data:
+        write_build_data(build_data, build_folder)
+
+    logger.debug(f"Done compiling {build_data['contract_name']}")
+
+    return deployer
+
+
+def get_build_data(
+    deployer: VyperDeployer | VVMDeployer, contract_path: Path, is_zksync: bool = False
+) -> dict:
+    """Returns the build artifact (name, bytecode, ABI and VM) of a compiled contract."""
     abi: list
     bytecode: bytes
     vm = "evm"
@@ -201,28 +671,55 @@ def compile_(
             bytecode = compiler_data.bytecode
             abi = vyper.compiler.output.build_abi_output(compiler_data)
 
-    # Save Compilation Data
-    contract_name = Path(contract_path).stem
-    build_data = {
-        "contract_name": contract_name,
+    return {
+        "contract_name": Path(contract_path).stem,
         "bytecode": bytecode.hex(),
         "abi": abi,
         "vm": vm,
     }
 
-    if write_data:
-        build_file = build_folder / f"{contract_name}.json"
-        build_folder.mkdir(exist_ok=True)
-        with open(build_file, "w") as f:
-            json.dump(build_data, f, indent=4)
-        logger.debug(f"Compilation data saved to {build_file}")
 
-    logger.debug(f"Done compiling {contract_name}")
-
-    return deployer
+def write_build_data(build_data: dict, build_folder: Path):
+    """Atomically writes a build artifact, so tools reading the build folder
+    (e.g. while ``mox compile --watch`` runs) never see a partial file. Nothing
+    is written if the artifact on disk is already identical.
+    """
+    build_file = build_folder / f"{build_data['contract_name']}.json"
+    build_folder.mkdir(exist_ok=True)
+    content = json.dumps(build_data, indent=4)
+    # @dev leave identical artifacts untouched, so their mtime doesn't change and
+    # file watchers and downstream tools don't see a change
+    try:
+        if build_file.read_text() == content:
+            logger.debug(f"{build_file} is unchanged, not rewriting it")
+            return
+    except FileNotFoundError:
+        pass
+    atomic_write(build_file, content)
+    logger.debug(f"Compilation data saved to {build_file}")
+
+
+def read_build_data(contract_name: str, build_folder: Path) -> dict:
+    with open(build_folder / f"{contract_name}.json", "r") as f:
+        return json.load(f)
+
+
+def write_project_artifact_pack(build_folder: Path):
+    """Bundles every JSON artifact in the build folder into a single artifact pack
+    (see :mod:`moccasin.artifact_pack`).
+    """
+    artifacts = []
+    for artifact_path in sorted(build_folder.glob("*.json")):
+        with open(artifact_path, "r") as f:
+            build_data = json.load(f)
+        if isinstance(build_data, dict) and "bytecode" in build_data:
+            artifacts.append(build_data)
+    pack_path = build_folder.joinpath(ARTIFACT_PACK_FILE)
+    write_artifact_pack(artifacts, pack_path)
+    logger.debug(f"Wrote {len(artifacts)} artifacts to {pack_path}")
 
 
 # discard the result of the compilation so that we don't need to pickle it
-# between processes
-def compile_noret(*args, **kwargs) -> None:
-    compile_(*args, **kwargs)
+# between processes, only report whether the contract compiled
+def compile_noret(*args, **kwargs) -> bool:
+    return compile_(*args, **kwargs) is not None
@@ -0,0 +1,238 @@
+import json
+import multiprocessing
+import signal
+import socketserver
+import threading
+import traceback
+from argparse import Namespace
+from pathlib import Path
+from typing import Iterator
+
+import vyper.exceptions
+from boa.contracts.vvm.vvm_contract import VVMDeployer
+from boa.contracts.vyper.vyper_contract import VyperDeployer
+
+from moccasin._build_cache import compute_cache_key
+from moccasin._compile_profile import make_skipped_profile
+from moccasin._compile_server import (
+    encode_message,
+    get_compile_server_client,
+    get_socket_path,
+)
+from moccasin._import_graph import ImportGraph, get_compiler_search_paths
+from moccasin._sys_path_and_config_setup import _patch_sys_path, get_sys_paths_list
+from moccasin.commands.compile import (
+    _compile_contracts,
+    _get_cpu_count,
+    _set_start_method,
+    compile_,
+    get_build_data,
+    write_build_data,
+)
+from moccasin.config import Config, initialize_global_config
+from moccasin.constants.vars import GITHUB, IS_WINDOWS, PYPI
+from moccasin.logging import logger
+
+
+def main(args: Namespace) -> int:
+    if IS_WINDOWS:
+        logger.error("The compile server is not supported on Windows.")
+        return 1
+
+    config = initialize_global_config()
+    project_path: Path = config.get_root()
+
+    if args.compile_server_command == "start":
+        return start_compile_server(config)
+
+    client = get_compile_server_client(project_path)
+    if args.compile_server_command == "stop":
+        if client is None:
+            logger.info("No compile server is running for this project.")
+            return 0
+        client.shutdown()
+        logger.info("Compile server stopped.")
+    elif args.compile_server_command == "status":
+        if client is None:
+            logger.info("No compile server is running for this project.")
+            return 0
+        status = client.ping()
+        logger.info(
+            f"Compile server running at {client.socket_path} (pid {status['pid']}, "
+            f"{status['workers']} workers, {status['cached_contracts']} cached contracts)"
+        )
+    return 0
+
+
+def start_compile_server(config: Config, n_workers: int | None = None) -> int:
+    """Runs a compile server for the project in the foreground, until it's
+    stopped with ``mox compile-server stop`` or interrupted.
+    """
+    project_path: Path = config.get_root()
+    if get_compile_server_client(project_path) is not None:
+        logger.error("A compile server is already running for this project.")
+        return 1
+
+    socket_path = get_socket_path(project_path)
+    socket_path.parent.mkdir(parents=True, exist_ok=True)
+    # @dev a socket left behind by a server that didn't shut down cleanly
+    socket_path.unlink(missing_ok=True)
+
+    if n_workers is None:
+        n_workers = max(1, _get_cpu_count() - 2)
+
+    _set_start_method()
+    # @dev the workers are forked from the server, so they inherit the project's
+    # sys path for the whole lifetime of the server
+    with _patch_sys_path(get_sys_paths_list(config)):
+        lib_folder = project_path.joinpath(config.lib_folder)
+        import_graph = ImportGraph(
+            [
+                project_path.joinpath(config.contracts_folder),
+                lib_folder.joinpath(GITHUB),
+                lib_folder.joinpath(PYPI),
+            ],
+            get_compiler_search_paths(),
+        )
+        server = CompileServer(socket_path, import_graph, n_workers)
+        signal.signal(signal.SIGTERM, lambda *_: server.stop())
+        logger.info(f"Compile server listening on {socket_path}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            server.pool.terminate()
+            socket_path.unlink(missing_ok=True)
+    logger.info("Compile server stopped.")
+    return 0
+
+
+class _CompileRequestHandler(socketserver.StreamRequestHandler):
+    server: "CompileServer"
+
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            return
+        try:
+            for message in self.server.process(json.loads(line)):
+                self.wfile.write(encode_message(message))
+                self.wfile.flush()
+        except BrokenPipeError:
+            logger.debug("Client disconnected before the request finished.")
+        except Exception as e:
+            logger.debug("".join(traceback.format_exception(e)))
+            error = "".join(traceback.format_exception_only(e)).strip()
+            self.wfile.write(encode_message({"error": error}))
+
+
+class CompileServer(socketserver.UnixStreamServer):
+    """Keeps a pool of compiler workers warm between ``mox compile`` runs, so
+    they don't pay for importing boa and vyper (and forking) every time.
+
+    Single contract requests are compiled in the server itself and the compiled
+    deployer is kept in memory, so compiling the same unchanged contract again
+    is only a matter of writing its artifact.
+
+    @dev requests are handled one at a time.
+    """
+
+    def __init__(self, socket_path: Path, import_graph: ImportGraph, n_workers: int):
+        super().__init__(str(socket_path), _CompileRequestHandler)
+        self.import_graph = import_graph
+        self.n_workers = n_workers
+        self.pool = multiprocessing.Pool(n_workers)
+        self._deployers: dict[Path, tuple[str, VyperDeployer | VVMDeployer]] = {}
+
+    def stop(self):
+        # @dev shutdown() blocks until serve_forever() returns, so it can't be
+        # called from the thread that's serving
+        threading.Thread(target=self.shutdown, daemon=True).start()
+
+    def process(self, request: dict) -> Iterator[dict]:
+        op = request.get("op")
+        if op == "ping":
+            yield {
+                "pid": multiprocessing.current_process().pid,
+                "workers": self.n_workers,
+                "cached_contracts": len(self._deployers),
+            }
+        elif op == "shutdown":
+            self.stop()
+            yield {"done": True}
+        elif op == "compile":
+            yield from self._compile(request)
+        else:
+            raise ValueError(f"Unknown compile server operation: {op}")
+
+    def _compile(self, request: dict) -> Iterator[dict]:
+        contracts = [Path(contract) for contract in request["contracts"]]
+        build_folder = Path(request["build_folder"])
+        write_data = request.get("write_data", False)
+        profile = request.get("profile", False)
+        if request.get("is_zksync", False):
+            raise ValueError("The compile server does not support zksync.")
+
+        if len(contracts) == 1:
+            contract_profile: dict | None = {} if profile else None
+            compiled = self._compile_in_process(
+                contracts[0], build_folder, write_data, contract_profile
+            )
+            yield {
+                "contract": str(contracts[0]),
+                "compiled": compiled,
+                "profile": contract_profile,
+            }
+        else:
+            try:
+                for contract_path, compiled, contract_profile in _compile_contracts(
+                    self.pool,
+                    contracts,
+                    build_folder,
+                    write_data=write_data,
+                    profile=profile,
+                ):
+                    yield {
+                        "contract": str(contract_path),
+                        "compiled": compiled,
+                        "profile": contract_profile,
+                    }
+            except Exception:
+                # @dev _compile_contracts terminates the pool on failure
+                self.pool = multiprocessing.Pool(self.n_workers)
+                raise
+        yield {"done": True}
+
+    def _compile_in_process(
+        self,
+        contract_path: Path,
+        build_folder: Path,
+        write_data: bool,
+        profile: dict | None = None,
+    ) -> bool | None:
+        self.import_graph.refresh()
+        cache_key = None
+        if contract_path.resolve() in self.import_graph.files:
+            cache_key = compute_cache_key(contract_path, self.import_graph)
+
+        cached = self._deployers.get(contract_path)
+        if cached is not None and cache_key is not None and cached[0] == cache_key:
+            deployer = cached[1]
+            logger.debug(f"Reusing compiled {contract_path.stem} from memory")
+            if profile is not None:
+                profile.update(make_skipped_profile("server"))
+        else:
+            try:
+                deployer = compile_(contract_path, build_folder, profile=profile)
+            except vyper.exceptions.InitializerException:
+                return None
+            if deployer is None:
+                return False
+            if cache_key is not None:
+                self._deployers[contract_path] = (cache_key, deployer)
+
+        if write_data:
+            write_build_data(get_build_data(deployer, contract_path), build_folder)
+        return True
@@ -1,4 +1,10 @@
+import csv
+import json
+import sys
 from argparse import Namespace
+from collections.abc import Iterable, Iterator
+from dataclasses import fields
+from datetime import datetime
 from enum import Enum
 
 from boa.deployments import Deployment
@@ -17,9 +23,36 @@ class PrintVerbosity(Enum):
     RAW = 4  # Raw deployment object
 
 
+class OutputFormat(Enum):
+    TEXT = "text"
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+# The fields each format level prints
+FIELDS_BY_VERBOSITY = {
+    PrintVerbosity.CONTRACT_ADDRESS: ["contract_address"],
+    PrintVerbosity.CONTRACT_ADDRESS_AND_NAME: [
+        "contract_address",
+        "contract_name",
+        "deployer",
+    ],
+    PrintVerbosity.ADDRESS_NAME_DEPLOYER: [
+        "contract_address",
+        "contract_name",
+        "deployer",
+        "rpc",
+        "tx_hash",
+        "source_code",
+    ],
+    PrintVerbosity.FULL_DETAILS: [field.name for field in fields(Deployment)],
+    PrintVerbosity.RAW: [field.name for field in fields(Deployment)],
+}
+
+
 def main(args: Namespace) -> int:
     initialize_global_config()
-    print_deployments_from_cli(
+    stream_deployments_from_cli(
         args.contract_name,
         args.format_level,
         args.db_path,
@@ -28,21 +61,123 @@ def main(args: Namespace) -> int:
         args.network,
         args.url,
         args.fork,
+        offset=args.offset,
+        since=parse_timestamp(args.since) if args.since else None,
+        until=parse_timestamp(args.until) if args.until else None,
+        output_format=args.output_format,
     )
     return 0
 
 
+def parse_timestamp(value: str) -> float:
+    """Parses a unix timestamp or an ISO 8601 date or time. Times without a
+    timezone are in local time.
+    """
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        raise ValueError(
+            f"Invalid time {value!r}, expected a unix timestamp or an ISO 8601 "
+            "date like 2024-05-01 or 2024-05-01T12:00:00+00:00."
+        ) from None
+
+
 def print_deployments_from_cli(
     contract_name: str | None = None,
     format_level: int = PrintVerbosity.CONTRACT_ADDRESS_AND_NAME.value,
     db_path: str | None = None,
     checked: bool = False,
     limit: int | None = None,
-    network: str = None,
-    url: str = None,
-    fork: bool = None,
+    network: str | None = None,
+    url: str | None = None,
+    fork: bool | None = None,
     config: Config | None = None,
+    offset: int | None = None,
+    since: float | None = None,
+    until: float | None = None,
+    output_format: str = OutputFormat.TEXT.value,
 ) -> list[Deployment]:
+    """Prints the deployments from the database.
+
+    :return: The deployments printed.
+    """
+    deployments, verbosity = _get_deployments_from_cli(
+        contract_name,
+        format_level,
+        db_path,
+        checked,
+        limit,
+        network,
+        url,
+        fork,
+        config,
+        offset=offset,
+        since=since,
+        until=until,
+    )
+    return print_deployments(deployments, verbosity, OutputFormat(output_format))
+
+
+def stream_deployments_from_cli(
+    contract_name: str | None = None,
+    format_level: int = PrintVerbosity.CONTRACT_ADDRESS_AND_NAME.value,
+    db_path: str | None = None,
+    checked: bool = False,
+    limit: int | None = None,
+    network: str | None = None,
+    url: str | None = None,
+    fork: bool | None = None,
+    config: Config | None = None,
+    offset: int | None = None,
+    since: float | None = None,
+    until: float | None = None,
+    output_format: str = OutputFormat.TEXT.value,
+) -> int:
+    """Prints the deployments as they're read from the database, without
+    keeping them in memory.
+
+    :return: The number of deployments printed.
+    """
+    deployments, verbosity = _get_deployments_from_cli(
+        contract_name,
+        format_level,
+        db_path,
+        checked,
+        limit,
+        network,
+        url,
+        fork,
+        config,
+        offset=offset,
+        since=since,
+        until=until,
+    )
+    return stream_deployments(deployments, verbosity, OutputFormat(output_format))
+
+
+def _get_deployments_from_cli(
+    contract_name: str | None = None,
+    format_level: int = PrintVerbosity.CONTRACT_ADDRESS_AND_NAME.value,
+    db_path: str | None = None,
+    checked: bool = False,
+    limit: int | None = None,
+    network: str | None = None,
+    url: str | None = None,
+    fork: bool | None = None,
+    config: Config | None = None,
+    offset: int | None = None,
+    since: float | None = None,
+    until: float | None = None,
+) -> tuple[Iterator[Deployment], PrintVerbosity]:
+    int_format_level = int(format_level)
+    if int_format_level > len(PrintVerbosity):
+        int_format_level = PrintVerbosity.RAW.value
+    verbosity = PrintVerbosity(int_format_level)
+
     if config is None:
         config = get_config()
 
@@ -69,32 +204,53 @@ def print_deployments_from_cli(
         logger.error(
             f"Cannot get deployments without a database path on network {active_network.name}.\nPlease specify one or change networks."
         )
-        return []
+        return iter([]), verbosity
 
-    deployments_list = []
     if not isinstance(limit, int) and not isinstance(limit, type(None)):
         raise ValueError(f"Limit must be an integer or None, not {type(limit)}.")
-    if checked:
-        deployments_list = active_network.get_deployments_checked(
-            contract_name=contract_name, limit=limit, chain_id=active_network.chain_id
-        )
-    else:
-        deployments_list = active_network.get_deployments_unchecked(
-            contract_name=contract_name, limit=limit, chain_id=active_network.chain_id
-        )
+    deployments = active_network.iter_deployments(
+        contract_name=contract_name,
+        limit=limit,
+        chain_id=active_network.chain_id,
+        checked=checked,
+        offset=offset,
+        since=since,
+        until=until,
+        # @dev only what's printed is read, e.g. addresses come from the index
+        columns=FIELDS_BY_VERBOSITY[verbosity],
+    )
+
+    return deployments, verbosity
 
-    int_format_level = int(format_level)
-    if int_format_level > len(PrintVerbosity):
-        int_format_level = PrintVerbosity.RAW.value
 
-    print_deployments(deployments_list, PrintVerbosity(int_format_level))
+def print_deployments(
+    deployments_list: Iterable[Deployment],
+    format_level: PrintVerbosity,
+    output_format: OutputFormat = OutputFormat.TEXT,
+) -> list[Deployment]:
+    deployments_list = list(deployments_list)
+    stream_deployments(deployments_list, format_level, output_format)
     return deployments_list
 
 
-def print_deployments(deployments_list: list[Deployment], format_level: PrintVerbosity):
-    if len(deployments_list) > 0:
-        print("-" * NUM_DASH)
-    for deployment in deployments_list:
+def stream_deployments(
+    deployments: Iterable[Deployment],
+    format_level: PrintVerbosity,
+    output_format: OutputFormat = OutputFormat.TEXT,
+) -> int:
+    """Prints each deployment as soon as it's read, so output starts right away
+    and memory use doesn't grow with the number of deployments.
+
+    :return: The number of deployments printed.
+    """
+    if output_format != OutputFormat.TEXT:
+        return _print_deployments_as_records(deployments, format_level, output_format)
+
+    count = 0
+    for deployment in deployments:
+        if count == 0:
+            print("-" * NUM_DASH)
+        count += 1
         if format_level == PrintVerbosity.CONTRACT_ADDRESS:
             print(f"Contract Address: {deployment.contract_address}")
             continue
@@ -151,5 +307,37 @@ def print_deployments(deployments_list: list[Deployment], format_level: PrintVer
             print("-" * NUM_DASH)
             continue
 
-    print(f"Total deployments: {len(deployments_list)}")
-    return deployments_list
+    print(f"Total deployments: {count}")
+    return count
+
+
+def _print_deployments_as_records(
+    deployments: Iterable[Deployment],
+    format_level: PrintVerbosity,
+    output_format: OutputFormat,
+) -> int:
+    field_names = FIELDS_BY_VERBOSITY[format_level]
+    csv_writer = None
+    if output_format == OutputFormat.CSV:
+        csv_writer = csv.writer(sys.stdout)
+        csv_writer.writerow(field_names)
+
+    count = 0
+    for deployment in deployments:
+        count += 1
+        # @dev only the requested fields are read, so the sources of a
+        # deployment aren't loaded unless they're printed
+        record = {name: getattr(deployment, name) for name in field_names}
+        if csv_writer is not None:
+            csv_writer.writerow(
+                [
+                    value
+                    if isinstance(value, (str, int, float)) or value is None
+                    else json.dumps(value, default=str)
+                    for value in record.values()
+                ]
+            )
+        else:
+            print(json.dumps(record, default=str))
+    logger.info(f"Total deployments: {count}")
+    return count
@@ -1,44 +1,82 @@
+import hashlib
 import os
 import re
 import shutil
 import subprocess
 import sys
+import tempfile
+import threading
 import tomllib
 import traceback
 import zipfile
 from argparse import Namespace
 from base64 import b64encode
-from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
-from urllib.parse import quote
+from typing import Any, BinaryIO, Callable, cast
+from urllib.parse import quote, urlparse
 
 import requests  # type: ignore
 import tomli_w
 from packaging.requirements import Requirement
+from packaging.utils import canonicalize_name
 from packaging.version import parse as parse_version
 from tqdm import tqdm
 
+from moccasin._atomic_write import atomic_write
 from moccasin._dependency_utils import (
     DependencyType,
     _write_new_dependencies,
     classify_dependency,
 )
+from moccasin._download import DOWNLOAD_CHUNK_SIZE, ResumableDownload
+from moccasin._http_cache import HttpCache
+from moccasin._install_state import is_install_up_to_date, record_install_state
+from moccasin._lockfile import Lockfile
+from moccasin._package_store import PackageStore, link_tree
+from moccasin._purge_journal import recover_interrupted_purges
 from moccasin.config import get_or_initialize_config
-from moccasin.constants.vars import GITHUB, PACKAGE_VERSION_FILE, PYPI, REQUEST_HEADERS
+from moccasin.constants.vars import (
+    DEFAULT_GITHUB_API_CACHE_TTL,
+    DOWNLOAD_CACHE_FOLDER,
+    GITHUB,
+    HTTP_CACHE_FOLDER,
+    LOCKFILE,
+    MOCCASIN_DEFAULT_FOLDER,
+    PACKAGE_STORE_FOLDER,
+    PACKAGE_VERSION_FILE,
+    PYPI,
+    REQUEST_HEADERS,
+)
 from moccasin.logging import logger, set_log_level
 
+# How many GitHub packages are resolved and downloaded at the same time
+GITHUB_INSTALL_WORKERS = 8
+
+
+class PipInstallError(Exception):
+    """Raised when uv can't install the pip dependencies."""
+
 
 def main(args: Namespace):
     requirements = args.requirements if hasattr(args, "requirements") else []
     no_install = args.no_install if hasattr(args, "no_install") else False
     quiet = args.quiet if hasattr(args, "quiet") else False
     debug = args.debug if hasattr(args, "debug") else False
+    frozen = args.frozen if hasattr(args, "frozen") else False
+    offline = args.offline if hasattr(args, "offline") else False
+    mirror = args.mirror if hasattr(args, "mirror") else None
     return mox_install(
         requirements=requirements,
         no_install=no_install,
         quiet=quiet,
         debug=debug,
         override_logger=False,
+        check_install_state=False,
+        frozen=frozen,
+        offline=offline,
+        mirror=mirror,
     )
 
 
@@ -49,9 +87,26 @@ def mox_install(
     quiet=False,
     debug=False,
     override_logger=False,
+    check_install_state=True,
+    frozen=False,
+    offline=False,
+    mirror=None,
 ):
     """@dev IMPORTANT, this function can override the logger level, it's good to
     reset it after calling this function.
+
+    @dev when installing the project's own dependencies with ``check_install_state``,
+    nothing is done if they were already installed and nothing changed since
+    (see moccasin._install_state). ``mox install`` itself skips this check, so it
+    still picks up new "latest" versions of unpinned GitHub dependencies.
+
+    @dev every install of the project's dependencies updates moccasin.lock, and
+    ``frozen`` installs exactly what it holds, without any GitHub API call.
+
+    @dev ``offline`` (or the ``offline_install`` config) installs without any
+    network access, from what is already installed, the package store, uv's
+    cache, and the ``mirror`` folder (or the ``install_mirror`` config) laid out
+    as ``github/<org>/<repo>/<version>.zip`` and ``pypi/<wheels>``.
     """
     if quiet:
         set_log_level(quiet=quiet, debug=debug)
@@ -59,17 +114,58 @@ def mox_install(
         return 0
     if config is None:
         config = get_or_initialize_config()
-    if len(requirements) == 0:
+    from_config = len(requirements) == 0
+    if from_config:
         requirements = config.get_dependencies()
+    elif frozen:
+        logger.error(
+            f"--frozen installs the dependencies in {LOCKFILE}, it can't be "
+            "combined with requirements."
+        )
+        sys.exit(1)
 
     # Get dependencies install path and create it if it doesn't exist
     # @dev allows to avoid vyper compiler error when missing one dir
     install_path: Path = config.get_base_dependencies_install_path()
     install_path.joinpath(PYPI).mkdir(exist_ok=True, parents=True)
     install_path.joinpath(GITHUB).mkdir(exist_ok=True, parents=True)
+    # @dev before checking what's installed, an interrupted purge may have
+    # moved packages out of lib
+    recover_interrupted_purges(install_path)
     if len(requirements) == 0:
         logger.info("No dependencies to install.")
         return 0
+    if (
+        from_config
+        and check_install_state
+        and is_install_up_to_date(requirements, install_path)
+    ):
+        logger.debug("Dependencies unchanged since the last install, skipping.")
+        return 0
+
+    offline = offline or config.offline_install
+    if mirror is not None:
+        mirror = Path(mirror).resolve()
+    elif config.install_mirror is not None:
+        mirror = config.get_root().joinpath(config.install_mirror)
+
+    lockfile = Lockfile.load(config.get_root().joinpath(LOCKFILE))
+    if frozen:
+        try:
+            _frozen_installs(
+                requirements,
+                lockfile,
+                install_path,
+                quiet,
+                override_logger,
+                offline=offline,
+                mirror=mirror,
+            )
+        except PipInstallError as e:
+            logger.error(str(e))
+            sys.exit(1)
+        record_install_state(requirements, install_path)
+        return 0
 
     pip_requirements = []
     github_requirements = []
@@ -79,20 +175,268 @@ def mox_install(
         else:
             pip_requirements.append(requirement)
 
-    # @dev in case of fresh install, dependencies might be ordered differently
-    # since we install pip packages first and github packages later
-    # @dev see _dependency_utils._write_new_dependencies
+    # @dev offline, fail before installing anything if a GitHub package can't
+    # be found locally
+    github_locked = None
+    if offline and len(github_requirements) > 0:
+        github_locked = _resolve_offline_github_packages(
+            github_requirements, install_path.joinpath(GITHUB), lockfile.github, mirror
+        )
+
+    # @dev if the pip requirements are the ones moccasin.lock was written for,
+    # reuse its resolution instead of resolving them again
+    pip_locked = None
+    if sorted(pip_requirements) == sorted(
+        r for r in lockfile.requirements if classify_dependency(r) == DependencyType.PIP
+    ):
+        pip_locked = lockfile.pypi
+
+    pip_install = None
     if len(pip_requirements) > 0:
-        _pip_installs(
-            pip_requirements, install_path.joinpath(PYPI), quiet, override_logger
+        pip_install = partial(
+            _pip_installs,
+            pip_requirements,
+            install_path.joinpath(PYPI),
+            quiet,
+            override_logger,
+            offline=offline,
+            mirror=mirror,
+            locked=pip_locked,
         )
+    github_install = None
     if len(github_requirements) > 0:
-        _github_installs(
-            github_requirements, install_path.joinpath(GITHUB), quiet, override_logger
+        github_install = partial(
+            _github_installs,
+            github_requirements,
+            install_path.joinpath(GITHUB),
+            quiet,
+            override_logger,
+            locked=github_locked,
+            offline=offline,
+            mirror=mirror,
+            http_cache=HttpCache(
+                MOCCASIN_DEFAULT_FOLDER.joinpath(HTTP_CACHE_FOLDER),
+                config.github_api_cache_ttl,
+            ),
         )
+    try:
+        pip_installed, github_result = _run_install_phases(pip_install, github_install)
+    except PipInstallError as e:
+        logger.error(str(e))
+        sys.exit(1)
+    github_entries, github_installed = github_result or ({}, False)
+
+    # @dev moccasin.toml is only written once both phases are done, pip first
+    # @dev in case of fresh install, dependencies might be ordered differently
+    # since we install pip packages first and github packages later
+    # @dev see _dependency_utils._write_new_dependencies
+    if pip_installed:
+        _write_new_dependencies(pip_requirements, DependencyType.PIP)
+    if github_installed:
+        _write_new_dependencies(github_requirements, DependencyType.GITHUB)
+    _update_lockfile(lockfile, config.get_dependencies(), install_path, github_entries)
+    if from_config:
+        record_install_state(requirements, install_path)
     return 0
 
 
+def _run_install_phases(
+    pip_install: Callable | None, github_install: Callable | None
+) -> tuple[Any, Any]:
+    """Runs the pip install in a thread while the GitHub install runs in this
+    one, so an install takes as long as the slower of the two.
+
+    :return: The result of each phase, None for a phase that isn't given.
+    :raises Exception: The error of the pip install if both phases fail, after
+        logging the error of the GitHub install.
+    """
+    if pip_install is None or github_install is None:
+        return (
+            None if pip_install is None else pip_install(),
+            None if github_install is None else github_install(),
+        )
+    errors: list[Exception] = []
+    pip_result = github_result = None
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        pip_future = executor.submit(pip_install)
+        try:
+            github_result = github_install()
+        except Exception as e:
+            errors.append(e)
+        # @dev wait for pip even if the GitHub install failed
+        try:
+            pip_result = pip_future.result()
+        except Exception as e:
+            errors.insert(0, e)
+    if errors:
+        for error in errors[1:]:
+            logger.error(f"Installing GitHub dependencies failed: {error}")
+        raise errors[0]
+    return pip_result, github_result
+
+
+def _update_lockfile(
+    lockfile: Lockfile,
+    requirements: list[str],
+    install_path: Path,
+    github_entries: dict[str, dict],
+):
+    """Writes moccasin.lock for every declared dependency.
+
+    :param github_entries: The lock entries of the GitHub packages installed in
+        this run. The others are locked at the version in versions.toml.
+    """
+    lockfile.requirements = requirements
+    installed_versions = {
+        package.lower(): version
+        for package, version in _read_versions_file(
+            install_path.joinpath(GITHUB, PACKAGE_VERSION_FILE)
+        ).items()
+    }
+    package_store = PackageStore(MOCCASIN_DEFAULT_FOLDER.joinpath(PACKAGE_STORE_FOLDER))
+    github: dict[str, dict] = {}
+    for requirement in requirements:
+        if classify_dependency(requirement) != DependencyType.GITHUB:
+            continue
+        org, repo, _ = _parse_github_id(requirement.strip().strip("'\""))
+        package = f"{org}/{repo}"
+        entry = github_entries.get(package)
+        if entry is None:
+            version = installed_versions.get(package)
+            if version is None:
+                # @dev not installed, so --frozen refuses the lock until it is
+                continue
+            entry = {
+                "version": version,
+                **package_store.get_github_metadata(org, repo, version),
+            }
+        previous = lockfile.github.get(package, {})
+        if previous.get("version") == entry["version"]:
+            # @dev a package that was already installed might not know where it
+            # was downloaded from anymore
+            entry = {**previous, **entry}
+        github[package] = entry
+    lockfile.github = github
+    lockfile.pypi = _installed_pip_packages(install_path.joinpath(PYPI))
+    lockfile.save()
+
+
+def _frozen_installs(
+    requirements: list[str],
+    lockfile: Lockfile,
+    install_path: Path,
+    quiet: bool = False,
+    override_logger=False,
+    offline: bool = False,
+    mirror: Path | None = None,
+):
+    if not lockfile.exists():
+        logger.error(f"No {LOCKFILE} found, run `mox install` to create it.")
+        sys.exit(1)
+    if not lockfile.matches(requirements):
+        logger.error(
+            f"{LOCKFILE} is out of date with the project's dependencies, "
+            "run `mox install` to update it."
+        )
+        sys.exit(1)
+    if offline and len(lockfile.github) > 0:
+        _resolve_offline_github_packages(
+            list(lockfile.github),
+            install_path.joinpath(GITHUB),
+            lockfile.github,
+            mirror,
+        )
+    pip_install = None
+    if len(lockfile.pypi) > 0:
+        pip_install = partial(
+            _frozen_pip_installs,
+            lockfile.pypi,
+            install_path.joinpath(PYPI),
+            quiet,
+            override_logger,
+            offline=offline,
+            mirror=mirror,
+        )
+    github_install = None
+    if len(lockfile.github) > 0:
+        github_install = partial(
+            _github_installs,
+            list(lockfile.github),
+            install_path.joinpath(GITHUB),
+            quiet,
+            override_logger,
+            locked=lockfile.github,
+            offline=offline,
+            mirror=mirror,
+        )
+    _run_install_phases(pip_install, github_install)
+
+
+def _resolve_offline_github_packages(
+    github_ids: list[str],
+    base_install_path: Path,
+    lock_entries: dict[str, dict],
+    mirror: Path | None,
+) -> dict[str, dict]:
+    """Finds the version of every GitHub package to install offline, and checks
+    each one is installed, in the package store or in the mirror.
+
+    Unpinned packages get the version in moccasin.lock, or the one installed.
+    Exits listing every package that is missing.
+
+    :return: The lock entry of every package, by ``org/repo``.
+    """
+    installed_versions = _read_versions_file(
+        base_install_path.joinpath(PACKAGE_VERSION_FILE)
+    )
+    installed_versions = {k.lower(): v for k, v in installed_versions.items()}
+    package_store = PackageStore(MOCCASIN_DEFAULT_FOLDER.joinpath(PACKAGE_STORE_FOLDER))
+
+    resolved = {}
+    missing = []
+    for org, repo, version in map(_parse_github_id, github_ids):
+        package = f"{org}/{repo}"
+        lock_entry = lock_entries.get(package, {})
+        installed_version = installed_versions.get(package, None)
+        if version is None:
+            version = lock_entry.get("version", installed_version)
+        if version is None:
+            missing.append(f"{package} (no version pinned, locked or installed)")
+            continue
+
+        is_installed = (
+            installed_version == version
+            and base_install_path.joinpath(org, repo).exists()
+        )
+        in_store = package_store.get_github_package(org, repo, version) is not None
+        archive_path = (
+            None if mirror is None else _mirror_archive_path(mirror, org, repo, version)
+        )
+        in_mirror = archive_path is not None and archive_path.exists()
+        if not (is_installed or in_store or in_mirror):
+            reason = "not in the package store"
+            if archive_path is not None:
+                reason += f", nor at {archive_path}"
+            missing.append(f"{package}@{version} ({reason})")
+            continue
+        if lock_entry.get("version") == version:
+            resolved[package] = lock_entry
+        else:
+            resolved[package] = {"version": version}
+
+    if len(missing) > 0:
+        logger.error(
+            "Can't install offline, these GitHub dependencies are missing:\n"
+            + "\n".join(f"  - {package}" for package in missing)
+        )
+        sys.exit(1)
+    return resolved
+
+
+def _mirror_archive_path(mirror: Path, org: str, repo: str, version: str) -> Path:
+    return mirror.joinpath(GITHUB, org, repo, f"{quote(version, safe='')}.zip")
+
+
 # Much of this code thanks to brownie
 # https://github.com/eth-brownie/brownie/blob/master/brownie/_config.py
 def _github_installs(
@@ -100,133 +444,408 @@ def _github_installs(
     base_install_path: Path,
     quiet: bool = False,
     override_logger=False,
-):
+    locked: dict[str, dict] | None = None,
+    offline: bool = False,
+    mirror: Path | None = None,
+    http_cache: HttpCache | None = None,
+) -> tuple[dict[str, dict], bool]:
+    """Installs GitHub packages into ``base_install_path``, at the versions in
+    ``locked`` (from moccasin.lock) if given.
+
+    :return: The lock entry of every package, by ``org/repo``, and whether any
+        package was installed.
+    """
     logger.info(f"Installing {len(github_ids)} GitHub packages...")
-    for package_id in github_ids:
-        try:
-            if "@" in package_id:
-                path, version = package_id.split("@", 1)
-            else:
-                path = package_id
-                version = None  # We'll fetch the latest version later
-            org, repo = path.split("/")
-            org = org.strip().lower()
-            repo = repo.strip().lower()
-        except ValueError:
-            raise ValueError(
-                "Invalid package ID. Must be given as ORG/REPO[@VERSION]"
-                "\ne.g. 'pcaversaccio/snekmate@v2.5.0'"
-            ) from None
+    packages = [_parse_github_id(package_id) for package_id in github_ids]
 
-        headers = REQUEST_HEADERS.copy()
-        headers.update(_maybe_retrieve_github_auth())
+    versions_install_path = base_install_path.joinpath(PACKAGE_VERSION_FILE)
+    versions_data = _read_versions_file(versions_install_path)
+    installed_versions = {k.lower(): v for k, v in versions_data.items()}
 
-        if version is None:
-            version = _get_latest_version(org, repo, headers)
-            logger.info(f"Using latest version for {org}/{repo}: {version}")
-
-        org_install_path = base_install_path.joinpath(f"{org}")
-        org_install_path.mkdir(exist_ok=True, parents=True)
-        repo_install_path = org_install_path.joinpath(f"{repo}")
-        versions_install_path = base_install_path.joinpath(PACKAGE_VERSION_FILE)
-
-        if repo_install_path.exists():
-            with open(versions_install_path, "rb") as f:
-                versions = tomllib.load(f)
-                versions = {k.lower(): v for k, v in versions.items()}
-                installed_version = versions.get(f"{org}/{repo}", None)
-            if installed_version == version:
-                logger.info(f"{org}/{repo} already installed at version {version}")
-                continue
-            else:
-                if override_logger:
-                    set_log_level(quiet=False)
-                logger.info(
-                    f"Updating {org}/{repo} from {installed_version} to {version}"
+    # @dev one session for every request, so connections to GitHub are reused
+    session = requests.Session()
+    session.headers.update(REQUEST_HEADERS)
+    session.headers.update(_maybe_retrieve_github_auth())
+    if http_cache is None:
+        http_cache = HttpCache(
+            MOCCASIN_DEFAULT_FOLDER.joinpath(HTTP_CACHE_FOLDER),
+            DEFAULT_GITHUB_API_CACHE_TTL,
+        )
+    progress = _DownloadProgress()
+    package_store = PackageStore(MOCCASIN_DEFAULT_FOLDER.joinpath(PACKAGE_STORE_FOLDER))
+
+    entries: dict[str, dict] = {}
+    installed: list[str] = []
+    errors: list[Exception] = []
+    try:
+        with ThreadPoolExecutor(
+            max_workers=min(GITHUB_INSTALL_WORKERS, len(packages))
+        ) as executor:
+            futures = [
+                executor.submit(
+                    _github_install,
+                    org,
+                    repo,
+                    version,
+                    base_install_path,
+                    installed_versions,
+                    package_store,
+                    session,
+                    http_cache,
+                    progress,
+                    override_logger,
+                    None if locked is None else locked[f"{org}/{repo}"],
+                    mirror if offline else None,
                 )
+                for org, repo, version in packages
+            ]
+            for future in futures:
+                try:
+                    package, entry, changed = future.result()
+                except Exception as e:
+                    errors.append(e)
+                    continue
+                entries[package] = entry
+                if changed:
+                    installed.append(package)
+    finally:
+        progress.close()
+        session.close()
 
-        if re.match(r"^[0-9a-f]+$", version):
-            download_url = (
-                f"https://api.github.com/repos/{org}/{repo}/zipball/{version}"
-            )
+    # @dev versions.toml is only written once all the downloads are done,
+    # keeping the packages that did install
+    if len(installed) > 0:
+        for package in installed:
+            versions_data[package] = entries[package]["version"]
+        _write_versions_file(versions_install_path, versions_data)
+    if len(errors) > 0:
+        raise errors[0]
+    return entries, len(installed) > 0
+
+
+def _parse_github_id(package_id: str) -> tuple[str, str, str | None]:
+    try:
+        if "@" in package_id:
+            path, version = package_id.split("@", 1)
         else:
-            download_url = _get_download_url_from_tag(org, repo, version, headers)
-        existing = list(repo_install_path.parent.iterdir())
+            path = package_id
+            version = None  # We'll fetch the latest version later
+        org, repo = path.split("/")
+    except ValueError:
+        raise ValueError(
+            "Invalid package ID. Must be given as ORG/REPO[@VERSION]"
+            "\ne.g. 'pcaversaccio/snekmate@v2.5.0'"
+        ) from None
+    return org.strip().lower(), repo.strip().lower(), version
+
+
+def _github_install(
+    org: str,
+    repo: str,
+    version: str | None,
+    base_install_path: Path,
+    installed_versions: dict[str, str],
+    package_store: PackageStore,
+    session: requests.Session,
+    http_cache: HttpCache,
+    progress: "_DownloadProgress",
+    override_logger=False,
+    locked: dict | None = None,
+    offline_mirror: Path | None = None,
+) -> tuple[str, dict, bool]:
+    """Installs one GitHub package into ``base_install_path/org/repo``. With an
+    ``offline_mirror``, it is extracted from the mirror instead of downloaded.
+
+    :return: The package, its lock entry, and whether anything was installed
+        (False if it was already installed at that version).
+    """
+    if locked is not None:
+        version = locked["version"]
+    elif version is None:
+        version = _get_latest_version(org, repo, session, http_cache)
+        logger.info(f"Using latest version for {org}/{repo}: {version}")
+
+    org_install_path = base_install_path.joinpath(f"{org}")
+    org_install_path.mkdir(exist_ok=True, parents=True)
+    repo_install_path = org_install_path.joinpath(f"{repo}")
+
+    if repo_install_path.exists():
+        installed_version = installed_versions.get(f"{org}/{repo}", None)
+        if installed_version == version:
+            logger.info(f"{org}/{repo} already installed at version {version}")
+            metadata = package_store.get_github_metadata(org, repo, version)
+            return f"{org}/{repo}", {"version": version, **metadata}, False
+        else:
+            if override_logger:
+                set_log_level(quiet=False)
+            logger.info(f"Updating {org}/{repo} from {installed_version} to {version}")
+
+    store_path = package_store.get_github_package(org, repo, version)
+    if store_path is None and offline_mirror is not None:
+        store_path = _extract_mirror_package(
+            org, repo, version, package_store, offline_mirror, locked
+        )
+    elif store_path is None:
+        store_path = _download_github_package(
+            org, repo, version, package_store, session, http_cache, progress, locked
+        )
+    else:
+        logger.debug(f"Using {org}/{repo}@{version} from the package store")
+
+    # @dev every package is linked into its own folder first, so concurrent
+    # installs of packages from the same org don't see each other's files
+    staging_path = Path(tempfile.mkdtemp(dir=org_install_path, prefix=".tmp_"))
+    try:
+        link_tree(store_path, staging_path.joinpath(repo))
+        _replace_dir(staging_path.joinpath(repo), repo_install_path)
+    finally:
+        shutil.rmtree(staging_path, ignore_errors=True)
+    metadata = package_store.get_github_metadata(org, repo, version)
+    return f"{org}/{repo}", {"version": version, **metadata}, True
+
+
+def _download_github_package(
+    org: str,
+    repo: str,
+    version: str,
+    package_store: PackageStore,
+    session: requests.Session,
+    http_cache: HttpCache,
+    progress: "_DownloadProgress",
+    locked: dict | None = None,
+) -> Path:
+    """Downloads a GitHub package into the package store, from the URL in its
+    ``locked`` entry if given.
+
+    :return: The path of the package in the store.
+    """
+    if locked is not None:
+        if "url" not in locked:
+            raise ValueError(
+                f"{org}/{repo}@{version} is neither installed nor in the package "
+                f"store, and {LOCKFILE} doesn't say where to download it from. "
+                "Run `mox install` to update it."
+            )
+        download_url, commit = locked["url"], locked.get("commit")
+        expected_sha256 = locked.get("sha256")
+    elif re.match(r"^[0-9a-f]+$", version):
+        download_url = f"https://api.github.com/repos/{org}/{repo}/zipball/{version}"
+        commit = version
+        expected_sha256 = None
+    else:
+        download_url, commit = _get_download_url_from_tag(
+            org, repo, version, session, http_cache
+        )
+        expected_sha256 = None
 
+    staging_path = package_store.make_staging_folder()
+    try:
         # Some versions contain special characters and github api seems to display url without
         # encoding them.
         # It results in a ConnectionError exception because the actual download url is encoded.
         # In this case we try to sanitize the version in url and download again.
         try:
-            _stream_download(download_url, str(repo_install_path.parent), headers)
+            archive_hash, archive_url = _stream_download(
+                download_url, str(staging_path), session, progress, expected_sha256
+            )
         except ConnectionError:
             download_url = f"https://api.github.com/repos/{org}/{repo}/zipball/refs/tags/{quote(version)}"
-            _stream_download(download_url, str(repo_install_path.parent), headers)
-
-        try:
-            installed = next(
-                i for i in repo_install_path.parent.iterdir() if i not in existing
+            archive_hash, archive_url = _stream_download(
+                download_url, str(staging_path), session, progress, expected_sha256
             )
-        except StopIteration:
-            installed = None
-
-        if installed:
-            if repo_install_path.exists():
-                shutil.rmtree(repo_install_path)
-            shutil.move(installed, repo_install_path)
-
-        # Update versions file
-        if versions_install_path.exists():
-            with open(versions_install_path, "rb") as f:
-                versions_data = tomllib.load(f)
-            versions_data[f"{org}/{repo}"] = version
-            with open(versions_install_path, "wb") as f:
-                tomli_w.dump(versions_data, f)
-        else:
-            with open(versions_install_path, "w", encoding="utf-8") as f:
-                toml_string = tomli_w.dumps({f"{org}/{repo}": version})
-                f.write(toml_string)
-        _write_new_dependencies(github_ids, DependencyType.GITHUB)
+        logger.debug(f"Downloaded {archive_url} (sha256 {archive_hash})")
+        metadata = {"url": archive_url, "sha256": archive_hash}
+        if commit is not None:
+            metadata["commit"] = commit
+        return _add_to_store(
+            staging_path, org, repo, version, package_store, metadata, locked
+        )
+    finally:
+        shutil.rmtree(staging_path, ignore_errors=True)
 
 
-def _get_latest_version(org: str, repo: str, headers: dict) -> str:
-    response = requests.get(
-        f"https://api.github.com/repos/{org}/{repo}/releases/latest", headers=headers
+def _extract_mirror_package(
+    org: str,
+    repo: str,
+    version: str,
+    package_store: PackageStore,
+    mirror: Path,
+    locked: dict | None = None,
+) -> Path:
+    """Extracts a GitHub package from the mirror into the package store.
+
+    :return: The path of the package in the store.
+    """
+    archive_path = _mirror_archive_path(mirror, org, repo, version)
+    staging_path = package_store.make_staging_folder()
+    try:
+        archive_hash = _hash_archive(archive_path)
+        with open(archive_path, "rb") as archive:
+            _extract_archive(archive, str(staging_path))
+        logger.debug(f"Extracted {archive_path} (sha256 {archive_hash})")
+        # @dev keep where the package comes from on GitHub, if known
+        metadata = {}
+        if locked is not None:
+            metadata = {k: locked[k] for k in ("url", "commit") if k in locked}
+        metadata["sha256"] = archive_hash
+        return _add_to_store(
+            staging_path, org, repo, version, package_store, metadata, locked
+        )
+    finally:
+        shutil.rmtree(staging_path, ignore_errors=True)
+
+
+def _add_to_store(
+    staging_path: Path,
+    org: str,
+    repo: str,
+    version: str,
+    package_store: PackageStore,
+    metadata: dict,
+    locked: dict | None = None,
+) -> Path:
+    expected_hash = None if locked is None else locked.get("sha256")
+    if expected_hash is not None and expected_hash != metadata["sha256"]:
+        raise ValueError(
+            f"The archive of {org}/{repo}@{version} doesn't match {LOCKFILE}: "
+            f"expected sha256 {expected_hash}, got {metadata['sha256']}."
+        )
+    # @dev GitHub zipballs hold a single "<org>-<repo>-<commit>" folder
+    extracted = next(staging_path.iterdir(), None)
+    if extracted is None:
+        raise ValueError(f"The archive of {org}/{repo}@{version} is empty")
+    return package_store.add_github_package(extracted, org, repo, version, metadata)
+
+
+def _read_versions_file(versions_install_path: Path) -> dict:
+    if not versions_install_path.exists():
+        return {}
+    with open(versions_install_path, "rb") as f:
+        return tomllib.load(f)
+
+
+def _write_versions_file(versions_install_path: Path, versions_data: dict):
+    atomic_write(versions_install_path, tomli_w.dumps(versions_data))
+
+
+def _get_latest_version(
+    org: str, repo: str, session: requests.Session, http_cache: HttpCache
+) -> str:
+    release = http_cache.get_json(
+        session, f"https://api.github.com/repos/{org}/{repo}/releases/latest"
     )
-    if response.status_code == 200:
-        return response.json()["tag_name"].lstrip("v")
+    if release is not None:
+        return release["tag_name"].lstrip("v")
 
-    response = requests.get(
-        f"https://api.github.com/repos/{org}/{repo}/tags?per_page=1", headers=headers
+    data = http_cache.get_json(
+        session, f"https://api.github.com/repos/{org}/{repo}/tags?per_page=1"
     )
-    if response.status_code == 200:
-        data = response.json()
-        if data:
-            return data[0]["name"].lstrip("v")
+    if data:
+        return data[0]["name"].lstrip("v")
 
     raise ValueError(f"Unable to determine latest version for {org}/{repo}")
 
 
+class _DownloadProgress:
+    """A single progress bar for every download of an install, which may run
+    in parallel. The bar is only shown once a download starts.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._progress_bar: tqdm | None = None
+
+    def add_total(self, size: int):
+        with self._lock:
+            if self._progress_bar is None:
+                self._progress_bar = tqdm(total=0, unit="iB", unit_scale=True)
+            self._progress_bar.total += size
+            self._progress_bar.refresh()
+
+    def update(self, size: int):
+        with self._lock:
+            if self._progress_bar is not None:
+                self._progress_bar.update(size)
+
+    def close(self):
+        with self._lock:
+            if self._progress_bar is not None:
+                self._progress_bar.close()
+
+
 def _stream_download(
-    download_url: str, target_path: str, headers: dict[str, str] = REQUEST_HEADERS
-) -> None:
-    response = requests.get(download_url, stream=True, headers=headers)
+    download_url: str,
+    target_path: str,
+    session: requests.Session,
+    progress: _DownloadProgress,
+    expected_sha256: str | None = None,
+) -> tuple[str, str]:
+    """Downloads a zip archive and extracts it into ``target_path``.
 
-    response.raise_for_status()
+    @dev the archive is downloaded to a checkpoint in the download cache, so a
+    dropped connection is retried and resumed instead of failing the install.
 
-    total_size = int(response.headers.get("content-length", 0))
-    progress_bar = tqdm(total=total_size, unit="iB", unit_scale=True)
-    content = bytes()
+    :param expected_sha256: The sha256 the archive must have, e.g. from
+        moccasin.lock.
+
+    :return: The sha256 of the archive, and the URL it was downloaded from
+        after redirects.
+    """
+    download = ResumableDownload(
+        session,
+        download_url,
+        MOCCASIN_DEFAULT_FOLDER.joinpath(DOWNLOAD_CACHE_FOLDER),
+        progress,
+        expected_sha256=expected_sha256,
+    )
+    archive_path = download.run()
+    # @dev the download hashes the archive as it verifies it
+    archive_hash = cast(str, download.sha256)
+    try:
+        with open(archive_path, "rb") as archive:
+            _extract_archive(archive, target_path)
+    finally:
+        download.discard()
+    # @dev GitHub redirects API downloads to codeload.github.com, which
+    # doesn't count against the API rate limit. Private repos get a token
+    # in the query string, which must not end up in the lockfile.
+    final_url = download.final_url
+    archive_url = download_url if urlparse(final_url).query else final_url
+    return archive_hash, archive_url
 
-    for data in response.iter_content(None, decode_unicode=True):
-        progress_bar.update(len(data))
-        content += data
-    progress_bar.close()
 
-    with zipfile.ZipFile(BytesIO(content)) as zf:
+def _extract_archive(archive: BinaryIO, target_path: str):
+    """Extracts a zip archive into ``target_path``."""
+    with zipfile.ZipFile(archive) as zf:
         zf.extractall(target_path)
 
 
+def _hash_archive(archive_path: Path) -> str:
+    hasher = hashlib.sha256()
+    with open(archive_path, "rb") as f:
+        for data in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b""):
+            hasher.update(data)
+    return hasher.hexdigest()
+
+
+def _replace_dir(source: Path, target: Path):
+    """Moves the ``source`` folder to ``target``, replacing what is there with
+    renames only, so ``target`` is never left half written.
+    """
+    previous = None
+    if target.exists():
+        previous = target.with_name(f".tmp_old_{os.getpid()}_{target.name}")
+        os.rename(target, previous)
+    try:
+        os.rename(source, target)
+    except Exception:
+        if previous is not None:
+            os.rename(previous, target)
+        raise
+    if previous is not None:
+        shutil.rmtree(previous, ignore_errors=True)
+
+
 def _maybe_retrieve_github_auth() -> dict[str, str]:
     """Returns appropriate github authorization headers.
 
@@ -239,13 +858,15 @@ def _maybe_retrieve_github_auth() -> dict[str, str]:
     return {}
 
 
-def _get_download_url_from_tag(org: str, repo: str, version: str, headers: dict) -> str:
-    response = requests.get(
-        f"https://api.github.com/repos/{org}/{repo}/tags?per_page=100", headers=headers
+def _get_download_url_from_tag(
+    org: str, repo: str, version: str, session: requests.Session, http_cache: HttpCache
+) -> tuple[str, str]:
+    """Returns the zipball URL and the commit of the tag for ``version``."""
+    data = http_cache.get_json(
+        session,
+        f"https://api.github.com/repos/{org}/{repo}/tags?per_page=100",
+        raise_for_status=True,
     )
-    response.raise_for_status()
-
-    data = response.json()
     if not data:
         raise ValueError("Github repository has no tags set")
 
@@ -254,7 +875,7 @@ def _get_download_url_from_tag(org: str, repo: str, version: str, headers: dict)
         tag_version = tag["name"].lstrip("v")
         available_versions.append(tag_version)
         if tag_version == version:
-            return tag["zipball_url"]
+            return tag["zipball_url"], tag["commit"]["sha"]
 
     # If we've gone through all tags without finding a match, raise an error
     raise ValueError(
@@ -268,7 +889,16 @@ def _pip_installs(
     base_install_path: Path,
     quiet: bool = False,
     override_logger=False,
-):
+    offline: bool = False,
+    mirror: Path | None = None,
+    locked: dict[str, str] | None = None,
+) -> bool:
+    """Installs pip packages into ``base_install_path``. If some are missing and
+    ``locked`` (the pip packages in moccasin.lock) is given, exactly those are
+    installed instead of resolving the requirements again.
+
+    :return: Whether any package was installed.
+    """
     logger.info(f"Installing {len(package_ids)} pip packages...")
 
     # Check if they are already installed on the right version
@@ -294,30 +924,100 @@ def _pip_installs(
 
     if len(packages_to_install) == 0:
         logger.info("All packages already installed.")
-        return 0
+        return False
+
+    if locked:
+        _frozen_pip_installs(
+            locked, base_install_path, quiet, override_logger, offline, mirror
+        )
+        return True
 
     if override_logger:
         set_log_level(quiet=False)
 
-    cmd = [
-        "uv",
-        "pip",
-        "install",
-        *packages_to_install,
-        "--target",
-        str(base_install_path),
+    _uv_pip_install(packages_to_install, base_install_path, quiet, offline, mirror)
+    return True
+
+
+def _frozen_pip_installs(
+    locked: dict[str, str],
+    base_install_path: Path,
+    quiet: bool = False,
+    override_logger=False,
+    offline: bool = False,
+    mirror: Path | None = None,
+):
+    """Installs exactly the pip packages in moccasin.lock, without resolving
+    their dependencies again.
+    """
+    installed = _installed_pip_packages(base_install_path)
+    packages_to_install = [
+        f"{name}=={version}"
+        for name, version in locked.items()
+        if installed.get(name) != version
     ]
+    if len(packages_to_install) == 0:
+        logger.info("All packages already installed.")
+        return
+
+    if override_logger:
+        set_log_level(quiet=False)
+    logger.info(f"Installing {len(packages_to_install)} pip packages...")
+    _uv_pip_install(
+        packages_to_install,
+        base_install_path,
+        quiet,
+        offline,
+        mirror,
+        extra_args=["--no-deps"],
+    )
+
+
+def _uv_pip_install(
+    packages: list[str],
+    base_install_path: Path,
+    quiet: bool = False,
+    offline: bool = False,
+    mirror: Path | None = None,
+    extra_args: list[str] | None = None,
+):
+    cmd = ["uv", "pip", "install", *(extra_args or []), *packages]
+    if offline:
+        # @dev uv only uses its cache, and the wheels in the mirror if any
+        cmd.append("--offline")
+        if mirror is not None and mirror.joinpath(PYPI).is_dir():
+            cmd += ["--find-links", str(mirror.joinpath(PYPI))]
+    cmd += ["--target", str(base_install_path)]
 
     capture_output = quiet
     try:
         subprocess.run(cmd, capture_output=capture_output, check=True)
+    except subprocess.CalledProcessError as e:
+        if not offline:
+            raise
+        where = "uv's cache" if mirror is None else f"uv's cache or {mirror / PYPI}"
+        message = (
+            f"Can't install offline, these pip dependencies aren't all in {where}:\n"
+            + "\n".join(f"  - {package}" for package in packages)
+        )
+        if e.stderr:
+            message += "\n" + e.stderr.decode().strip()
+        # @dev raised rather than exiting, since this may run in a worker thread
+        raise PipInstallError(message) from e
     except FileNotFoundError as e:
         logger.info(
             f"Stack trace:\n{''.join(traceback.format_exception(type(e), e, e.__traceback__))}"
         )
-        sys.exit(1)
+        raise PipInstallError(f"Couldn't run uv: {e}") from e
+
 
-    _write_new_dependencies(package_ids, DependencyType.PIP)
+def _installed_pip_packages(base_install_path: Path) -> dict[str, str]:
+    """Returns the version of every pip package installed in ``base_install_path``."""
+    packages: dict[str, str] = {}
+    for dist_info in base_install_path.glob("*.dist-info"):
+        name, _, version = dist_info.name.removesuffix(".dist-info").rpartition("-")
+        packages[canonicalize_name(name)] = version
+    return packages
 
 
 def parse_package_req(package_id):
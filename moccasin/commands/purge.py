@@ -1,19 +1,18 @@
-import shutil
 import subprocess
-import tempfile
 import tomllib
 from argparse import Namespace
-from pathlib import Path
 
 import tomli_w
 from packaging.requirements import Requirement
 
+from moccasin._atomic_write import atomic_write
 from moccasin._dependency_utils import (
     DependencyType,
     GitHubDependency,
     classify_dependency,
     preprocess_requirement,
 )
+from moccasin._purge_journal import PurgeJournal, recover_interrupted_purges
 from moccasin.config import Config, get_or_initialize_config
 from moccasin.constants.vars import GITHUB, PACKAGE_VERSION_FILE, PYPI
 from moccasin.logging import logger, set_log_level
@@ -95,71 +94,68 @@ def _uninstall_github_dependencies(
     packages: list[str], config: Config, quiet: bool = False
 ):
     uninstall_path = config.get_root().joinpath(config.lib_folder).joinpath(GITHUB)
-
-    with tempfile.TemporaryDirectory() as temp_dir:
-        temp_path = Path(temp_dir)
-        if uninstall_path.exists():
-            shutil.copytree(uninstall_path, temp_path, dirs_exist_ok=True)
-        else:
-            temp_path.mkdir(parents=True, exist_ok=True)
-        versions_temp_path = temp_path.joinpath(PACKAGE_VERSION_FILE)
-        versions_data = {}
-
-        if versions_temp_path.exists():
-            with open(versions_temp_path, "rb") as f:
-                versions_data = tomllib.load(f)
-                versions_data = {k.lower(): v for k, v in versions_data.items()}
-
-        else:
-            logger.warning("No versions file found. Continuing anyways.")
-
-        total_packages = 0
-        try:
-            for package_id in packages:
-                try:
-                    if "@" in package_id:
-                        path, _ = package_id.split("@", 1)
-                    else:
-                        path = package_id
-                    org, repo = path.split("/")
-                    org = org.strip().lower()
-                    repo = repo.strip().lower()
-                except ValueError:
-                    raise ValueError(
-                        "Invalid package ID. Must be given as ORG/REPO[@VERSION]"
-                        "\ne.g. 'pcaversaccio/snekmate@v2.5.0'"
-                    ) from None
-
-                org_temp_path = temp_path.joinpath(f"{org}")
-                repo_temp_path = org_temp_path.joinpath(f"{repo}")
-
-                if not org_temp_path.exists() and not repo_temp_path.exists():
-                    logger.warning(f"Package {org}/{repo} not found. Skipping.")
-                    continue
-
-                # Remove the package directory
-                shutil.rmtree(repo_temp_path, ignore_errors=True)
-
-                # Remove empty org directory if it exists
-                if org_temp_path.exists() and not any(org_temp_path.iterdir()):
-                    org_temp_path.rmdir()
-
-                # Update versions data
-                versions_data.pop(f"{org}/{repo}", None)
-                total_packages += 1
-
-            # Write updated versions file
-            with open(versions_temp_path, "wb") as f:
-                tomli_w.dump(versions_data, f)
-
-            # If we've reached this point without exceptions, commit the changes
-            if uninstall_path.exists():
-                shutil.rmtree(uninstall_path)
-            shutil.copytree(temp_path, uninstall_path, dirs_exist_ok=True)
-
-        except Exception as e:
-            logger.error(f"An error occurred during package removal: {str(e)}")
-            raise
+    uninstall_path.mkdir(parents=True, exist_ok=True)
+    versions_path = uninstall_path.joinpath(PACKAGE_VERSION_FILE)
+    versions_data = {}
+
+    if versions_path.exists():
+        with open(versions_path, "rb") as f:
+            versions_data = tomllib.load(f)
+            versions_data = {k.lower(): v for k, v in versions_data.items()}
+    else:
+        logger.warning("No versions file found. Continuing anyways.")
+
+    # @dev packages are moved out of the way with renames, and only deleted once
+    # the new versions file is in place. Until then, every rename is undone if
+    # anything fails, so the purge costs as much as the packages it removes.
+    recover_interrupted_purges(uninstall_path.parent)
+    journal = PurgeJournal(uninstall_path.parent)
+    total_packages = 0
+    try:
+        for package_id in packages:
+            try:
+                if "@" in package_id:
+                    path, _ = package_id.split("@", 1)
+                else:
+                    path = package_id
+                org, repo = path.split("/")
+                org = org.strip().lower()
+                repo = repo.strip().lower()
+            except ValueError:
+                raise ValueError(
+                    "Invalid package ID. Must be given as ORG/REPO[@VERSION]"
+                    "\ne.g. 'pcaversaccio/snekmate@v2.5.0'"
+                ) from None
+
+            org_path = uninstall_path.joinpath(f"{org}")
+            repo_path = org_path.joinpath(f"{repo}")
+
+            if not org_path.exists() and not repo_path.exists():
+                logger.warning(f"Package {org}/{repo} not found. Skipping.")
+                continue
+
+            # Move the package directory to the trash
+            if repo_path.exists():
+                journal.trash(repo_path)
+
+            # Remove empty org directory if it exists
+            if org_path.exists() and not any(org_path.iterdir()):
+                journal.remove_empty_folder(org_path)
+
+            # Update versions data
+            versions_data.pop(f"{org}/{repo}", None)
+            total_packages += 1
+
+        # Swap in the updated versions file, which commits the purge
+        journal.expect_versions(versions_path, versions_data)
+        atomic_write(versions_path, tomli_w.dumps(versions_data))
+
+    except Exception as e:
+        logger.error(f"An error occurred during package removal: {str(e)}")
+        journal.rollback()
+        raise
+    finally:
+        journal.close()
 
     if total_packages == 0:
         logger.info("No packages were found to uninstall.")
@@ -1,11 +1,9 @@
 import os
-import shutil
-import tempfile
 import tomllib
-import warnings
+from collections.abc import Iterable, Iterator
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, Iterator, Tuple, Union, cast
+from typing import TYPE_CHECKING, Any, Tuple, TypeVar, Union, cast
 
 import boa
 import tomlkit
@@ -23,7 +21,6 @@ from boa.deployments import (
 )
 from boa.environment import Env
 from boa.util.abi import Address
-from boa.verifiers import get_verification_bundle
 from boa_zksync import set_zksync_env, set_zksync_fork, set_zksync_test_env
 from boa_zksync.contract import ZksyncContract
 from boa_zksync.deployer import ZksyncDeployer
@@ -31,6 +28,15 @@ from dotenv import load_dotenv
 from eth_utils import to_hex
 from tomlkit.items import Table
 
+from moccasin._atomic_write import atomic_write
+from moccasin._build_cache import compute_cache_key
+from moccasin._deployments_db import (
+    MoccasinDeploymentsDB,
+    StoredDeployment,
+    migrate_deployments_db,
+)
+from moccasin._import_graph import ImportGraph, get_compiler_search_paths
+from moccasin._integrity_cache import IntegrityCache
 from moccasin.constants.chains import ETHERSCAN_EXPLORERS
 from moccasin.constants.vars import (
     BUILD_FOLDER,
@@ -38,6 +44,8 @@ from moccasin.constants.vars import (
     CONTRACTS_FOLDER,
     DB_PATH_LIVE_DEFAULT,
     DB_PATH_LOCAL_DEFAULT,
+    DEFAULT_COMPILE_CACHE_MAX_MB,
+    DEFAULT_GITHUB_API_CACHE_TTL,
     DEFAULT_NETWORK,
     DEPENDENCIES_FOLDER,
     DOT_ENV_FILE,
@@ -45,8 +53,11 @@ from moccasin.constants.vars import (
     ERAVM,
     FORK_NETWORK_DEFAULTS,
     GET_CONTRACT_SQL,
+    GITHUB,
+    IMPORT_GRAPH_FILE,
     LOCAL_NETWORK_DEFAULTS,
     PYEVM,
+    PYPI,
     RESTRICTED_VALUES_FOR_LOCAL_NETWORK,
     SAVE_ABI_PATH,
     SAVE_TO_DB,
@@ -56,6 +67,9 @@ from moccasin.constants.vars import (
     SQL_CHAIN_ID,
     SQL_CONTRACT_NAME,
     SQL_LIMIT,
+    SQL_OFFSET,
+    SQL_SINCE,
+    SQL_UNTIL,
     SQL_WHERE,
     TESTS_FOLDER,
 )
@@ -70,6 +84,7 @@ if TYPE_CHECKING:
     from boa_zksync.verifiers import ZksyncExplorer
 
 _AnyEnv = Union["NetworkEnv", "Env", "ZksyncEnv"]
+_T = TypeVar("_T")
 VERIFIERS = Union["Blockscout", "ZksyncExplorer"]
 
 
@@ -320,9 +335,9 @@ class Network:
         """Sets the boa deployments db."""
         db: DeploymentsDB
         if self.save_to_db:
-            db = DeploymentsDB(path=self.db_path)
+            db = MoccasinDeploymentsDB(path=self.db_path)
         else:
-            db = DeploymentsDB(path=DB_PATH_LOCAL_DEFAULT)
+            db = MoccasinDeploymentsDB(path=DB_PATH_LOCAL_DEFAULT)
         set_deployments_db(db)
 
     def create_and_set_or_set_boa_env(self, **kwargs) -> _AnyEnv:
@@ -344,6 +359,10 @@ class Network:
         chain_id: int | str | None = None,
         limit: int | None = None,
         db: DeploymentsDB | None = None,
+        offset: int | None = None,
+        since: float | None = None,
+        until: float | None = None,
+        columns: Iterable[str] | None = None,
     ) -> tuple[str, tuple]:
         """Generates the SQL query from the args to fetch deployments from the db.
 
@@ -355,6 +374,15 @@ class Network:
         :type limit: int | None
         :param db: The db
         :type db: DeploymentsDB | None
+        :param offset: How many of the matching deployments to skip
+        :type offset: int | None
+        :param since: Only deployments broadcast at or after this unix timestamp
+        :type since: float | None
+        :param until: Only deployments broadcast at or before this unix timestamp
+        :type until: float | None
+        :param columns: The fields to read, the others are read when first used.
+            All of them if None.
+        :type columns: Iterable[str] | None
         :return: The SQL query
         :rtype: str
         """
@@ -362,9 +390,13 @@ class Network:
             db = get_deployments_db()
 
         where_clauses = []
-        params: list[str | int] = []
+        params: list[str | int | float] = []
 
-        field_names = db._get_fieldnames_str()
+        if columns is not None and isinstance(db, MoccasinDeploymentsDB):
+            field_names = db._get_fieldnames_str(columns)
+        else:
+            # @dev a plain boa db always reads every field
+            field_names = db._get_fieldnames_str()
 
         if contract_name is not None:
             where_clauses.append(SQL_CONTRACT_NAME)
@@ -372,21 +404,30 @@ class Network:
 
         # Add chain_id condition if provided
         if chain_id is not None:
-            where_clause = SQL_CHAIN_ID
-            if where_clauses:
-                where_clause = SQL_AND + where_clause
-            where_clauses.append(where_clause)
+            where_clauses.append(SQL_CHAIN_ID)
             params.append(str(chain_id))
 
+        if since is not None:
+            where_clauses.append(SQL_SINCE)
+            params.append(float(since))
+
+        if until is not None:
+            where_clauses.append(SQL_UNTIL)
+            params.append(float(until))
+
         where_part = ""
         if where_clauses:
-            where_part = SQL_WHERE + "".join(where_clauses)
+            where_part = SQL_WHERE + SQL_AND.join(where_clauses)
 
         # Add LIMIT if provided
         limit_part = ""
-        if limit is not None:
+        if limit is not None or offset is not None:
             limit_part = SQL_LIMIT
-            params.append(int(limit))
+            # @dev sqlite only takes an OFFSET after a LIMIT, -1 is no limit
+            params.append(int(limit) if limit is not None else -1)
+        if offset is not None:
+            limit_part += SQL_OFFSET
+            params.append(int(offset))
 
         sql_query = GET_CONTRACT_SQL.format(field_names, where_part, limit_part)
         return sql_query, tuple(params)
@@ -397,6 +438,10 @@ class Network:
         chain_id: int | str | None = None,
         limit: int | None = None,
         db: DeploymentsDB | None = None,
+        offset: int | None = None,
+        since: float | None = None,
+        until: float | None = None,
+        columns: Iterable[str] | None = None,
     ) -> Iterator[Deployment]:
         """Fetches deployments from the db with the given args.
 
@@ -408,18 +453,37 @@ class Network:
         :type limit: int | None
         :param db: The db
         :type db: DeploymentsDB | None
+        :param offset: How many of the matching deployments to skip
+        :type offset: int | None
+        :param since: Only deployments broadcast at or after this unix timestamp
+        :type since: float | None
+        :param until: Only deployments broadcast at or before this unix timestamp
+        :type until: float | None
+        :param columns: The fields to read, the others are read when first used.
+            All of them if None.
+        :type columns: Iterable[str] | None
         :return: The deployments requested from the db
         :rtype: Iterator[Deployment]
         """
         if db is None:
             db = get_deployments_db()
         chain_id = to_hex(chain_id) if chain_id is not None else None
-        if not isinstance(limit, int) and not isinstance(limit, type(None)):
-            raise ValueError(f"Limit must be an integer, not {type(limit)}.")
+        for name, value in (("Limit", limit), ("Offset", offset)):
+            if not isinstance(value, int) and not isinstance(value, type(None)):
+                raise ValueError(f"{name} must be an integer, not {type(value)}.")
+        # @dev the db may have been set without moccasin, e.g. with boa directly
+        db = MoccasinDeploymentsDB.wrap(db)
         final_sql, params = self._generate_sql_from_args(
-            contract_name=contract_name, chain_id=chain_id, limit=limit, db=db
+            contract_name=contract_name,
+            chain_id=chain_id,
+            limit=limit,
+            db=db,
+            offset=offset,
+            since=since,
+            until=until,
+            columns=columns,
         )
-        return db._get_deployments_from_sql(final_sql, params)
+        return _keep_db_open(db, db._get_deployments_from_sql(final_sql, params))
 
     def _get_deployments_iterator(
         self,
@@ -427,6 +491,10 @@ class Network:
         chain_id: int | str | None = None,
         limit: int | None = None,
         config_or_db_path: Union["Config", Path, str, None] = None,
+        offset: int | None = None,
+        since: float | None = None,
+        until: float | None = None,
+        columns: Iterable[str] | None = None,
     ) -> Iterator[Deployment]:
         """Private method to get deployments from the database without an initialized config.
 
@@ -438,20 +506,29 @@ class Network:
         :type limit: int | None
         :param config_or_db_path: The config or db path
         :type config_or_db_path: Union[Config, Path, str, None]
+        :param offset: How many of the matching deployments to skip
+        :type offset: int | None
+        :param since: Only deployments broadcast at or after this unix timestamp
+        :type since: float | None
+        :param until: Only deployments broadcast at or before this unix timestamp
+        :type until: float | None
+        :param columns: The fields to read, the others are read when first used.
+            All of them if None.
+        :type columns: Iterable[str] | None
         :return: The deployments iterator without an initialized config
         :rtype: Iterator[Deployment]
         """
         db_path = None
         if isinstance(config_or_db_path, Config):
             db_path = config_or_db_path._toml_data.get("db_path", ".deployments.db")
-        elif isinstance(db_path, str):
-            db_path = Path(db_path)
+        elif isinstance(config_or_db_path, str):
+            db_path = Path(config_or_db_path)
         elif isinstance(config_or_db_path, Path):
             db_path = config_or_db_path
         if not db_path:
             db = get_deployments_db()
         else:
-            db = DeploymentsDB(db_path)
+            db = MoccasinDeploymentsDB(db_path)
         if db is None:
             logger.warning(
                 "No deployments database found. Returning an empty iterator."
@@ -459,15 +536,99 @@ class Network:
             return iter([])
         else:
             return self._fetch_deployments_from_db(
-                contract_name=contract_name, chain_id=chain_id, limit=limit, db=db
+                contract_name=contract_name,
+                chain_id=chain_id,
+                limit=limit,
+                db=db,
+                offset=offset,
+                since=since,
+                until=until,
+                columns=columns,
             )
 
+    def iter_deployments(
+        self,
+        contract_name: str | None = None,
+        limit: int | None = None,
+        chain_id: int | str | None = None,
+        config_or_db_path: Union["Config", Path, str, None] = None,
+        checked: bool = False,
+        offset: int | None = None,
+        since: float | None = None,
+        until: float | None = None,
+        columns: Iterable[str] | None = None,
+    ) -> Iterator[Deployment]:
+        """Get deployments from the database one at a time, most recent first, as
+        they are read from the database.
+
+        ``limit`` and ``offset`` page over the stored deployments, so with
+        ``checked`` a page can hold fewer than ``limit`` deployments.
+
+        :param contract_name: The contract name
+        :type contract_name: str | None
+        :param limit: The limit
+        :type limit: int | None
+        :param chain_id: The chain ID
+        :type chain_id: int | str | None
+        :param config_or_db_path: The config or db path
+        :type config_or_db_path: Union[Config, Path, str, None]
+        :param checked: Only return deployments whose integrity matches the code
+        :type checked: bool
+        :param offset: How many of the matching deployments to skip
+        :type offset: int | None
+        :param since: Only deployments broadcast at or after this unix timestamp
+        :type since: float | None
+        :param until: Only deployments broadcast at or before this unix timestamp
+        :type until: float | None
+        :param columns: The fields to read, the others are read when first used.
+            All of them if None.
+        :type columns: Iterable[str] | None
+        :return: The deployments
+        :rtype: Iterator[Deployment]
+        """
+        deployments_iter = self._get_deployments_iterator(
+            contract_name=contract_name,
+            chain_id=chain_id,
+            limit=limit,
+            config_or_db_path=config_or_db_path,
+            offset=offset,
+            since=since,
+            until=until,
+            columns=columns,
+        )
+        if not checked:
+            return deployments_iter
+
+        config = config_or_db_path
+        if not isinstance(config_or_db_path, Config):
+            config = get_config()
+        return self._filter_matching_integrity(
+            deployments_iter, contract_name, cast(Config, config)
+        )
+
+    def _filter_matching_integrity(
+        self,
+        deployments: Iterator[Deployment],
+        contract_name: str | None,
+        config: "Config",
+    ) -> Iterator[Deployment]:
+        expected_integrity = None
+        for index, deployment in enumerate(deployments):
+            # @dev computed once, and only if there is a deployment to check
+            if index == 0:
+                expected_integrity = self.get_expected_integrity(
+                    contract_name, config=config
+                )
+            if _integrity_matches(deployment, expected_integrity):
+                yield deployment
+
     def get_deployments_unchecked(
         self,
         contract_name: str | None = None,
         limit: int | None = None,
         chain_id: int | str | None = None,
         config_or_db_path: Union["Config", Path, str, None] = None,
+        columns: Iterable[str] | None = None,
     ) -> list[Deployment]:
         """Get deployments from the database without an initialized config.
 
@@ -482,14 +643,18 @@ class Network:
         :type limit: int | None
         :param config_or_db_path: The config or db path
         :type config_or_db_path: Union[Config, Path, str, None]
+        :param columns: The fields to read, the others are read when first used.
+            All of them if None.
+        :type columns: Iterable[str] | None
         :return: The deployments
         :rtype: list[Deployment]
         """
-        deployments_iter = self._get_deployments_iterator(
+        deployments_iter = self.iter_deployments(
             contract_name=contract_name,
             chain_id=chain_id,
             limit=limit,
             config_or_db_path=config_or_db_path,
+            columns=columns,
         )
         return list(deployments_iter)
 
@@ -499,6 +664,7 @@ class Network:
         limit: int | None = None,
         chain_id: int | str | None = None,
         config_or_db_path: Union["Config", Path, str, None] = None,
+        columns: Iterable[str] | None = None,
     ) -> list[Deployment]:
         """Get deployments from the database without an initialized config.
 
@@ -512,26 +678,21 @@ class Network:
         :type limit: int | None
         :param config_or_db_path: The config or db path
         :type config_or_db_path: Union[Config, Path, str, None]
+        :param columns: The fields to read, the others are read when first used.
+            All of them if None.
+        :type columns: Iterable[str] | None
         :return: The deployments
         :rtype: list[Deployment]
         """
-        deployments_iter = self._get_deployments_iterator(
+        deployments_iter = self.iter_deployments(
             contract_name=contract_name,
             chain_id=chain_id,
             limit=limit,
             config_or_db_path=config_or_db_path,
+            columns=columns,
+            checked=True,
         )
-
-        config = config_or_db_path
-        if not isinstance(config_or_db_path, Config):
-            config = get_config()
-        config = cast(Config, config)
-
-        deployments_list = []
-        for deployment in deployments_iter:
-            if self.has_matching_integrity(deployment, contract_name, config=config):
-                deployments_list.append(deployment)
-        return deployments_list
+        return list(deployments_iter)
 
     def has_matching_integrity(
         self,
@@ -550,23 +711,79 @@ class Network:
         :return: True if the deployment has a matching integrity, False otherwise
         :rtype: bool
         """
+        expected_integrity = self.get_expected_integrity(contract_name, config=config)
+        return _integrity_matches(deployment, expected_integrity)
+
+    def get_expected_integrity(
+        self, contract_name: str | None, config: Union["Config", None] = None
+    ) -> str | None:
+        """Returns the integrity hash of the verification bundle of the contract,
+        as it is in the project right now.
+
+        The contract is only compiled when it, one of its imports or the
+        compiler changed since the last time, and no RPC call is made.
+
+        :param contract_name: The contract name
+        :type contract_name: str | None
+        :param config: The config
+        :type config: Union[Config, None]
+        :return: The integrity hash, or None if the compiler doesn't give one
+        :rtype: str | None
+        """
+        from moccasin._sys_path_and_config_setup import (
+            _patch_sys_path,
+            get_sys_paths_list,
+        )
+
         if config is None:
             config = get_config()
         if contract_name is None:
             raise ValueError("contract_name cannot be None.")
-        vyper_deployer = self.get_deployer_from_contract_name(config, contract_name)
-        # REVIEW: If boa throws a warning, maybe that's all we need instead of checking the integrity
-        with warnings.catch_warnings():
-            warnings.filterwarnings(
-                "ignore", message="casted bytecode does not match compiled bytecode at*"
+        # @dev resolve imports, and compile, with the search paths `mox compile`
+        # uses, so the cache keys match the ones it computes
+        with _patch_sys_path(get_sys_paths_list(config)):
+            return self._get_expected_integrity(contract_name, config)
+
+    def _get_expected_integrity(
+        self, contract_name: str, config: "Config"
+    ) -> str | None:
+        contract_path = config.find_contract(contract_name)
+        build_folder = config.project_root.joinpath(config.build_folder)
+        lib_folder = config.project_root.joinpath(config.lib_folder)
+        import_graph = ImportGraph(
+            [
+                config.project_root.joinpath(config.contracts_folder),
+                lib_folder.joinpath(GITHUB),
+                lib_folder.joinpath(PYPI),
+            ],
+            get_compiler_search_paths(),
+            build_folder.joinpath(IMPORT_GRAPH_FILE),
+        )
+        # @dev saved so the next call only re-reads the files that changed
+        import_graph.refresh()
+        import_graph.save()
+        try:
+            cache_key = compute_cache_key(
+                contract_path, import_graph, is_zksync=self.is_zksync
             )
-            contract = vyper_deployer.at(deployment.contract_address)
-        verification_bundle = get_verification_bundle(contract)
-        expected_integrity = verification_bundle["integrity"]
-        actual_integrity = deployment.source_code["integrity"]
-        if expected_integrity != actual_integrity:
-            return False
-        return True
+        except KeyError:
+            # The contract isn't in the import graph, so it can't be cached
+            cache_key = None
+
+        integrity_cache = IntegrityCache(build_folder)
+        if cache_key is not None:
+            integrity = integrity_cache.get(contract_path, cache_key)
+            if integrity is not None:
+                return integrity
+
+        vyper_deployer = self.get_deployer_from_contract_name(config, contract_name)
+        solc_json = getattr(vyper_deployer, "solc_json", None)
+        if solc_json is None:
+            return None
+        integrity = solc_json["integrity"]
+        if cache_key is not None:
+            integrity_cache.put(contract_path, cache_key, integrity)
+        return integrity
 
     def get_deployer_from_contract_name(
         self, config: "Config", contract_name: str
@@ -584,7 +801,10 @@ class Network:
         return boa.load_partial(str(contract_path.absolute()))
 
     def get_latest_deployment_unchecked(
-        self, contract_name: str | None = None, chain_id: int | str | None = None
+        self,
+        contract_name: str | None = None,
+        chain_id: int | str | None = None,
+        columns: Iterable[str] | None = None,
     ) -> Deployment | None:
         """Returns the latest deployment of the contract.
 
@@ -594,11 +814,14 @@ class Network:
         :type contract_name: str | None
         :param chain_id: The chain ID
         :type chain_id: int | str | None
+        :param columns: The fields to read, the others are read when first used.
+            All of them if None.
+        :type columns: Iterable[str] | None
         :return: The deployment or nothing
         :rtype: Deployment | None
         """
         deployments = self.get_deployments_unchecked(
-            contract_name=contract_name, chain_id=chain_id, limit=1
+            contract_name=contract_name, chain_id=chain_id, limit=1, columns=columns
         )
         if len(deployments) > 0:
             return deployments[0]
@@ -618,15 +841,22 @@ class Network:
         :return: The contract or nothing
         :rtype: ABIContract | None
         """
+        # @dev the address is read from the index alone, and the abi and
+        # integrity are only read for the deployment that's returned
         deployment = self.get_latest_deployment_unchecked(
-            contract_name=contract_name, chain_id=chain_id
+            contract_name=contract_name,
+            chain_id=chain_id,
+            columns=["contract_address", "contract_name"],
         )
         if deployment is not None:
             return self.convert_deployment_to_contract(deployment)
         return None
 
     def get_latest_deployment_checked(
-        self, contract_name: str | None = None, chain_id: int | str | None = None
+        self,
+        contract_name: str | None = None,
+        chain_id: int | str | None = None,
+        columns: Iterable[str] | None = None,
     ) -> Deployment | None:
         """Returns the latest deployment of the contract.
 
@@ -636,11 +866,14 @@ class Network:
         :type contract_name: str | None
         :param chain_id: The chain ID
         :type chain_id: int | str | None
+        :param columns: The fields to read, the others are read when first used.
+            All of them if None.
+        :type columns: Iterable[str] | None
         :return: The deployment or nothing
         :rtype: Deployment | None
         """
         deployments = self.get_deployments_checked(
-            contract_name=contract_name, chain_id=chain_id, limit=1
+            contract_name=contract_name, chain_id=chain_id, limit=1, columns=columns
         )
         if len(deployments) > 0:
             return deployments[0]
@@ -660,8 +893,12 @@ class Network:
         :return: The contract or nothing
         :rtype: ABIContract | None
         """
+        # @dev the address is read from the index alone, and the abi and
+        # integrity are only read for the deployment that's returned
         deployment = self.get_latest_deployment_checked(
-            contract_name=contract_name, chain_id=chain_id
+            contract_name=contract_name,
+            chain_id=chain_id,
+            columns=["contract_address", "contract_name"],
         )
         if deployment is not None:
             return self.convert_deployment_to_contract(deployment)
@@ -925,10 +1162,8 @@ class Network:
         :rtype: bool
         """
         db = get_deployments_db()
-        field_names = db._get_fieldnames_str()
-        sql = "SELECT {} FROM deployments WHERE json_extract(tx_dict, '$.chainId') = ? AND contract_address = ? ORDER BY broadcast_ts DESC LIMIT 1".format(
-            field_names
-        )
+        migrate_deployments_db(db.db)
+        sql = "SELECT deployment_id FROM deployments WHERE chain_id = ? AND contract_address = ? ORDER BY broadcast_ts DESC LIMIT 1"
         cursor = db.db.cursor()
         cursor.execute(
             sql,
@@ -939,7 +1174,7 @@ class Network:
         )
         contract = cursor.fetchone()
         if contract:
-            deployment_id = contract[11]  # This is the deployment ID
+            (deployment_id,) = contract
             cursor.execute(
                 "UPDATE deployments SET contract_name = ? WHERE deployment_id = ?",
                 (named_contract.contract_name, deployment_id),
@@ -1083,7 +1318,7 @@ class Network:
         contract_factory = ABIContractFactory(
             deployment.contract_name,
             deployment.abi,
-            deployment.contract_name + "_" + deployment.source_code["integrity"],
+            deployment.contract_name + "_" + _deployment_integrity(deployment),
         )
         return contract_factory.at(deployment.contract_address)
 
@@ -1790,21 +2025,7 @@ class Config:
                 toml_data, ["project", "dependencies"], dependencies
             )
 
-        # Create a temporary file in the same directory as the target file
-        temp_file = tempfile.NamedTemporaryFile(
-            mode="w",
-            delete=False,
-            dir=path_to_write.parent,
-            prefix=".tmp_",
-            suffix=".toml",
-        )
-        try:
-            temp_file.write(tomlkit.dumps(toml_data))
-            temp_file.close()
-            shutil.move(temp_file.name, path_to_write)
-        except Exception as e:
-            os.unlink(temp_file.name)
-            raise e
+        atomic_write(path_to_write, tomlkit.dumps(toml_data))
         self.dependencies = dependencies
 
     def get_base_dependencies_install_path(self) -> Path:
@@ -1899,6 +2120,51 @@ class Config:
     def dot_env(self) -> str:
         return self.project.get(DOT_ENV_KEY, DOT_ENV_FILE)
 
+    @property
+    def artifact_pack(self) -> bool:
+        return self._get_project_setting("artifact_pack", False, bool)
+
+    @property
+    def global_compile_cache(self) -> bool:
+        return self._get_project_setting("global_compile_cache", False, bool)
+
+    @property
+    def global_compile_cache_max_mb(self) -> int:
+        return self._get_project_setting(
+            "global_compile_cache_max_mb", DEFAULT_COMPILE_CACHE_MAX_MB, int
+        )
+
+    def _get_project_setting(
+        self, key: str, default: _T, expected_type: type[_T]
+    ) -> _T:
+        """Returns a setting of the project, checking it has the expected type.
+
+        :raises ValueError: If the setting has another type.
+        """
+        value = self.project.get(key, default)
+        # @dev bools are ints in python, but not in the config
+        if isinstance(value, expected_type) and not (
+            expected_type is int and isinstance(value, bool)
+        ):
+            return value
+        raise ValueError(
+            f"{key} in {CONFIG_NAME} must be a {expected_type.__name__}, not {value!r}."
+        )
+
+    @property
+    def offline_install(self) -> bool:
+        return self._get_project_setting("offline_install", False, bool)
+
+    @property
+    def install_mirror(self) -> str | None:
+        return self.project.get("install_mirror", None)
+
+    @property
+    def github_api_cache_ttl(self) -> int:
+        return self._get_project_setting(
+            "github_api_cache_ttl", DEFAULT_GITHUB_API_CACHE_TTL, int
+        )
+
     # Tests must be in "tests" folder
     @property
     def test_folder(self) -> str:
@@ -2196,6 +2462,28 @@ class Config:
         return contract_paths[0]
 
 
+def _keep_db_open(
+    db: DeploymentsDB, deployments: Iterator[Deployment]
+) -> Iterator[Deployment]:
+    # @dev the db closes its connection when it's garbage collected, so the
+    # iterator holds on to it until the deployments are consumed
+    yield from deployments
+
+
+def _deployment_integrity(deployment: Deployment) -> str | None:
+    if isinstance(deployment, StoredDeployment):
+        return deployment.integrity
+    if not isinstance(deployment.source_code, dict):
+        return None
+    return deployment.source_code.get("integrity")
+
+
+def _integrity_matches(deployment: Deployment, expected: str | None) -> bool:
+    # @dev a missing integrity, on either side, can't be verified
+    integrity = _deployment_integrity(deployment)
+    return integrity is not None and expected is not None and integrity == expected
+
+
 _config: Config | None = None
 
 
@@ -10,6 +10,12 @@ COUNTER_CONTRACT = "Counter.vy"
 
 # Default Project Values
 BUILD_FOLDER = "out"
+BUILD_MANIFEST_FILE = ".manifest"
+IMPORT_GRAPH_FILE = ".import_graph"
+INTEGRITY_CACHE_FILE = ".integrity_cache"
+ARTIFACT_PACK_FILE = "artifacts.pack"
+COMPILE_PROFILE_FILE = "compile_profile.json"
+COMPILE_PROFILE_SORT_KEYS = ["wall_time", "name", "peak_rss"]
 CONTRACTS_FOLDER = "src"
 SCRIPT_FOLDER = "script"
 DEPENDENCIES_FOLDER = "lib"
@@ -29,6 +35,8 @@ TESTS_FOLDER = "tests"
 # Installation Variables
 REQUEST_HEADERS = {"User-Agent": "Moccasin"}
 PACKAGE_VERSION_FILE = "versions.toml"
+INSTALL_STATE_FILE = ".install_state"
+LOCKFILE = "moccasin.lock"
 PYPI = "pypi"
 GITHUB = "github"
 
@@ -51,6 +59,13 @@ DOT_ENV_FILE = ".env"
 DOT_ENV_KEY = "dot_env"
 KEYSTORES_PATH_KEY = "keystores_path"
 CONSOLE_HISTORY_FILE = "moccasin_history"
+COMPILE_SERVERS_FOLDER = "compile_servers"
+COMPILE_CACHE_FOLDER = "compile_cache"
+PACKAGE_STORE_FOLDER = "package_store"
+HTTP_CACHE_FOLDER = "http_cache"
+DOWNLOAD_CACHE_FOLDER = "download_cache"
+DEFAULT_GITHUB_API_CACHE_TTL = 600
+DEFAULT_COMPILE_CACHE_MAX_MB = 1024
 DEFAULT_API_KEY_ENV_VAR = "EXPLORER_API_KEY"
 
 # Configurable Vars
@@ -115,8 +130,11 @@ GET_CONTRACT_SQL = "SELECT {} FROM deployments {}ORDER BY broadcast_ts DESC {}"
 SQL_WHERE = "WHERE "
 SQL_CONTRACT_NAME = "contract_name = ? "
 SQL_AND = "AND "
-SQL_CHAIN_ID = "json_extract(tx_dict, '$.chainId') = ? "
+SQL_CHAIN_ID = "chain_id = ? "
 SQL_LIMIT = "LIMIT ? "
+SQL_OFFSET = "OFFSET ? "
+SQL_SINCE = "broadcast_ts >= ? "
+SQL_UNTIL = "broadcast_ts <= ? "
 
 DEFAULT_NETWORKS_BY_NAME = {}
 
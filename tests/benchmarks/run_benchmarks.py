@@ -0,0 +1,238 @@
+"""Benchmarks moccasin's compile pipeline, config loading and test startup.
+
+Run from the repository root:
+
+    python -m tests.benchmarks.run_benchmarks --output bench.json
+    python -m tests.benchmarks.run_benchmarks --compare bench.json
+
+See tests/benchmarks/README.md for what each benchmark measures.
+"""
+
+import argparse
+import json
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from importlib import metadata
+from pathlib import Path
+from typing import Callable
+
+import boa.interpret
+
+from moccasin._sys_path_and_config_setup import _patch_sys_path, get_sys_paths_list
+from moccasin.commands.compile import _get_cpu_count, compile_project
+from moccasin.config import Config
+from moccasin.logging import set_log_level
+from tests.benchmarks.synthetic_project import generate_project, leaf_module
+from tests.constants import COMPLEX_PROJECT_PATH
+
+RESULTS_SCHEMA_VERSION = 1
+DEFAULT_REGRESSION_THRESHOLD = 1.25
+
+
+def _measure(
+    run: Callable[[], None], repeat: int, setup: Callable[[], None] | None = None
+) -> list[float]:
+    timings = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def _summarize(timings: list[float]) -> dict:
+    return {
+        "runs": [round(t, 6) for t in timings],
+        "median": round(statistics.median(timings), 6),
+        "min": round(min(timings), 6),
+    }
+
+
+def _compile_benchmarks(name: str, project_root: Path, repeat: int) -> dict:
+    """Cold, warm and incremental ``compile_project`` runs for one project."""
+    config = Config.load_config_from_root(project_root)
+    build_folder = project_root.joinpath(config.out_folder)
+
+    def compile_() -> None:
+        compile_project(
+            project_root,
+            build_folder,
+            project_root.joinpath(config.contracts_folder),
+            write_data=True,
+            lib_folder=project_root.joinpath(config.lib_folder),
+        )
+
+    def clean() -> None:
+        shutil.rmtree(build_folder, ignore_errors=True)
+
+    results = {}
+    with _patch_sys_path(get_sys_paths_list(config)):
+        results[f"{name}.compile.cold"] = _measure(compile_, repeat, setup=clean)
+        results[f"{name}.compile.warm"] = _measure(compile_, repeat)
+
+        leaf = leaf_module(project_root)
+        if leaf is not None:
+            original_source = leaf.read_text()
+            edits = iter(range(repeat))
+
+            def edit_leaf() -> None:
+                leaf.write_text(f"{original_source}\n# edit {next(edits)}\n")
+
+            results[f"{name}.compile.incremental"] = _measure(
+                compile_, repeat, setup=edit_leaf
+            )
+            leaf.write_text(original_source)
+    return results
+
+
+def _config_benchmarks(project_root: Path, repeat: int) -> dict:
+    config = Config.load_config_from_root(project_root)
+    contract_names = [p.stem for p in project_root.joinpath("src").glob("*.vy")]
+
+    def find_contracts() -> None:
+        for contract_name in contract_names:
+            Config._find_contract(
+                project_root, config.contracts_folder, config.lib_folder, contract_name
+            )
+
+    return {
+        "config.load": _measure(
+            lambda: Config.load_config_from_root(project_root), repeat
+        ),
+        "config.find_contract": _measure(find_contracts, repeat),
+    }
+
+
+def _test_startup_benchmark(project_root: Path, repeat: int) -> dict:
+    def run_tests() -> None:
+        subprocess.run(
+            [sys.executable, "-m", "moccasin", "test", "-q"],
+            cwd=project_root,
+            check=True,
+            capture_output=True,
+        )
+
+    return {"test.startup": _measure(run_tests, repeat)}
+
+
+def _environment() -> dict:
+    def version(package: str) -> str:
+        try:
+            return metadata.version(package)
+        except metadata.PackageNotFoundError:
+            return "not installed"
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": _get_cpu_count(),
+        "moccasin": version("moccasin"),
+        "vyper": version("vyper"),
+        "titanoboa": version("titanoboa"),
+    }
+
+
+def run_benchmarks(
+    n_contracts: int, import_depth: int, repeat: int, fixtures: bool = True
+) -> dict:
+    # @dev boa's disk cache would turn every "cold" compile into a warm one
+    boa.interpret.disable_cache()
+    set_log_level(quiet=True)
+    timings: dict[str, list[float]] = {}
+    with tempfile.TemporaryDirectory() as temp_dir:
+        synthetic_root = generate_project(
+            Path(temp_dir, "synthetic"), n_contracts, import_depth
+        )
+        timings |= _compile_benchmarks("synthetic", synthetic_root, repeat)
+        timings |= _config_benchmarks(synthetic_root, repeat)
+        timings |= _test_startup_benchmark(synthetic_root, repeat)
+
+        if fixtures:
+            fixture_root = Path(temp_dir, "complex_project")
+            shutil.copytree(COMPLEX_PROJECT_PATH, fixture_root)
+            timings |= _compile_benchmarks("complex_project", fixture_root, repeat)
+
+    return {
+        "schema_version": RESULTS_SCHEMA_VERSION,
+        "environment": _environment(),
+        "parameters": {
+            "n_contracts": n_contracts,
+            "import_depth": import_depth,
+            "repeat": repeat,
+        },
+        "results": {name: _summarize(t) for name, t in sorted(timings.items())},
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """Returns the benchmarks whose median is more than ``threshold`` times
+    slower than in the baseline.
+    """
+    regressions = []
+    for name, result in results["results"].items():
+        if name not in baseline["results"]:
+            continue
+        baseline_median = baseline["results"][name]["median"]
+        if baseline_median > 0 and result["median"] / baseline_median > threshold:
+            regressions.append(
+                f"{name}: {baseline_median:.4f}s -> {result['median']:.4f}s "
+                f"({result['median'] / baseline_median:.2f}x)"
+            )
+    return regressions
+
+
+def _print_results(results: dict):
+    width = max(len(name) for name in results["results"])
+    print(f"{'benchmark'.ljust(width)}  {'median (s)':>10}  {'min (s)':>10}")
+    for name, result in results["results"].items():
+        print(f"{name.ljust(width)}  {result['median']:>10.4f}  {result['min']:>10.4f}")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--contracts", type=int, default=20)
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--no-fixtures",
+        action="store_true",
+        help="Only benchmark the synthetic project.",
+    )
+    parser.add_argument("--output", help="Where to write the JSON results.")
+    parser.add_argument("--compare", help="Baseline JSON results to compare against.")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_REGRESSION_THRESHOLD,
+        help="Slowdown ratio above which a benchmark counts as a regression.",
+    )
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(
+        args.contracts, args.depth, args.repeat, fixtures=not args.no_fixtures
+    )
+    _print_results(results)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=4, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare, "r") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+from pathlib import Path
+
+PRAGMA = "# pragma version ~=0.4.0"
+
+MOCCASIN_TOML = """[project]
+src = "src"
+out = "out"
+
+[networks.pyevm]
+save_to_db = false
+"""
+
+SMOKE_TEST = """def test_smoke():
+    assert True
+"""
+
+
+def _module_source(chain: int, level: int) -> str:
+    lines = [PRAGMA]
+    if level == 0:
+        body = f"x + {chain}"
+    else:
+        lines.append(f"from lib import module_{chain}_{level - 1}")
+        body = (
+            f"module_{chain}_{level - 1}.compute_{chain}_{level - 1}(x) * 2 + {level}"
+        )
+    lines += [
+        "",
+        "@internal",
+        "@pure",
+        f"def compute_{chain}_{level}(x: uint256) -> uint256:",
+        f"    return {body}",
+        "",
+    ]
+    return "\n".join(lines)
+
+
+def _contract_source(
+    index: int, chain: int | None, import_depth: int, n_functions: int
+) -> str:
+    lines = [PRAGMA]
+    if chain is not None:
+        top = f"module_{chain}_{import_depth - 1}"
+        lines.append(f"from lib import {top}")
+    lines += ["", "value: public(uint256)", "owner: public(address)", ""]
+    lines += ["@deploy", "def __init__():", "    self.owner = msg.sender", ""]
+    for n in range(n_functions):
+        if chain is not None:
+            value = f"{top}.compute_{chain}_{import_depth - 1}(x) + {index + n}"
+        else:
+            value = f"x + {index + n}"
+        lines += [
+            "@external",
+            f"def update_{n}(x: uint256):",
+            "    assert msg.sender == self.owner",
+            f"    self.value = {value}",
+            "",
+        ]
+    return "\n".join(lines)
+
+
+def generate_project(
+    root: Path,
+    n_contracts: int = 20,
+    import_depth: int = 3,
+    n_functions: int = 5,
+    contracts_per_chain: int = 5,
+) -> Path:
+    """Writes a synthetic moccasin project to ``root``.
+
+    Every ``contracts_per_chain`` contracts share a chain of ``import_depth``
+    library modules in ``src/lib``, each importing the one below it, so the
+    size of the import graph grows with both parameters.
+
+    :return: The project root.
+    """
+    src = root.joinpath("src")
+    lib = src.joinpath("lib")
+    lib.mkdir(parents=True, exist_ok=True)
+    root.joinpath("tests").mkdir(exist_ok=True)
+    root.joinpath("moccasin.toml").write_text(MOCCASIN_TOML)
+    root.joinpath("tests", "test_smoke.py").write_text(SMOKE_TEST)
+
+    n_chains = 0
+    if import_depth > 0:
+        n_chains = max(1, -(-n_contracts // contracts_per_chain))
+    for chain in range(n_chains):
+        for level in range(import_depth):
+            lib.joinpath(f"module_{chain}_{level}.vy").write_text(
+                _module_source(chain, level)
+            )
+
+    for index in range(n_contracts):
+        chain = index // contracts_per_chain if n_chains else None
+        src.joinpath(f"Contract{index}.vy").write_text(
+            _contract_source(index, chain, import_depth, n_functions)
+        )
+    return root
+
+
+def leaf_module(root: Path) -> Path | None:
+    """Returns the module at the bottom of the first import chain, which every
+    contract of that chain depends on.
+    """
+    leaf = root.joinpath("src", "lib", "module_0_0.vy")
+    return leaf if leaf.exists() else None
@@ -1,8 +1,24 @@
+import csv
+import dataclasses
+import json
+import shutil
+import sys
 from pathlib import Path
 
-from boa.deployments import DeploymentsDB
+import boa
+from boa.deployments import Deployment, DeploymentsDB, set_deployments_db
+from boa.util.abi import Address
 
+from moccasin._deployments_db import MoccasinDeploymentsDB
+from moccasin.commands.deployments import (
+    OutputFormat,
+    PrintVerbosity,
+    parse_timestamp,
+    print_deployments,
+    stream_deployments,
+)
 from moccasin.config import Config
+from moccasin.constants.vars import IMPORT_GRAPH_FILE
 
 
 def test_generate_sql_from_args_with_where(blank_tempdir):
@@ -21,7 +37,7 @@ def test_generate_sql_from_args_with_where(blank_tempdir):
     sql_query, params = active_network._generate_sql_from_args(
         contract_name=contract_name, chain_id=chain_id, limit=limit, db=db
     )
-    expected_sql = "SELECT contract_address,contract_name,filename,rpc,deployer,tx_hash,broadcast_ts,tx_dict,receipt_dict,source_code,abi,session_id,deployment_id FROM deployments WHERE contract_name = ? AND json_extract(tx_dict, '$.chainId') = ? ORDER BY broadcast_ts DESC LIMIT ? "
+    expected_sql = "SELECT contract_address,contract_name,filename,rpc,deployer,tx_hash,broadcast_ts,tx_dict,receipt_dict,source_code,abi,session_id,deployment_id FROM deployments WHERE contract_name = ? AND chain_id = ? ORDER BY broadcast_ts DESC LIMIT ? "
     expected_parametrs = ("MockV3Aggregator", "31337", 1)
 
     # Assert
@@ -67,3 +83,178 @@ def test_generate_sql_from_args_without_and(blank_tempdir):
     # Assert
     assert sql_query == expected_sql
     assert params == expected_parametrs
+
+
+def _counter_deployment(integrity: str) -> Deployment:
+    return Deployment(
+        contract_address=Address("0x" + "33" * 20),
+        contract_name="Counter",
+        filename="src/Counter.vy",
+        rpc="http://127.0.0.1:8545",
+        deployer=Address("0x" + "11" * 20),
+        tx_hash="0x" + "22" * 32,
+        broadcast_ts=1.0,
+        tx_dict={"chainId": "0x7a69"},
+        receipt_dict={},
+        source_code={"integrity": integrity},
+        abi=[],
+    )
+
+
+def test_checked_deployments_compile_once_without_rpc(
+    deployments_path, deployments_config, monkeypatch
+):
+    active_network = deployments_config.get_active_network()
+    counter_path = deployments_path.joinpath("src/Counter.vy")
+    integrity = boa.load_partial(str(counter_path)).solc_json["integrity"]
+    db_path = deployments_path.joinpath(".checked_deployments.db")
+    db = MoccasinDeploymentsDB(db_path)
+    for deployment_integrity in [integrity, "stale", integrity]:
+        db.insert_deployment(_counter_deployment(deployment_integrity))
+
+    compiles = []
+    get_deployer = active_network.get_deployer_from_contract_name
+
+    def counting_get_deployer(config, contract_name):
+        compiles.append(contract_name)
+        return get_deployer(config, contract_name)
+
+    monkeypatch.setattr(
+        active_network, "get_deployer_from_contract_name", counting_get_deployer
+    )
+
+    for _ in range(2):
+        checked = active_network.get_deployments_checked(
+            "Counter", chain_id=31337, config_or_db_path=db_path
+        )
+        assert len(checked) == 2
+    assert compiles == ["Counter"]
+
+    # A changed source is compiled again, and no longer matches
+    counter_path.write_text(counter_path.read_text() + "\n# changed\n")
+    checked = active_network.get_deployments_checked(
+        "Counter", chain_id=31337, config_or_db_path=db_path
+    )
+    assert checked == []
+    assert compiles == ["Counter", "Counter"]
+
+
+def test_iter_deployments_pages_and_filters_by_time(
+    deployments_path, deployments_config
+):
+    active_network = deployments_config.get_active_network()
+    db_path = deployments_path.joinpath(".paged_deployments.db")
+    db = MoccasinDeploymentsDB(db_path)
+    for broadcast_ts in range(1, 6):
+        db.insert_deployment(
+            dataclasses.replace(
+                _counter_deployment("integrity"), broadcast_ts=float(broadcast_ts)
+            )
+        )
+
+    def timestamps(**kwargs) -> list[float]:
+        return [
+            deployment.broadcast_ts
+            for deployment in active_network.iter_deployments(
+                "Counter", chain_id=31337, config_or_db_path=db_path, **kwargs
+            )
+        ]
+
+    assert timestamps(limit=2, offset=1) == [4.0, 3.0]
+    assert timestamps(offset=3) == [2.0, 1.0]
+    assert timestamps(since=2, until=4) == [4.0, 3.0, 2.0]
+    assert timestamps(since=parse_timestamp("1970-01-02T00:00:00+00:00")) == []
+
+
+def test_print_deployments_as_ndjson_and_csv(capsys):
+    deployments = [
+        dataclasses.replace(_counter_deployment("integrity"), broadcast_ts=float(ts))
+        for ts in (2, 1)
+    ]
+
+    count = stream_deployments(
+        iter(deployments), PrintVerbosity.FULL_DETAILS, OutputFormat.NDJSON
+    )
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert count == 2
+    assert [record["broadcast_ts"] for record in records] == [2.0, 1.0]
+    assert records[0]["source_code"] == {"integrity": "integrity"}
+
+    printed = print_deployments(
+        iter(deployments), PrintVerbosity.CONTRACT_ADDRESS_AND_NAME, OutputFormat.CSV
+    )
+    assert printed == deployments
+    rows = list(csv.reader(capsys.readouterr().out.splitlines()))
+    assert rows[0] == ["contract_address", "contract_name", "deployer"]
+    assert rows[1] == ["0x" + "33" * 20, "Counter", "0x" + "11" * 20]
+    assert len(rows) == 3
+
+
+def test_boa_db_is_read_through_moccasin(deployments_path, deployments_config):
+    active_network = deployments_config.get_active_network()
+    db_path = deployments_path.joinpath(".boa_deployments.db")
+    shutil.copy(deployments_path.joinpath(".starting_deployments.db"), db_path)
+    boa_db = DeploymentsDB(db_path)
+    boa_deployments = list(boa_db.get_deployments())
+    latest = max(
+        (d for d in boa_deployments if d.contract_name == "Counter"),
+        key=lambda d: d.broadcast_ts,
+    )
+
+    with set_deployments_db(boa_db):
+        contract = active_network.get_latest_contract_unchecked("Counter", 31337)
+        assert contract.address == latest.contract_address
+
+        # Deployments moccasin inserts are read back through the boa db too
+        MoccasinDeploymentsDB(db_path).insert_deployment(
+            dataclasses.replace(latest, deployment_id=None, broadcast_ts=10.0)
+        )
+        deployment = active_network.get_latest_deployment_unchecked("Counter", 31337)
+        assert deployment.source_code == latest.source_code
+
+    # boa still reads the sources of its own deployments
+    boa_db = DeploymentsDB(db_path)
+    assert list(boa_db.get_deployments())[1:] == boa_deployments
+
+
+def test_deployments_without_integrity_are_not_checked(
+    deployments_path, deployments_config, monkeypatch
+):
+    active_network = deployments_config.get_active_network()
+    db_path = deployments_path.joinpath(".unverifiable_deployments.db")
+    db = MoccasinDeploymentsDB(db_path)
+    deployment = dataclasses.replace(_counter_deployment("unused"), source_code=None)
+    db.insert_deployment(deployment)
+    # e.g. a compiler that doesn't give an integrity hash
+    monkeypatch.setattr(
+        active_network, "get_expected_integrity", lambda *args, **kwargs: None
+    )
+
+    checked = active_network.get_deployments_checked(
+        "Counter", chain_id=31337, config_or_db_path=db_path
+    )
+    assert checked == []
+    assert not active_network.has_matching_integrity(deployment, "Counter")
+
+
+def test_expected_integrity_uses_the_compiler_search_paths(deployments_config):
+    active_network = deployments_config.get_active_network()
+    project_root = deployments_config.project_root
+    graph_path = project_root.joinpath(
+        deployments_config.build_folder, IMPORT_GRAPH_FILE
+    )
+    graph_path.unlink(missing_ok=True)
+
+    integrity = active_network.get_expected_integrity(
+        "Counter", config=deployments_config
+    )
+
+    # The refreshed graph is saved, for the project's search paths
+    search_paths = json.loads(graph_path.read_text())["search_paths"]
+    contracts_path = project_root.joinpath(deployments_config.contracts_folder)
+    assert str(contracts_path) in search_paths
+    assert str(contracts_path) not in sys.path
+    assert (
+        active_network.get_expected_integrity("Counter", config=deployments_config)
+        == integrity
+    )
@@ -2,6 +2,9 @@ import os
 import subprocess
 from pathlib import Path
 
+import pytest
+
+from moccasin.constants.vars import IS_WINDOWS
 from tests.constants import LIB_GH_PATH, LIB_PIP_PATH
 
 EXPECTED_HELP_TEXT = "Vyper compiler"
@@ -77,3 +80,145 @@ def test_compile_one(complex_temp_path, complex_cleanup_out_folder, mox_path):
     assert not complex_temp_path.joinpath(LIB_PIP_PATH).exists()
     assert "Done compiling BuyMeACoffee" in result.stderr
     assert result.returncode == 0
+
+
+def test_compile_skips_unchanged_contracts(
+    complex_temp_path, complex_cleanup_out_folder, mox_path
+):
+    current_dir = Path.cwd()
+    try:
+        os.chdir(current_dir.joinpath(complex_temp_path))
+        subprocess.run(
+            [mox_path, "build", "--no-install"],
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        result = subprocess.run(
+            [mox_path, "build", "--no-install"],
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        forced_result = subprocess.run(
+            [mox_path, "build", "--no-install", "--force"],
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+    finally:
+        os.chdir(current_dir)
+
+    assert complex_temp_path.joinpath("build", ".manifest").exists()
+    assert "contracts unchanged since the last build" in result.stderr
+    assert "contracts unchanged since the last build" not in forced_result.stderr
+    assert "Done compiling project!" in result.stderr
+
+
+@pytest.mark.skipif(IS_WINDOWS, reason="The compile server needs Unix sockets")
+def test_compile_uses_running_compile_server(
+    complex_temp_path, complex_cleanup_out_folder, mox_path
+):
+    current_dir = Path.cwd()
+    os.chdir(current_dir.joinpath(complex_temp_path))
+    server = subprocess.Popen(
+        [mox_path, "compile-server", "start"],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+    )
+    try:
+        for line in server.stdout:
+            if "Compile server listening" in line:
+                break
+        result = subprocess.run(
+            [mox_path, "build", "--no-install", "--force", "--debug"],
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        subprocess.run(
+            [mox_path, "compile-server", "stop"],
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        server.wait(timeout=30)
+    finally:
+        if server.poll() is None:
+            server.kill()
+        os.chdir(current_dir)
+
+    assert "Compiling on the compile server" in result.stderr
+    assert "Done compiling project!" in result.stderr
+    assert complex_temp_path.joinpath("build", "Counter.json").exists()
+    assert server.returncode == 0
+
+
+def test_compile_watch_recompiles_affected_contracts(
+    complex_temp_path, complex_cleanup_out_folder, mox_path
+):
+    current_dir = Path.cwd()
+    os.chdir(current_dir.joinpath(complex_temp_path))
+    counter = complex_temp_path.joinpath("contracts", "Counter.vy")
+    original_source = counter.read_text()
+    watcher = subprocess.Popen(
+        [mox_path, "compile", "--watch", "--no-install"],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+    )
+    output = []
+    try:
+        for line in watcher.stdout:
+            output.append(line)
+            if "Watching for changes" in line:
+                counter.write_text(original_source + "\n# edited\n")
+            if "Compiled Counter in" in line:
+                break
+    finally:
+        watcher.kill()
+        counter.write_text(original_source)
+        os.chdir(current_dir)
+
+    assert "Recompiling 1 affected contracts...\n" in output
+
+
+def test_compile_check_reports_stale_contracts(
+    complex_temp_path, complex_cleanup_out_folder, mox_path
+):
+    current_dir = Path.cwd()
+    counter_artifact = complex_temp_path.joinpath("build", "Counter.json")
+    try:
+        os.chdir(current_dir.joinpath(complex_temp_path))
+        # @dev stale contracts make `--check` exit with 1, asserted below
+        before_build = subprocess.run(
+            [mox_path, "compile", "--check", "--no-install"],
+            check=False,
+            capture_output=True,
+            text=True,
+        )
+        subprocess.run(
+            [mox_path, "compile", "--no-install"], check=True, capture_output=True
+        )
+        first_mtime = counter_artifact.stat().st_mtime_ns
+        subprocess.run(
+            [mox_path, "compile", "--no-install", "--force"],
+            check=True,
+            capture_output=True,
+        )
+        after_build = subprocess.run(
+            [mox_path, "compile", "--check", "--no-install"],
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+    finally:
+        os.chdir(current_dir)
+
+    assert before_build.returncode == 1
+    assert "Counter is out of date: never compiled" in before_build.stderr
+    assert after_build.returncode == 0
+    assert "All contracts are up to date." in after_build.stderr
+    # identical artifacts are not rewritten
+    assert counter_artifact.stat().st_mtime_ns == first_mtime
@@ -0,0 +1,35 @@
+import pytest
+
+from moccasin.artifact_pack import ArtifactPack, ArtifactPackError, write_artifact_pack
+
+ARTIFACTS = [
+    {
+        "contract_name": "Token",
+        "bytecode": "6080604052",
+        "abi": [{"type": "function", "name": "transfer"}],
+        "vm": "evm",
+    },
+    {"contract_name": "Counter", "bytecode": "", "abi": [], "vm": "eravm"},
+]
+
+
+def test_artifact_pack_round_trip(tmp_path):
+    pack_path = tmp_path.joinpath("artifacts.pack")
+    write_artifact_pack(ARTIFACTS, pack_path)
+
+    with ArtifactPack(pack_path) as pack:
+        assert pack.contract_names == ["Counter", "Token"]
+        assert "Token" in pack
+        assert pack.get_bytecode("Token") == bytes.fromhex("6080604052")
+        assert pack.get_abi("Token") == [{"type": "function", "name": "transfer"}]
+        for artifact in ARTIFACTS:
+            assert pack.get_build_data(artifact["contract_name"]) == artifact
+        with pytest.raises(KeyError):
+            pack.get_abi("Missing")
+
+
+def test_artifact_pack_rejects_other_files(tmp_path):
+    not_a_pack = tmp_path.joinpath("Token.json")
+    not_a_pack.write_text('{"contract_name": "Token"}')
+    with pytest.raises(ArtifactPackError):
+        ArtifactPack(not_a_pack)
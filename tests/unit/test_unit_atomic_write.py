@@ -0,0 +1,28 @@
+import pytest
+
+from moccasin._atomic_write import atomic_write
+
+
+def test_atomic_write_replaces_the_file(tmp_path):
+    path = tmp_path / "data.json"
+    path.write_text("old")
+
+    atomic_write(path, "new")
+    assert path.read_text() == "new"
+    atomic_write(path, b"\x00bytes")
+    assert path.read_bytes() == b"\x00bytes"
+    assert [p.name for p in tmp_path.iterdir()] == ["data.json"]
+
+
+def test_atomic_write_leaves_the_file_untouched_on_error(tmp_path, monkeypatch):
+    path = tmp_path / "data.json"
+    path.write_text("old")
+
+    def failing_replace(*args):
+        raise OSError("disk full")
+
+    monkeypatch.setattr("moccasin._atomic_write.os.replace", failing_replace)
+    with pytest.raises(OSError, match="disk full"):
+        atomic_write(path, "new")
+    assert path.read_text() == "old"
+    assert [p.name for p in tmp_path.iterdir()] == ["data.json"]
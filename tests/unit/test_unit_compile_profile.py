@@ -0,0 +1,48 @@
+import json
+
+import vyper
+
+from moccasin._compile_profile import (
+    PHASE_NAMES,
+    format_profile_table,
+    make_skipped_profile,
+    profile_compilation,
+    write_profile_report,
+)
+
+SOURCE = """
+x: public(uint256)
+
+@external
+def set_x(new_x: uint256):
+    self.x = new_x
+"""
+
+
+def test_profile_compilation_times_each_phase():
+    profile = {}
+    with profile_compilation(profile):
+        vyper.compile_code(SOURCE, output_formats=["bytecode"])
+
+    assert set(profile["phases"]) == set(PHASE_NAMES)
+    assert profile["phases"]["codegen"] > 0
+    assert sum(profile["phases"].values()) <= profile["wall_time"]
+    assert profile["cache"] == "miss"
+
+
+def test_profile_report_and_table(tmp_path):
+    profiles = [
+        {"contract": "Slow", "path": "src/Slow.vy", **make_skipped_profile("miss")},
+        {"contract": "Fast", "path": "src/Fast.vy", **make_skipped_profile("build")},
+    ]
+    profiles[0]["wall_time"] = 1.5
+
+    table = format_profile_table(profiles).splitlines()
+    assert table[0].startswith("Contract")
+    assert table[2].startswith("Slow")
+
+    report_path = tmp_path.joinpath("profile.json")
+    write_profile_report(profiles, report_path)
+    report = json.loads(report_path.read_text())
+    assert [c["path"] for c in report["contracts"]] == ["src/Fast.vy", "src/Slow.vy"]
+    assert report["total_compile_time"] == 1.5
@@ -3,6 +3,7 @@ import tempfile
 from pathlib import Path
 
 import boa
+import pytest
 
 from moccasin.config import Config
 
@@ -72,3 +73,15 @@ def test_no_moccasin_toml_can_set_network(no_config_config):
     no_config_config.set_active_network("pyevm")
     active_network = no_config_config.get_active_network()
     assert active_network.name == "pyevm"
+
+
+def test_project_settings_must_have_their_type():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        Path(temp_dir).joinpath("moccasin.toml").write_text(
+            '[project]\nglobal_compile_cache = "yes"\nglobal_compile_cache_max_mb = true\n'
+        )
+        config = Config(Path(temp_dir))
+        with pytest.raises(ValueError, match="global_compile_cache in"):
+            config.global_compile_cache
+        with pytest.raises(ValueError, match="global_compile_cache_max_mb"):
+            config.global_compile_cache_max_mb
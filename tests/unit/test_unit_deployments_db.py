@@ -0,0 +1,113 @@
+import dataclasses
+import shutil
+import sqlite3
+
+from boa.deployments import Deployment, DeploymentsDB
+from boa.util.abi import Address
+
+from moccasin._deployments_db import MIGRATIONS, MoccasinDeploymentsDB
+from tests.constants import DEPLOYMENTS_PROJECT_PATH
+
+
+def _deployment(contract_name: str, address: str, chain_id: str) -> Deployment:
+    return Deployment(
+        contract_address=Address(address),
+        contract_name=contract_name,
+        filename="src/Counter.vy",
+        rpc="http://localhost:8545",
+        deployer=Address("0x" + "11" * 20),
+        tx_hash="0x" + "22" * 32,
+        broadcast_ts=1.0,
+        tx_dict={"chainId": chain_id},
+        receipt_dict={},
+        source_code=None,
+        abi=None,
+    )
+
+
+def test_existing_db_is_migrated(tmp_path):
+    db_path = tmp_path.joinpath(".deployments.db")
+    shutil.copy(DEPLOYMENTS_PROJECT_PATH.joinpath(".starting_deployments.db"), db_path)
+
+    db = MoccasinDeploymentsDB(db_path)
+
+    assert db.db.execute("PRAGMA user_version").fetchone()[0] == len(MIGRATIONS)
+    chain_ids = db.db.execute("SELECT DISTINCT chain_id FROM deployments").fetchall()
+    assert chain_ids == [("0x7a69",)]
+    plan = db.db.execute(
+        "EXPLAIN QUERY PLAN SELECT contract_address FROM deployments "
+        "WHERE chain_id = ? AND contract_name = ? ORDER BY broadcast_ts DESC LIMIT 1",
+        ("0x7a69", "Counter"),
+    ).fetchall()
+    assert "deployments_chain_id_contract_name" in plan[0][-1]
+
+    # Opening it again doesn't migrate twice
+    MoccasinDeploymentsDB(db_path)
+
+
+def test_chain_id_is_set_on_insert(tmp_path):
+    db_path = tmp_path.joinpath(".deployments.db")
+    MoccasinDeploymentsDB(db_path)
+
+    # @dev boa itself doesn't know about the chain_id column
+    DeploymentsDB(db_path).insert_deployment(
+        _deployment("Counter", "0x" + "33" * 20, "0x1")
+    )
+
+    with sqlite3.connect(db_path) as db:
+        assert db.execute("SELECT chain_id FROM deployments").fetchall() == [("0x1",)]
+
+
+def test_sources_are_stored_once_and_loaded_lazily(tmp_path):
+    db_path = tmp_path.joinpath(".deployments.db")
+    shutil.copy(DEPLOYMENTS_PROJECT_PATH.joinpath(".starting_deployments.db"), db_path)
+    boa_deployments = _read_with_boa(db_path)
+
+    db = MoccasinDeploymentsDB(db_path)
+    # Deployments inserted by boa keep their inline sources
+    assert db.db.execute("SELECT count(*) FROM source_blobs").fetchone() == (0,)
+    assert _read_with_boa(db_path) == boa_deployments
+
+    # @dev oldest first, so they're read back in the same order
+    for deployment in reversed(boa_deployments):
+        db.insert_deployment(dataclasses.replace(deployment, deployment_id=None))
+    # The two Counter deployments share their sources
+    assert db.db.execute("SELECT count(*) FROM source_blobs").fetchone() == (2,)
+    inserted = list(db.get_deployments())[: len(boa_deployments)]
+    assert [d.integrity for d in inserted] == [
+        d.source_code["integrity"] for d in boa_deployments
+    ]
+    assert db._load_source_code.cache_info().misses == 0
+    assert [d.source_code for d in inserted] == [d.source_code for d in boa_deployments]
+    assert db._load_source_code.cache_info().misses == 2
+
+
+def _read_with_boa(db_path) -> list[Deployment]:
+    db = DeploymentsDB(db_path)
+    return list(db.get_deployments())
+
+
+def test_projected_fields_are_read_on_first_use(tmp_path):
+    db_path = tmp_path.joinpath(".deployments.db")
+    shutil.copy(DEPLOYMENTS_PROJECT_PATH.joinpath(".starting_deployments.db"), db_path)
+    db = MoccasinDeploymentsDB(db_path)
+    expected = list(db.get_deployments())
+    query = (
+        f"SELECT {db._get_fieldnames_str(['contract_address'])} FROM deployments "
+        "WHERE chain_id = ? AND contract_name = ? ORDER BY broadcast_ts DESC"
+    )
+    params = ("0x7a69", "Counter")
+
+    # The latest address is read from the index alone
+    plan = db.db.execute(f"EXPLAIN QUERY PLAN {query}", params).fetchall()
+    assert "COVERING INDEX deployments_chain_id_contract_name" in plan[0][-1]
+
+    deployments = list(db._get_deployments_from_sql(query, params))
+    assert len(deployments) == 2
+    latest = deployments[0]
+    assert not isinstance(latest.__dict__["abi"], list)
+    assert latest.integrity is not None
+    assert db._load_source_code.cache_info().currsize == 0
+    assert latest == next(
+        d for d in expected if d.deployment_id == latest.deployment_id
+    )
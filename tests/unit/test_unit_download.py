@@ -0,0 +1,152 @@
+import hashlib
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from moccasin import _download
+from moccasin._download import ResumableDownload
+
+FILE_CONTENT = os.urandom(256 * 1024)
+
+
+class _FileHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    ranges_seen: list[str | None] = []
+    # Responses that drop the connection after sending half of their body
+    failures_left = 0
+    accept_ranges = True
+
+    def do_GET(self):
+        range_header = self.headers.get("Range") if self.accept_ranges else None
+        self.ranges_seen.append(range_header)
+        start, end = 0, len(FILE_CONTENT) - 1
+        if range_header and self.headers.get("If-Range") == '"file"':
+            first, last = range_header.removeprefix("bytes=").split("-")
+            start, end = int(first), int(last) if last else end
+            self.send_response(206)
+            self.send_header(
+                "Content-Range", f"bytes {start}-{end}/{len(FILE_CONTENT)}"
+            )
+        else:
+            self.send_response(200)
+        body = FILE_CONTENT[start : end + 1]
+        if self.accept_ranges:
+            self.send_header("Accept-Ranges", "bytes")
+        self.send_header("ETag", '"file"')
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if _FileHandler.failures_left > 0:
+            _FileHandler.failures_left -= 1
+            self.wfile.write(body[: len(body) // 2])
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def file_server(monkeypatch):
+    _FileHandler.ranges_seen = []
+    _FileHandler.failures_left = 0
+    _FileHandler.accept_ranges = True
+    monkeypatch.setattr(_download, "DOWNLOAD_BACKOFF_SECONDS", 0)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FileHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/file.zip"
+    server.shutdown()
+
+
+def test_dropped_connection_is_resumed(tmp_path, file_server):
+    _FileHandler.failures_left = 1
+    with requests.Session() as session:
+        download = ResumableDownload(session, file_server, tmp_path)
+        assert download.run().read_bytes() == FILE_CONTENT
+    half = len(FILE_CONTENT) // 2
+    assert _FileHandler.ranges_seen == [None, f"bytes={half}-"]
+    download.discard()
+    # @dev only the lock file stays
+    assert [p.suffix for p in tmp_path.iterdir()] == [".lock"]
+
+
+def test_checkpoint_is_resumed_by_the_next_download(tmp_path, file_server):
+    _FileHandler.failures_left = _download.DOWNLOAD_RETRIES + 1
+    with requests.Session() as session:
+        with pytest.raises(requests.exceptions.ChunkedEncodingError):
+            ResumableDownload(session, file_server, tmp_path).run()
+        _FileHandler.ranges_seen = []
+        download = ResumableDownload(session, file_server, tmp_path)
+        received = download.file_path.stat().st_size
+        assert received > 0
+        assert download.run().read_bytes() == FILE_CONTENT
+    assert _FileHandler.ranges_seen == [f"bytes={received}-"]
+
+
+def test_download_restarts_when_server_ignores_ranges(tmp_path, file_server):
+    _FileHandler.failures_left = 1
+    _FileHandler.accept_ranges = False
+    with requests.Session() as session:
+        download = ResumableDownload(session, file_server, tmp_path)
+        assert download.run().read_bytes() == FILE_CONTENT
+    assert _FileHandler.ranges_seen == [None, None]
+
+
+def test_big_file_is_downloaded_in_parallel_ranges(tmp_path, file_server, monkeypatch):
+    monkeypatch.setattr(_download, "PARALLEL_DOWNLOAD_MIN_SIZE", 1024)
+    part_size = len(FILE_CONTENT) // _download.PARALLEL_DOWNLOAD_PARTS
+    with requests.Session() as session:
+        download = ResumableDownload(session, file_server, tmp_path)
+        assert download.run().read_bytes() == FILE_CONTENT
+    assert set(_FileHandler.ranges_seen[1:]) == {
+        f"bytes={part * part_size}-{(part + 1) * part_size - 1}"
+        for part in range(_download.PARALLEL_DOWNLOAD_PARTS)
+    }
+
+
+def test_concurrent_download_uses_its_own_checkpoint(tmp_path, file_server):
+    _FileHandler.failures_left = _download.DOWNLOAD_RETRIES + 1
+    with requests.Session() as session:
+        with pytest.raises(requests.exceptions.ChunkedEncodingError):
+            ResumableDownload(session, file_server, tmp_path).run()
+        shared = ResumableDownload(session, file_server, tmp_path)
+        checkpoint = shared.file_path.read_bytes()
+        assert shared.run().read_bytes() == FILE_CONTENT
+
+        # The checkpoint is locked until discarded
+        concurrent = ResumableDownload(session, file_server, tmp_path)
+        assert concurrent.run().read_bytes() == FILE_CONTENT
+        assert concurrent.file_path != shared.file_path
+        concurrent.discard()
+        assert not concurrent.file_path.exists()
+        assert shared.file_path.read_bytes() == FILE_CONTENT
+        shared.discard()
+    assert len(checkpoint) < len(FILE_CONTENT)
+
+
+def test_corrupt_checkpoint_is_downloaded_again(tmp_path, file_server):
+    expected_sha256 = hashlib.sha256(FILE_CONTENT).hexdigest()
+    with requests.Session() as session:
+        download = ResumableDownload(session, file_server, tmp_path)
+        download.run()
+        download._unlock()
+        # The checkpoint has the right size but the wrong content
+        download.file_path.write_bytes(bytes(len(FILE_CONTENT)))
+
+        _FileHandler.ranges_seen = []
+        download = ResumableDownload(
+            session, file_server, tmp_path, expected_sha256=expected_sha256
+        )
+        assert download.run().read_bytes() == FILE_CONTENT
+        assert download.sha256 == expected_sha256
+        # @dev the complete file is requested again, from the start
+        assert _FileHandler.ranges_seen[-1] is None
+
+        with pytest.raises(ValueError, match="has sha256"):
+            ResumableDownload(
+                session, file_server, tmp_path, expected_sha256="00" * 32
+            ).run()
@@ -0,0 +1,73 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from moccasin._http_cache import HttpCache
+
+
+class _TagsHandler(BaseHTTPRequestHandler):
+    requests_seen: list[tuple[str, str | None]] = []
+
+    def do_GET(self):
+        if_none_match = self.headers.get("If-None-Match")
+        self.requests_seen.append((self.path, if_none_match))
+        if self.path != "/tags":
+            self.send_response(404)
+            self.end_headers()
+            return
+        if if_none_match == '"v1"':
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = json.dumps([{"name": "v1.0.0"}]).encode()
+        self.send_response(200)
+        self.send_header("ETag", '"v1"')
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def tags_server():
+    _TagsHandler.requests_seen = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _TagsHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def test_fresh_response_is_served_from_cache(tmp_path, tags_server):
+    http_cache = HttpCache(tmp_path, ttl_seconds=600)
+    with requests.Session() as session:
+        first = http_cache.get_json(session, f"{tags_server}/tags")
+        second = http_cache.get_json(session, f"{tags_server}/tags")
+    assert first == second == [{"name": "v1.0.0"}]
+    assert len(_TagsHandler.requests_seen) == 1
+
+
+def test_stale_response_is_revalidated_with_etag(tmp_path, tags_server):
+    http_cache = HttpCache(tmp_path, ttl_seconds=0)
+    with requests.Session() as session:
+        http_cache.get_json(session, f"{tags_server}/tags")
+        assert http_cache.get_json(session, f"{tags_server}/tags") == [
+            {"name": "v1.0.0"}
+        ]
+    assert _TagsHandler.requests_seen == [("/tags", None), ("/tags", '"v1"')]
+
+
+def test_error_responses_are_not_cached(tmp_path, tags_server):
+    http_cache = HttpCache(tmp_path, ttl_seconds=600)
+    with requests.Session() as session:
+        assert http_cache.get_json(session, f"{tags_server}/missing") is None
+        with pytest.raises(requests.HTTPError):
+            http_cache.get_json(
+                session, f"{tags_server}/missing", raise_for_status=True
+            )
+    assert len(_TagsHandler.requests_seen) == 2
@@ -0,0 +1,60 @@
+from pathlib import Path
+
+from moccasin._import_graph import ImportGraph, parse_imports
+
+
+def _write(path: Path, content: str) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+    return path
+
+
+def test_parse_imports():
+    source = """
+from ethereum.ercs import IERC20
+from snekmate.auth import ownable as ow
+import Auth as auth
+from . import helpers
+from .interfaces import IFoo, IBar
+"""
+    assert parse_imports(source) == [
+        "Auth",
+        "ethereum.ercs.IERC20",
+        "snekmate.auth.ownable",
+        ".helpers",
+        ".interfaces.IFoo",
+        ".interfaces.IBar",
+    ]
+
+
+def test_import_graph_queries_and_refresh(tmp_path):
+    src = tmp_path.joinpath("src")
+    lib = tmp_path.joinpath("lib")
+    ownable = _write(lib.joinpath("snekmate", "auth", "ownable.vy"), "# ownable\n")
+    auth = _write(src.joinpath("Auth.vy"), "from snekmate.auth import ownable\n")
+    token = _write(src.joinpath("Token.vy"), "import Auth\n")
+    counter = _write(src.joinpath("Counter.vy"), "# counter\n")
+    graph_path = tmp_path.joinpath("out", ".import_graph")
+
+    graph = ImportGraph([src, lib], [lib], graph_path)
+    assert len(graph.refresh()) == 4
+    graph.save()
+
+    assert graph.dependencies_of(token) == {auth.resolve(), ownable.resolve()}
+    assert graph.dependencies_of(token, transitive=False) == {auth.resolve()}
+    assert graph.dependents_of(ownable) == {auth.resolve(), token.resolve()}
+    assert graph.dependents_of(counter) == set()
+
+    # A fresh graph loaded from disk sees nothing new
+    reloaded = ImportGraph([src, lib], [lib], graph_path)
+    assert reloaded.refresh() == set()
+    assert reloaded.dependents_of(ownable) == {auth.resolve(), token.resolve()}
+
+    _write(ownable, "# ownable v2\n")
+    assert reloaded.refresh() == {ownable.resolve()}
+    assert reloaded.changed_since_last_build() == {ownable.resolve()}
+    assert reloaded.affected_by([ownable]) == {
+        ownable.resolve(),
+        auth.resolve(),
+        token.resolve(),
+    }
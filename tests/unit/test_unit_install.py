@@ -1,8 +1,15 @@
+import subprocess
+from functools import partial
+
+import pytest
+
 from moccasin._dependency_utils import (
     DependencyType,
     classify_dependency,
     preprocess_requirement,
 )
+from moccasin.commands import install
+from moccasin.constants.vars import GITHUB
 
 
 def test_classify_dependency_pip():
@@ -38,3 +45,75 @@ def test_classify_dependency_git_no_git():
 def test_preprocess_requirement():
     req = '"git+https://github.com/pcaversaccio/snekmate.git"'
     assert preprocess_requirement(req) == "snekmate"
+
+
+def test_offline_install_lists_every_missing_github_package(
+    tmp_path, monkeypatch, caplog
+):
+    monkeypatch.setattr(install, "MOCCASIN_DEFAULT_FOLDER", tmp_path / "home")
+    mirror = tmp_path / "mirror"
+    mirror.joinpath(GITHUB, "org", "mirrored").mkdir(parents=True)
+    mirror.joinpath(GITHUB, "org", "mirrored", "1.0.0.zip").write_bytes(b"")
+
+    with pytest.raises(SystemExit):
+        install._resolve_offline_github_packages(
+            ["org/mirrored@1.0.0", "org/missing@2.0.0", "org/unpinned"],
+            tmp_path / "lib" / GITHUB,
+            {},
+            mirror,
+        )
+
+    assert "org/mirrored" not in caplog.text
+    assert "org/missing@2.0.0" in caplog.text
+    assert "org/unpinned (no version pinned, locked or installed)" in caplog.text
+
+
+def test_offline_install_uses_locked_version_for_unpinned_package(
+    tmp_path, monkeypatch
+):
+    monkeypatch.setattr(install, "MOCCASIN_DEFAULT_FOLDER", tmp_path / "home")
+    mirror = tmp_path / "mirror"
+    mirror.joinpath(GITHUB, "org", "repo").mkdir(parents=True)
+    mirror.joinpath(GITHUB, "org", "repo", "1.2.0.zip").write_bytes(b"")
+    lock_entry = {"version": "1.2.0", "sha256": "ab" * 32}
+
+    resolved = install._resolve_offline_github_packages(
+        ["org/repo"], tmp_path / "lib" / GITHUB, {"org/repo": lock_entry}, mirror
+    )
+
+    assert resolved == {"org/repo": lock_entry}
+
+
+def test_run_install_phases_reports_both_failures(caplog):
+    def pip_install():
+        raise RuntimeError("pip failed")
+
+    def github_install():
+        raise ValueError("github failed")
+
+    with pytest.raises(RuntimeError, match="pip failed"):
+        install._run_install_phases(pip_install, github_install)
+    assert "github failed" in caplog.text
+    assert "github failed" in caplog.text
+
+    with pytest.raises(ValueError, match="github failed"):
+        install._run_install_phases(lambda: "pip", github_install)
+
+
+def test_offline_pip_failure_doesnt_exit_the_worker_thread(
+    tmp_path, monkeypatch, caplog
+):
+    def failing_run(cmd, **kwargs):
+        raise subprocess.CalledProcessError(1, cmd, stderr=b"not in cache")
+
+    monkeypatch.setattr(install.subprocess, "run", failing_run)
+
+    def github_install():
+        raise ValueError("github failed")
+
+    pip_install = partial(
+        install._uv_pip_install, ["snekmate==0.1.0"], tmp_path, offline=True
+    )
+    with pytest.raises(install.PipInstallError, match="not in cache"):
+        install._run_install_phases(pip_install, github_install)
+    assert "github failed" in caplog.text
@@ -0,0 +1,39 @@
+from moccasin._install_state import is_install_up_to_date, record_install_state
+from moccasin.constants.vars import GITHUB, PACKAGE_VERSION_FILE, PYPI
+
+
+def _fake_install(install_path):
+    install_path.joinpath(PYPI, "snekmate").mkdir(parents=True)
+    install_path.joinpath(PYPI, "snekmate-0.1.0.dist-info").mkdir()
+    install_path.joinpath(GITHUB, "pcaversaccio", "snekmate").mkdir(parents=True)
+    install_path.joinpath(GITHUB, PACKAGE_VERSION_FILE).write_text(
+        '"pcaversaccio/snekmate" = "0.1.0"\n'
+    )
+
+
+def test_install_state_matches_after_record(tmp_path):
+    requirements = ["snekmate==0.1.0", "pcaversaccio/snekmate@0.1.0"]
+    _fake_install(tmp_path)
+    assert not is_install_up_to_date(requirements, tmp_path)
+
+    record_install_state(requirements, tmp_path)
+    assert is_install_up_to_date(requirements, tmp_path)
+    # order of the declared dependencies doesn't matter
+    assert is_install_up_to_date(list(reversed(requirements)), tmp_path)
+
+
+def test_install_state_detects_changes(tmp_path):
+    requirements = ["snekmate==0.1.0", "pcaversaccio/snekmate@0.1.0"]
+    _fake_install(tmp_path)
+    record_install_state(requirements, tmp_path)
+
+    assert not is_install_up_to_date([*requirements, "moccasin"], tmp_path)
+
+    tmp_path.joinpath(PYPI, "snekmate-0.1.0.dist-info").rename(
+        tmp_path.joinpath(PYPI, "snekmate-0.2.0.dist-info")
+    )
+    assert not is_install_up_to_date(requirements, tmp_path)
+
+    record_install_state(requirements, tmp_path)
+    tmp_path.joinpath(GITHUB, "pcaversaccio", "snekmate").rmdir()
+    assert not is_install_up_to_date(requirements, tmp_path)
@@ -0,0 +1,82 @@
+import pytest
+
+from moccasin._lockfile import Lockfile
+from moccasin.commands import install
+from moccasin.constants.vars import GITHUB, PACKAGE_VERSION_FILE, PYPI
+
+
+def test_lockfile_round_trip(tmp_path):
+    lock_path = tmp_path.joinpath("moccasin.lock")
+    lockfile = Lockfile(
+        lock_path,
+        requirements=["snekmate==0.1.1", "pcaversaccio/snekmate@0.1.1"],
+        github={
+            "pcaversaccio/snekmate": {
+                "version": "0.1.1",
+                "commit": "4d6a7d2f",
+                "url": "https://codeload.github.com/pcaversaccio/snekmate/legacy.zip/refs/tags/v0.1.1",
+                "sha256": "ab" * 32,
+            }
+        },
+        pypi={"snekmate": "0.1.1"},
+    )
+    lockfile.save()
+
+    loaded = Lockfile.load(lock_path)
+    assert loaded.github == lockfile.github
+    assert loaded.pypi == lockfile.pypi
+    assert loaded.matches(["pcaversaccio/snekmate@0.1.1", "snekmate==0.1.1"])
+    assert not loaded.matches(["snekmate==0.1.1"])
+
+
+def test_missing_lockfile_is_empty(tmp_path):
+    lockfile = Lockfile.load(tmp_path.joinpath("moccasin.lock"))
+    assert not lockfile.exists()
+    assert lockfile.github == {} and lockfile.pypi == {}
+
+
+def test_lockfile_rejects_unknown_version(tmp_path):
+    lock_path = tmp_path.joinpath("moccasin.lock")
+    lock_path.write_text("version = 99\n")
+    with pytest.raises(ValueError, match="Unsupported lockfile version"):
+        Lockfile.load(lock_path)
+
+
+def test_lockfile_needs_every_github_package_at_its_pinned_version(tmp_path):
+    lockfile = Lockfile(
+        tmp_path.joinpath("moccasin.lock"),
+        requirements=["pcaversaccio/snekmate@0.1.1", "cyfrin/other"],
+        github={"pcaversaccio/snekmate": {"version": "0.1.0"}},
+    )
+    requirements = ["pcaversaccio/snekmate@0.1.1", "cyfrin/other"]
+    assert not lockfile.matches(requirements)
+
+    lockfile.github["pcaversaccio/snekmate"]["version"] = "0.1.1"
+    assert not lockfile.matches(requirements)
+
+    lockfile.github["cyfrin/other"] = {"version": "v1"}
+    assert lockfile.matches(requirements)
+
+
+def test_lock_keeps_github_packages_installed_before(tmp_path, monkeypatch):
+    monkeypatch.setattr(install, "MOCCASIN_DEFAULT_FOLDER", tmp_path)
+    install_path = tmp_path.joinpath("lib")
+    install_path.joinpath(PYPI).mkdir(parents=True)
+    install_path.joinpath(GITHUB).mkdir()
+    install_path.joinpath(GITHUB, PACKAGE_VERSION_FILE).write_text(
+        '"pcaversaccio/snekmate" = "0.1.1"\n"cyfrin/other" = "v1"\n'
+    )
+    lockfile = Lockfile(tmp_path.joinpath("moccasin.lock"))
+
+    # Only cyfrin/other was installed by this run
+    install._update_lockfile(
+        lockfile,
+        ["pcaversaccio/snekmate@0.1.1", "cyfrin/other@v2"],
+        install_path,
+        {"cyfrin/other": {"version": "v2", "sha256": "ab" * 32}},
+    )
+
+    assert Lockfile.load(lockfile.lock_path).github == {
+        "pcaversaccio/snekmate": {"version": "0.1.1"},
+        "cyfrin/other": {"version": "v2", "sha256": "ab" * 32},
+    }
@@ -0,0 +1,44 @@
+import os
+from pathlib import Path
+
+from moccasin._import_graph import ImportGraph
+from moccasin._output_cache import OutputCache, compute_output_cache_key
+
+
+def _make_project(root: Path, token_source: str) -> tuple[ImportGraph, Path]:
+    src = root.joinpath("src")
+    lib = root.joinpath("lib", "github")
+    lib.joinpath("snekmate", "auth").mkdir(parents=True)
+    src.mkdir()
+    lib.joinpath("snekmate", "auth", "ownable.vy").write_text("# ownable\n")
+    token = src.joinpath("Token.vy")
+    token.write_text(token_source)
+    graph = ImportGraph([src, lib], [lib])
+    graph.refresh()
+    return graph, token
+
+
+def test_output_cache_key_is_shared_across_projects(tmp_path):
+    source = "from snekmate.auth import ownable\n"
+    graph_a, token_a = _make_project(tmp_path.joinpath("a"), source)
+    graph_b, token_b = _make_project(tmp_path.joinpath("b"), source)
+    graph_c, token_c = _make_project(tmp_path.joinpath("c"), source + "# edit\n")
+
+    key_a = compute_output_cache_key(token_a, graph_a)
+    assert key_a == compute_output_cache_key(token_b, graph_b)
+    assert key_a != compute_output_cache_key(token_c, graph_c)
+
+
+def test_output_cache_evicts_least_recently_used(tmp_path):
+    cache = OutputCache(tmp_path, max_size_bytes=200)
+    for i, key in enumerate(["aa01", "bb02", "cc03"]):
+        cache.put(key, {"contract_name": key, "bytecode": "00" * 20})
+        entry = cache._entry_path(key)
+        os.utime(entry, (i, i))
+
+    assert cache.get("aa01") is not None  # now the most recently used
+    cache.prune()
+
+    assert cache.get("bb02") is None
+    assert cache.get("aa01") == {"contract_name": "aa01", "bytecode": "00" * 20}
+    assert cache.get("cc03") is not None
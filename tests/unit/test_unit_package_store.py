@@ -0,0 +1,44 @@
+import os
+
+from moccasin._package_store import PackageStore, link_tree
+
+
+def _make_package(folder):
+    folder.joinpath("src").mkdir(parents=True)
+    folder.joinpath("src", "token.vy").write_text("# pragma version ~=0.4.0\n")
+    return folder
+
+
+def test_add_and_get_github_package(tmp_path):
+    store = PackageStore(tmp_path.joinpath("store"))
+    assert store.get_github_package("org", "repo", "v1.0.0") is None
+
+    staged = _make_package(store.make_staging_folder().joinpath("org-repo-abc"))
+    package_path = store.add_github_package(staged, "org", "repo", "v1.0.0")
+
+    assert store.get_github_package("org", "repo", "v1.0.0") == package_path
+    assert package_path.joinpath("src", "token.vy").exists()
+    assert not staged.exists()
+
+
+def test_add_github_package_keeps_existing_entry(tmp_path):
+    store = PackageStore(tmp_path.joinpath("store"))
+    first = _make_package(store.make_staging_folder().joinpath("first"))
+    package_path = store.add_github_package(first, "org", "repo", "release/1")
+
+    second = _make_package(store.make_staging_folder().joinpath("second"))
+    second.joinpath("extra.vy").write_text("")
+    assert store.add_github_package(second, "org", "repo", "release/1") == package_path
+    assert not package_path.joinpath("extra.vy").exists()
+
+
+def test_link_tree_hard_links_files(tmp_path):
+    source = _make_package(tmp_path.joinpath("source"))
+    target = tmp_path.joinpath("project", "lib", "repo")
+
+    link_tree(source, target)
+
+    source_file = source.joinpath("src", "token.vy")
+    target_file = target.joinpath("src", "token.vy")
+    assert target_file.read_text() == source_file.read_text()
+    assert os.path.samefile(source_file, target_file)
@@ -0,0 +1,108 @@
+import pytest
+
+from moccasin._purge_journal import PurgeJournal, recover_interrupted_purges
+from moccasin.commands import purge
+from moccasin.config import Config
+from moccasin.constants.vars import GITHUB, PACKAGE_VERSION_FILE
+
+
+@pytest.fixture
+def github_lib(tmp_path, monkeypatch):
+    tmp_path.joinpath("moccasin.toml").write_text('[project]\nsrc = "src"\n')
+    github_path = tmp_path.joinpath("lib", GITHUB)
+    for org, repo in [("org", "repo_a"), ("org", "repo_b"), ("other", "repo_c")]:
+        repo_path = github_path.joinpath(org, repo)
+        repo_path.mkdir(parents=True)
+        repo_path.joinpath("file.vy").write_text("# pragma version ~=0.4.0\n")
+    github_path.joinpath(PACKAGE_VERSION_FILE).write_text(
+        '"org/repo_a" = "1.0.0"\n"org/repo_b" = "1.0.0"\n"other/repo_c" = "1.0.0"\n'
+    )
+    config = Config(tmp_path)
+    monkeypatch.setattr(purge, "get_or_initialize_config", lambda: config)
+    return config, github_path
+
+
+def test_purge_github_removes_only_the_given_packages(github_lib):
+    config, github_path = github_lib
+    purge._uninstall_github_dependencies(
+        ["org/repo_a", "other/repo_c@1.0.0"], config, quiet=True
+    )
+    assert not github_path.joinpath("org", "repo_a").exists()
+    assert not github_path.joinpath("other").exists()
+    assert github_path.joinpath("org", "repo_b", "file.vy").exists()
+    versions = github_path.joinpath(PACKAGE_VERSION_FILE).read_text()
+    assert versions == '"org/repo_b" = "1.0.0"\n'
+    assert not [p for p in github_path.parent.iterdir() if p.name.startswith(".tmp_")]
+
+
+def test_purge_github_rolls_back_on_error(github_lib, monkeypatch):
+    config, github_path = github_lib
+    versions_before = github_path.joinpath(PACKAGE_VERSION_FILE).read_text()
+
+    def failing_dump(*args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(purge.tomli_w, "dumps", failing_dump)
+    with pytest.raises(OSError):
+        purge._uninstall_github_dependencies(
+            ["org/repo_a", "other/repo_c"], config, quiet=True
+        )
+    assert github_path.joinpath("org", "repo_a", "file.vy").exists()
+    assert github_path.joinpath("other", "repo_c", "file.vy").exists()
+    assert github_path.joinpath(PACKAGE_VERSION_FILE).read_text() == versions_before
+    assert not [p for p in github_path.parent.iterdir() if p.name.startswith(".tmp_")]
+    assert not [p for p in github_path.iterdir() if p.name.startswith(".tmp_")]
+
+
+@pytest.mark.parametrize("after_versions_written", [False, True])
+def test_interrupted_purge_is_recovered_by_the_next_one(
+    github_lib, monkeypatch, after_versions_written
+):
+    config, github_path = github_lib
+
+    class Killed(BaseException):
+        pass
+
+    def kill(*args, **kwargs):
+        raise Killed()
+
+    # @dev a killed process doesn't clean up after itself, but loses its lock
+    with monkeypatch.context() as m:
+        m.setattr(PurgeJournal, "close", PurgeJournal._release_lock)
+        if not after_versions_written:
+            m.setattr(PurgeJournal, "expect_versions", kill)
+        try:
+            purge._uninstall_github_dependencies(["org/repo_a"], config, quiet=True)
+        except Killed:
+            pass
+    assert not github_path.joinpath("org", "repo_a").exists()
+
+    recover_interrupted_purges(github_path.parent)
+
+    # Rolled back if the versions file wasn't written yet, finished otherwise
+    assert github_path.joinpath("org", "repo_a").exists() != after_versions_written
+    versions = github_path.joinpath(PACKAGE_VERSION_FILE).read_text()
+    assert ('"org/repo_a"' in versions) != after_versions_written
+    assert not [p for p in github_path.parent.iterdir() if p.name.startswith(".tmp_")]
+
+
+def test_recovery_skips_purges_that_are_still_running(github_lib):
+    _, github_path = github_lib
+    lib_path = github_path.parent
+    crashed = PurgeJournal(lib_path)
+    crashed.trash(github_path.joinpath("org", "repo_a"))
+    crashed._release_lock()
+    live = PurgeJournal(lib_path)
+    live.trash(github_path.joinpath("org", "repo_b"))
+
+    recover_interrupted_purges(lib_path)
+
+    assert github_path.joinpath("org", "repo_a", "file.vy").exists()
+    assert not crashed.trash_path.exists()
+    assert not github_path.joinpath("org", "repo_b").exists()
+    assert live.trash_path.exists()
+
+    live.rollback()
+    live.close()
+    assert github_path.joinpath("org", "repo_b", "file.vy").exists()
+    assert not [p for p in lib_path.iterdir() if p.name.startswith(".tmp_")]